@@ -149,16 +149,18 @@ def get_finance_books(asset_name):
 
 
 @frappe.whitelist(allow_guest = True)
-def get_asset_details(asset_name, include_depreciation_schedule=False):
+def get_asset_details(asset_name, include_depreciation_schedule=False, expand=None):
     """
     Get detailed information about a specific asset
     
     Args:
         asset_name: Name/ID of the asset
         include_depreciation_schedule: Include depreciation schedule entries (default: False)
+        expand: Child tables to include: JSON string list or comma separated fieldnames
+            (e.g., '["finance_books"]'), "" for none (default: all)
     
     Returns:
-        Asset document with all fields including finance_books
+        Asset fields plus the requested child tables
     """
     try:
         if not asset_name:
@@ -168,9 +170,9 @@ def get_asset_details(asset_name, include_depreciation_schedule=False):
         if not frappe.has_permission('Asset', 'read', asset_name):
             frappe.throw(_('Not permitted to access this asset'))
         
-        # Get asset details (includes finance_books child table)
-        asset = frappe.get_doc('Asset', asset_name)
-        asset_dict = asset.as_dict()
+        from asset_lite.api.details import get_document_details
+        
+        asset_dict = get_document_details('Asset', asset_name, expand)
         
         # Optionally include depreciation schedule
         if include_depreciation_schedule:
@@ -452,10 +454,14 @@ def update_asset(asset_name, asset_data):
         asset_data: JSON string containing fields to update (can include finance_books)
     
     Returns:
-        Updated asset document
+        Updated asset document. Updates touching only fields declared in
+        asset_lite.api.patch_api.PATCH_PROFILES are written without a full save
+        and return the parent fields only, with "partial": true. Pass "modified"
+        in asset_data to reject the update if the asset changed since.
     """
     try:
         import json
+        from asset_lite.api.patch_api import apply_partial_update
         
         if not asset_name:
             frappe.throw(_('Asset name is required'))
@@ -468,6 +474,18 @@ def update_asset(asset_name, asset_data):
         if not frappe.has_permission('Asset', 'write', asset_name):
             frappe.throw(_('Not permitted to update this asset'))
         
+        # Status flips and other declared fields skip the full document save
+        patched = apply_partial_update('Asset', asset_name, asset_data)
+        if patched is not None:
+            frappe.db.commit()
+            frappe.response['message'] = {
+                'success': True,
+                'asset': patched,
+                'partial': True,
+                'message': _('Asset updated successfully')
+            }
+            return
+        
         # Get asset
         asset = frappe.get_doc('Asset', asset_name)
         
@@ -922,6 +940,47 @@ def get_depreciation_stats():
         return {}
 
 
+@frappe.whitelist(allow_guest = True)
+def get_availability_trend(from_date, to_date, granularity='Day', group_by=None, filters=None):
+    """
+    Get the uptime % series of assets over a date range
+    
+    Args:
+        from_date: First day of the range
+        to_date: Last day of the range
+        granularity: "Day" or "Month" (default: Day)
+        group_by: Optional company, modality, vendor or department; one series per value
+        filters: Optional JSON string of {dimension: value}, same dimensions as group_by
+    
+    Returns:
+        {
+            "series": [{"period", "group", "availability", "service_minutes",
+                        "downtime_minutes", "asset_days", "down_asset_days"}],
+            "granularity": str
+        }
+    """
+    try:
+        import json
+        from asset_lite.availability import get_availability_trend as get_trend
+        
+        if filters and isinstance(filters, str):
+            filters = json.loads(filters)
+        
+        if frappe.utils.getdate(from_date) > frappe.utils.getdate(to_date):
+            frappe.throw(_('From Date cannot be after To Date'))
+        
+        frappe.response['message'] = {
+            'series': get_trend(from_date, to_date, granularity, group_by, filters),
+            'granularity': 'Month' if str(granularity).lower() == 'month' else 'Day'
+        }
+        
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), 'Get Availability Trend API Error')
+        frappe.response['message'] = {
+            'error': str(e)
+        }
+
+
 @frappe.whitelist(allow_guest = True)
 def search_assets(search_term, limit=10):
     """
@@ -970,4 +1029,209 @@ def search_assets(search_term, limit=10):
         frappe.log_error(frappe.get_traceback(), 'Search Assets API Error')
         frappe.response['message'] = {
             'error': str(e)
-        }
\ No newline at end of file
+        }
+
+# Imports with more rows than this always run as a background job
+ASSET_IMPORT_JOB_THRESHOLD = 500
+
+ASSET_IMPORT_REQUIRED_FIELDS = ('item_code', 'asset_name', 'company', 'location')
+
+
+@frappe.whitelist(allow_guest = True)
+def import_assets(file_url=None, rows=None, file_format=None, chunk_size=500, run_in_background=None):
+    """
+    Import many assets from an uploaded file or a JSON list of rows
+    
+    Rows are streamed and validated one chunk at a time: every link value in a
+    chunk is checked with a single query per linked doctype before any insert.
+    QR codes and depreciation schedules are created by background jobs after
+    each chunk commits instead of inside every insert.
+    
+    Args:
+        file_url: URL of an uploaded CSV, XLSX, JSON or JSON Lines file
+        rows: JSON string list of asset dicts (instead of file_url)
+        file_format: "csv", "xlsx", "json" or "jsonl" (default: from the file extension)
+        chunk_size: Number of rows per commit (default: 500)
+        run_in_background: Queue the import and return a job id to poll with
+            asset_lite.api.bulk_api.get_bulk_job_status (default for files and
+            for more than 500 rows)
+    
+    Returns:
+        {
+            "success": bool,
+            "results": [{"index", "success", "name"} | {"index", "success", "error"}],
+            "succeeded": int,
+            "failed": int
+        }
+        or {"success": bool, "job_id": str, "total": int} for background runs
+    """
+    try:
+        import json
+        from frappe.utils import cint
+        from asset_lite.api.bulk_api import enqueue_bulk_job
+        
+        if not file_url and rows is None:
+            frappe.throw(_('Either file_url or rows is required'))
+        
+        # Parse rows
+        if isinstance(rows, str):
+            rows = json.loads(rows)
+        
+        # Check if user has permission to create asset
+        if not frappe.has_permission('Asset', 'create'):
+            frappe.throw(_('Not permitted to create asset'))
+        
+        if file_url and not frappe.has_permission('File', 'read', frappe.db.get_value('File', {'file_url': file_url})):
+            frappe.throw(_('Not permitted to read this file'))
+        
+        if run_in_background is None:
+            run_in_background = bool(file_url) or len(rows) > ASSET_IMPORT_JOB_THRESHOLD
+        
+        if cint(run_in_background):
+            total = len(rows) if rows is not None else None
+            job_id = enqueue_bulk_job(
+                'asset_lite.api.asset_api.run_asset_import',
+                total=total,
+                file_url=file_url,
+                rows=rows,
+                file_format=file_format,
+                chunk_size=cint(chunk_size)
+            )
+            frappe.response['message'] = {
+                'success': True,
+                'job_id': job_id,
+                'total': total,
+                'message': _('Asset import queued')
+            }
+            return
+        
+        results = import_asset_rows(get_import_rows(file_url, rows, file_format), cint(chunk_size))
+        
+        frappe.response['message'] = {
+            'success': True,
+            'results': results,
+            'succeeded': sum(1 for result in results if result['success']),
+            'failed': sum(1 for result in results if not result['success'])
+        }
+        
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), 'Import Assets API Error')
+        frappe.response['message'] = {
+            'success': False,
+            'error': str(e)
+        }
+
+
+def get_import_rows(file_url=None, rows=None, file_format=None):
+    """Row iterator over either the uploaded file or the posted rows"""
+    from asset_lite.api.bulk_api import clean_import_row, iter_file_rows
+    
+    if file_url:
+        return iter_file_rows(file_url, file_format)
+    return (clean_import_row(row) for row in rows)
+
+
+def get_asset_link_doctypes():
+    """Link fields of Asset grouped by the doctype they point to"""
+    link_doctypes = {}
+    for df in frappe.get_meta('Asset').get_link_fields():
+        link_doctypes.setdefault(df.options, []).append(df.fieldname)
+    return link_doctypes
+
+
+def import_asset_rows(rows, chunk_size=500, job_id=None):
+    """Validate and insert asset rows in committed chunks, returning per-row results"""
+    from frappe.utils import cint
+    from asset_lite.api.bulk_api import process_in_chunks
+    
+    link_doctypes = get_asset_link_doctypes()
+    chunk_state = {'existing': {}, 'deferred_depreciation': {}}
+    
+    def resolve_links(chunk):
+        # One query per linked doctype for the whole chunk
+        existing = {}
+        for doctype, fieldnames in link_doctypes.items():
+            values = {row[fieldname] for row in chunk for fieldname in fieldnames if row.get(fieldname)}
+            if values:
+                existing[doctype] = set(frappe.get_all(doctype, filters={'name': ['in', list(values)]}, pluck='name'))
+        chunk_state['existing'] = existing
+    
+    def insert_asset(row):
+        missing = [fieldname for fieldname in ASSET_IMPORT_REQUIRED_FIELDS if not row.get(fieldname)]
+        if missing:
+            frappe.throw(_('Missing required fields: {0}').format(', '.join(missing)))
+        
+        for doctype, fieldnames in link_doctypes.items():
+            for fieldname in fieldnames:
+                if row.get(fieldname) and row[fieldname] not in chunk_state['existing'].get(doctype, ()):
+                    frappe.throw(_('{0} {1} not found').format(_(doctype), row[fieldname]))
+        
+        row = dict(row)
+        finance_books = row.pop('finance_books', None)
+        calculate_depreciation = cint(row.pop('calculate_depreciation', 0))
+        
+        asset = frappe.get_doc({
+            'doctype': 'Asset',
+            **row
+        })
+        if finance_books and not calculate_depreciation:
+            asset.set('finance_books', finance_books)
+        
+        asset.flags.defer_qr_code = True
+        # Keep link validation: it is also what fills the fetch_from fields (item, support plan, ...)
+        asset.insert()
+        
+        if calculate_depreciation:
+            chunk_state['deferred_depreciation'][asset.name] = finance_books
+        return {'name': asset.name}
+    
+    def enqueue_deferred_work(chunk_results):
+        names = [result['name'] for result in chunk_results if result['success']]
+        if names:
+            frappe.enqueue(
+                'asset_lite.public.py.asset.generate_asset_qr_codes',
+                queue='long',
+                assets=names
+            )
+        
+        if chunk_state['deferred_depreciation']:
+            frappe.enqueue(
+                'asset_lite.api.asset_api.setup_deferred_depreciation',
+                queue='long',
+                assets=chunk_state['deferred_depreciation']
+            )
+            chunk_state['deferred_depreciation'] = {}
+    
+    return process_in_chunks(rows, insert_asset, chunk_size, job_id, resolve_links, enqueue_deferred_work)
+
+
+def setup_deferred_depreciation(assets):
+    """
+    Background job: enable depreciation on imported assets so their
+    depreciation schedules are built outside the import transaction
+    
+    Args:
+        assets: Dictionary of asset name -> finance_books rows (or None)
+    """
+    for asset_name, finance_books in assets.items():
+        try:
+            asset = frappe.get_doc('Asset', asset_name)
+            asset.calculate_depreciation = 1
+            if finance_books:
+                asset.set('finance_books', finance_books)
+            asset.save()
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            frappe.log_error(frappe.get_traceback(), 'Asset Import Depreciation Error')
+
+
+def run_asset_import(bulk_job_id, file_url=None, rows=None, file_format=None, chunk_size=500):
+    """Background job entry point for import_assets"""
+    from asset_lite.api.bulk_api import run_bulk_job
+    
+    run_bulk_job(
+        bulk_job_id,
+        lambda: import_asset_rows(get_import_rows(file_url, rows, file_format), chunk_size, bulk_job_id)
+    )
@@ -1,8 +1,12 @@
 import frappe
 from frappe import _
 
+from asset_lite.api.details import get_document_details
+from asset_lite.api.idempotency import claim_idempotency_key, release_idempotency_key, store_idempotent_response
+from asset_lite.api.projections import get_list_fields
+
 @frappe.whitelist(allow_guest = True)
-def get_asset_maintenance_logs(filters=None, fields=None, limit=20, offset=0, order_by=None):
+def get_asset_maintenance_logs(filters=None, fields=None, limit=20, offset=0, order_by=None, profile=None):
     """
     Get list of asset maintenance logs with filters and pagination
     
@@ -12,6 +16,8 @@ def get_asset_maintenance_logs(filters=None, fields=None, limit=20, offset=0, or
         limit: Number of records to return (default: 20)
         offset: Number of records to skip (default: 0)
         order_by: Sort order (e.g., "creation desc")
+        profile: Projection profile used when fields is not given: "card", "table"
+            (default) or "full" (see asset_lite.api.projections)
     
     Returns:
         {
@@ -32,39 +38,9 @@ def get_asset_maintenance_logs(filters=None, fields=None, limit=20, offset=0, or
         if fields and isinstance(fields, str):
             import json
             fields = json.loads(fields)
-        else:
-            # Default fields to return
-            fields = [
-                'name',
-                'asset_maintenance',
-                'naming_series',
-                'asset_name',
-                'custom_asset_type',
-                'item_code',
-                'item_name',
-                'custom_asset_names',
-                'custom_hospital_name',
-                'task',
-                'task_name',
-                'maintenance_type',
-                'periodicity',
-                'has_certificate',
-                'custom_early_completion',
-                'maintenance_status',
-                'custom_pm_overdue_reason',
-                'custom_accepted_by_moh',
-                'assign_to_name',
-                'due_date',
-                'custom_accepted_by_moh_',
-                'custom_template',
-                'workflow_state',
-                'creation',
-                'modified',
-                'owner',
-                'modified_by',
-                'docstatus',
-                'idx'
-            ]
+        
+        # Explicit fields, or the requested projection profile
+        fields = get_list_fields('Asset Maintenance Log', fields, profile)
         
         # Get total count
         total_count = frappe.db.count('Asset Maintenance Log', filters=filters or {})
@@ -100,15 +76,17 @@ def get_asset_maintenance_logs(filters=None, fields=None, limit=20, offset=0, or
 
 
 @frappe.whitelist(allow_guest = True)
-def get_asset_maintenance_log_details(log_name):
+def get_asset_maintenance_log_details(log_name, expand=None):
     """
     Get detailed information about a specific asset maintenance log
     
     Args:
         log_name: Name/ID of the asset maintenance log
+        expand: Child tables to include: JSON string list or comma separated fieldnames,
+            "" for none (default: all)
     
     Returns:
-        Asset Maintenance Log document with all fields including child tables
+        Asset Maintenance Log fields plus the requested child tables
     """
     try:
         if not log_name:
@@ -118,10 +96,7 @@ def get_asset_maintenance_log_details(log_name):
         if not frappe.has_permission('Asset Maintenance Log', 'read', log_name):
             frappe.throw(_('Not permitted to access this asset maintenance log'))
         
-        # Get asset maintenance log details
-        log = frappe.get_doc('Asset Maintenance Log', log_name)
-        
-        frappe.response['message'] = log.as_dict()
+        frappe.response['message'] = get_document_details('Asset Maintenance Log', log_name, expand)
         
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), 'Get Asset Maintenance Log Details API Error')
@@ -138,9 +113,13 @@ def create_asset_maintenance_log(log_data):
     Args:
         log_data: JSON string containing asset maintenance log fields
     
+    Send an Idempotency-Key header to make retries safe: a repeated key
+    returns the original response instead of creating another document.
+    
     Returns:
         Created asset maintenance log document
     """
+    idempotency_key = None
     try:
         import json
         
@@ -148,6 +127,12 @@ def create_asset_maintenance_log(log_data):
         if isinstance(log_data, str):
             log_data = json.loads(log_data)
         
+        # Replay the original response for a retried request
+        idempotency_key, replay = claim_idempotency_key('create_asset_maintenance_log', log_data)
+        if replay is not None:
+            frappe.response['message'] = replay
+            return
+        
         # Check if user has permission to create asset maintenance log
         if not frappe.has_permission('Asset Maintenance Log', 'create'):
             frappe.throw(_('Not permitted to create asset maintenance log'))
@@ -166,9 +151,11 @@ def create_asset_maintenance_log(log_data):
             'asset_maintenance_log': log.as_dict(),
             'message': _('Asset Maintenance Log created successfully')
         }
+        store_idempotent_response(idempotency_key, frappe.response['message'])
         
     except Exception as e:
         frappe.db.rollback()
+        release_idempotency_key(idempotency_key)
         frappe.log_error(frappe.get_traceback(), 'Create Asset Maintenance Log API Error')
         frappe.response['message'] = {
             'success': False,
@@ -186,10 +173,14 @@ def update_asset_maintenance_log(log_name, log_data):
         log_data: JSON string containing fields to update
     
     Returns:
-        Updated asset maintenance log document
+        Updated asset maintenance log document. Updates touching only fields
+        declared in asset_lite.api.patch_api.PATCH_PROFILES are written without
+        a full save and return the parent fields only, with "partial": true.
+        Pass "modified" in log_data to reject the update if the log changed since.
     """
     try:
         import json
+        from asset_lite.api.patch_api import apply_partial_update
         
         if not log_name:
             frappe.throw(_('Asset Maintenance Log name is required'))
@@ -202,6 +193,18 @@ def update_asset_maintenance_log(log_name, log_data):
         if not frappe.has_permission('Asset Maintenance Log', 'write', log_name):
             frappe.throw(_('Not permitted to update this asset maintenance log'))
         
+        # Status flips and other declared fields skip the full document save
+        patched = apply_partial_update('Asset Maintenance Log', log_name, log_data)
+        if patched is not None:
+            frappe.db.commit()
+            frappe.response['message'] = {
+                'success': True,
+                'asset_maintenance_log': patched,
+                'partial': True,
+                'message': _('Asset Maintenance Log updated successfully')
+            }
+            return
+        
         # Get and update asset maintenance log
         log = frappe.get_doc('Asset Maintenance Log', log_name)
         
@@ -386,22 +389,21 @@ def get_overdue_maintenance_logs(filters=None, limit=20, offset=0):
         offset: Number of records to skip (default: 0)
     
     Returns:
-        List of overdue maintenance logs
+        List of overdue maintenance logs, most overdue first. Logs are marked
+        Overdue by the nightly status sweep (see Maintenance Status Transition).
     """
     try:
         import json
-        from frappe.utils import today
         
         # Parse additional filters if provided
         additional_filters = {}
         if filters and isinstance(filters, str):
             additional_filters = json.loads(filters)
         
-        # Combine filters - get logs with due_date less than today and status not completed
+        # Read by range on the (maintenance_status, due_date) index
         combined_filters = {
-            'due_date': ['<', today()],
-            'maintenance_status': ['!=', 'Completed'],
-            **additional_filters
+            **additional_filters,
+            'maintenance_status': 'Overdue'
         }
         
         # Get total count
@@ -435,3 +437,70 @@ def get_overdue_maintenance_logs(filters=None, limit=20, offset=0):
             'asset_maintenance_logs': [],
             'total_count': 0
         }
+
+
+@frappe.whitelist(allow_guest = True)
+def level_maintenance_workload(from_date, to_date, maintenance_teams=None, apply=False):
+    """
+    Spread Planned maintenance logs over the technicians of their teams
+    
+    Each log is placed on a day within its due window (never after its due
+    date) and on a technician of its Asset Maintenance Team, respecting the
+    team's daily PM capacity and holidays and keeping technicians at one site
+    per day where possible (see asset_lite.pm_workload).
+    
+    Args:
+        from_date: First due date to level
+        to_date: Last due date to level
+        maintenance_teams: Optional JSON string list of Asset Maintenance Teams
+        apply: Queue a job that assigns the logs (default: preview only)
+    
+    Returns:
+        {
+            "success": bool,
+            "logs": int,
+            "technicians": int,
+            "over_capacity": int,
+            "peak_daily_load": int,
+            "assignments": [{"name", "assign_to", "scheduled_date", "over_capacity"}]
+        }
+        or {"success": bool, "job_id": str} with apply
+    """
+    try:
+        import json
+        from frappe.utils import cint
+        from asset_lite.api.bulk_api import enqueue_bulk_job
+        from asset_lite.pm_workload import level_maintenance_logs
+        
+        if isinstance(maintenance_teams, str):
+            maintenance_teams = json.loads(maintenance_teams)
+        
+        if not frappe.has_permission('Asset Maintenance Log', 'write'):
+            frappe.throw(_('Not permitted to assign asset maintenance logs'))
+        
+        if cint(apply):
+            job_id = enqueue_bulk_job(
+                'asset_lite.pm_workload.run_maintenance_leveling',
+                total=None,
+                from_date=from_date,
+                to_date=to_date,
+                teams=maintenance_teams
+            )
+            frappe.response['message'] = {
+                'success': True,
+                'job_id': job_id,
+                'message': _('Workload leveling queued')
+            }
+            return
+        
+        frappe.response['message'] = {
+            'success': True,
+            **level_maintenance_logs(from_date, to_date, maintenance_teams, apply=False)
+        }
+        
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), 'Level Maintenance Workload API Error')
+        frappe.response['message'] = {
+            'success': False,
+            'error': str(e)
+        }
@@ -0,0 +1,385 @@
+import csv
+import json
+import os
+from itertools import islice
+
+import frappe
+from frappe import _
+
+# Progress of background bulk jobs is kept in the cache for this many seconds
+BULK_JOB_TTL = 24 * 60 * 60
+
+
+def get_job_cache_key(job_id):
+    return f"asset_lite_bulk_job:{job_id}"
+
+
+def set_job_progress(job_id, **progress):
+    """Merge progress fields into the cached state of a bulk job"""
+    key = get_job_cache_key(job_id)
+    state = frappe.cache().get_value(key) or {}
+    state.update(progress)
+    frappe.cache().set_value(key, state, expires_in_sec=BULK_JOB_TTL)
+
+
+def process_in_chunks(rows, process_row, chunk_size=200, job_id=None, before_chunk=None, after_chunk=None):
+    """
+    Run process_row over rows in chunks, one savepoint per row and one commit per chunk
+
+    A failing row is rolled back to its savepoint and reported; the rest of the
+    chunk still commits. Rows may be any iterable, so large files can be streamed.
+
+    Args:
+        rows: Iterable of row dicts
+        process_row: Callable(row) returning a dict merged into the row result
+        chunk_size: Rows per commit
+        job_id: Optional bulk job id whose cached progress is updated per chunk
+        before_chunk: Optional callable(chunk) run before a chunk, e.g. to pre-resolve links
+        after_chunk: Optional callable(chunk_results) run after a chunk is committed
+
+    Returns:
+        List of per-row results: {"index", "success", ...} or {"index", "success", "error"}
+    """
+    chunk_size = max(int(chunk_size or 200), 1)
+    results = []
+    rows = iter(rows)
+
+    while chunk := list(islice(rows, chunk_size)):
+        if before_chunk:
+            before_chunk(chunk)
+
+        chunk_results = []
+        for index, row in enumerate(chunk, len(results)):
+            savepoint = f"bulk_row_{index}"
+            frappe.db.savepoint(savepoint)
+            try:
+                chunk_results.append({"index": index, "success": True, **(process_row(row) or {})})
+            except Exception as e:
+                frappe.db.rollback(save_point=savepoint)
+                frappe.clear_messages()
+                chunk_results.append({"index": index, "success": False, "error": str(e)})
+
+        frappe.db.commit()
+        results += chunk_results
+        if after_chunk:
+            after_chunk(chunk_results)
+        if job_id:
+            set_job_progress(job_id, processed=len(results))
+
+    return results
+
+
+def clean_import_row(row):
+    """Strip header names and drop empty cells so they fall back to field defaults"""
+    return {
+        str(key).strip(): value.strip() if isinstance(value, str) else value
+        for key, value in row.items()
+        if key and value not in (None, "")
+    }
+
+
+def iter_file_rows(file_url, file_format=None):
+    """
+    Stream row dicts out of an uploaded CSV, XLSX or JSON file
+
+    CSV and XLSX are read row by row and JSON Lines one line at a time, so the
+    whole file is never held in memory. A plain JSON array is loaded at once.
+
+    Args:
+        file_url: URL of an uploaded File
+        file_format: "csv", "xlsx", "json" or "jsonl" (default: from the file extension)
+    """
+    path = frappe.get_doc("File", {"file_url": file_url}).get_full_path()
+    file_format = (file_format or os.path.splitext(path)[1].lstrip(".")).lower()
+
+    if file_format == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                yield clean_import_row(row)
+
+    elif file_format == "xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            values = workbook.active.iter_rows(values_only=True)
+            header = next(values, ())
+            for row in values:
+                if any(value is not None for value in row):
+                    yield clean_import_row(dict(zip(header, row)))
+        finally:
+            workbook.close()
+
+    elif file_format in ("json", "jsonl", "ndjson"):
+        with open(path, encoding="utf-8") as f:
+            first = f.read(1)
+            while first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            if first == "[":
+                for row in json.load(f):
+                    yield clean_import_row(row)
+            else:
+                for line in f:
+                    if line.strip():
+                        yield clean_import_row(json.loads(line))
+
+    else:
+        frappe.throw(_("Unsupported import file format: {0}").format(file_format))
+
+
+def enqueue_bulk_job(method, total, enqueue_after_commit=False, **kwargs):
+    """
+    Queue a bulk job and register its progress entry
+
+    Args:
+        method: Dotted path of the function to run; it receives job_id and kwargs
+        total: Number of rows, reported back while polling
+        enqueue_after_commit: Queue only once the current transaction commits; pass
+            True from document events so the job sees the saved document
+
+    Returns:
+        The job id to poll with get_bulk_job_status
+    """
+    job_id = frappe.generate_hash(length=12)
+    set_job_progress(job_id, status="Queued", user=frappe.session.user, total=total, processed=0)
+    frappe.enqueue(
+        method,
+        queue="long",
+        timeout=4 * 60 * 60,
+        job_id=job_id,
+        enqueue_after_commit=enqueue_after_commit,
+        bulk_job_id=job_id,
+        **kwargs
+    )
+    return job_id
+
+
+def run_bulk_job(bulk_job_id, runner):
+    """Run a queued bulk job, recording its final status and results"""
+    set_job_progress(bulk_job_id, status="Running")
+    try:
+        results = runner()
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), 'Bulk Job Error')
+        set_job_progress(bulk_job_id, status="Failed", error=str(e))
+        return
+
+    set_job_progress(
+        bulk_job_id,
+        status="Completed",
+        processed=len(results),
+        succeeded=sum(1 for result in results if result["success"]),
+        failed=sum(1 for result in results if not result["success"]),
+        results=results
+    )
+
+
+@frappe.whitelist(allow_guest = True)
+def get_bulk_job_status(job_id):
+    """
+    Poll the progress of a background bulk job
+
+    Args:
+        job_id: Id returned when the job was queued
+
+    Returns:
+        {
+            "status": "Queued" | "Running" | "Completed" | "Failed",
+            "total": int,
+            "processed": int,
+            "results": [...]  (once completed)
+        }
+    """
+    try:
+        state = frappe.cache().get_value(get_job_cache_key(job_id))
+        if not state or (state.get("user") != frappe.session.user and frappe.session.user != "Administrator"):
+            frappe.throw(_('Bulk job {0} not found').format(job_id))
+
+        frappe.response['message'] = state
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), 'Get Bulk Job Status API Error')
+        frappe.response['message'] = {
+            'error': str(e)
+        }
+
+
+# Status field moved by bulk_transition, per doctype
+TRANSITION_STATUS_FIELDS = {
+    "Work_Order": "repair_status",
+    "Asset Maintenance Log": "maintenance_status",
+}
+
+# Transitions of more names than this always run as a background job
+BULK_TRANSITION_JOB_THRESHOLD = 200
+
+
+@frappe.whitelist(allow_guest = True)
+def bulk_transition(doctype, names, repair_status=None, maintenance_status=None, workflow_state=None,
+        chunk_size=200, run_in_background=None):
+    """
+    Move many work orders or maintenance logs to a new status in one call
+    
+    Permissions are checked for all names with a single query. Status changes
+    use the partial update path where possible, workflow states go through the
+    doctype's workflow transitions, and the owners are notified once per chunk.
+    
+    Args:
+        doctype: "Work_Order" or "Asset Maintenance Log"
+        names: JSON string list of document names
+        repair_status: New repair status (Work_Order)
+        maintenance_status: New maintenance status (Asset Maintenance Log)
+        workflow_state: Target workflow state
+        chunk_size: Number of documents per commit (default: 200)
+        run_in_background: Queue the transition and return a job id to poll with
+            get_bulk_job_status (default above 200 names)
+    
+    Returns:
+        {
+            "success": bool,
+            "results": [{"index", "name", "success"} | {"index", "name", "success", "error"}],
+            "succeeded": int,
+            "failed": int
+        }
+        or {"success": bool, "job_id": str, "total": int} for background runs
+    """
+    try:
+        import json
+        from frappe.utils import cint
+        
+        if doctype not in TRANSITION_STATUS_FIELDS:
+            frappe.throw(_('Bulk transition is not supported for {0}').format(doctype))
+        
+        # Parse names
+        if isinstance(names, str):
+            names = json.loads(names)
+        
+        status = repair_status if doctype == 'Work_Order' else maintenance_status
+        if not status and not workflow_state:
+            frappe.throw(_('{0} or workflow_state is required').format(TRANSITION_STATUS_FIELDS[doctype]))
+        
+        if not frappe.has_permission(doctype, 'write'):
+            frappe.throw(_('Not permitted to update {0}').format(_(doctype)))
+        
+        if run_in_background is None:
+            run_in_background = len(names) > BULK_TRANSITION_JOB_THRESHOLD
+        
+        if cint(run_in_background):
+            job_id = enqueue_bulk_job(
+                'asset_lite.api.bulk_api.run_bulk_transition',
+                total=len(names),
+                doctype=doctype,
+                names=names,
+                status=status,
+                workflow_state=workflow_state,
+                chunk_size=cint(chunk_size)
+            )
+            frappe.response['message'] = {
+                'success': True,
+                'job_id': job_id,
+                'total': len(names),
+                'message': _('Bulk transition queued')
+            }
+            return
+        
+        results = transition_documents(doctype, names, status, workflow_state, cint(chunk_size))
+        
+        frappe.response['message'] = {
+            'success': True,
+            'results': results,
+            'succeeded': sum(1 for result in results if result['success']),
+            'failed': sum(1 for result in results if not result['success'])
+        }
+        
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), 'Bulk Transition API Error')
+        frappe.response['message'] = {
+            'success': False,
+            'error': str(e)
+        }
+
+
+def transition_documents(doctype, names, status=None, workflow_state=None, chunk_size=200, job_id=None):
+    """Apply a status and/or workflow state to names in committed chunks, returning per-row results"""
+    from frappe.model.workflow import apply_workflow, get_transitions, get_workflow_name
+    from asset_lite.api.patch_api import apply_partial_update
+    
+    status_field = TRANSITION_STATUS_FIELDS[doctype]
+    workflow_name = get_workflow_name(doctype)
+    state_field = frappe.get_cached_value('Workflow', workflow_name, 'workflow_state_field') if workflow_name else 'workflow_state'
+    
+    # One permission query for every name instead of has_permission per document
+    permitted = set(frappe.get_list(doctype, filters={'name': ['in', list(set(names))]}, pluck='name', limit_page_length=0))
+    
+    values = {}
+    if status:
+        values[status_field] = status
+    if workflow_state and not workflow_name:
+        values[state_field] = workflow_state
+    
+    def transition(name):
+        if name not in permitted:
+            frappe.throw(_('Not permitted to update {0}').format(name), frappe.PermissionError)
+        
+        if values and apply_partial_update(doctype, name, values) is None:
+            doc = frappe.get_doc(doctype, name)
+            doc.update(values)
+            doc.save()
+        
+        if workflow_state and workflow_name:
+            doc = frappe.get_doc(doctype, name)
+            if doc.get(state_field) != workflow_state:
+                next_transition = next((t for t in get_transitions(doc) if t.next_state == workflow_state), None)
+                if not next_transition:
+                    frappe.throw(_('No workflow transition from {0} to {1}').format(doc.get(state_field), workflow_state))
+                apply_workflow(doc, next_transition.action)
+        
+        return {'name': name}
+    
+    def notify(chunk_results):
+        succeeded = [result['name'] for result in chunk_results if result['success']]
+        if succeeded:
+            frappe.enqueue(
+                'asset_lite.api.bulk_api.notify_bulk_transition',
+                doctype=doctype,
+                names=succeeded,
+                state=workflow_state or status,
+                from_user=frappe.session.user
+            )
+    
+    results = process_in_chunks(names, transition, chunk_size, job_id, after_chunk=notify)
+    for result in results:
+        result['name'] = names[result['index']]
+    return results
+
+
+def notify_bulk_transition(doctype, names, state, from_user):
+    """Background job: one notification per document owner for a transitioned chunk"""
+    from frappe.desk.doctype.notification_log.notification_log import make_notification_logs
+    
+    owners = {}
+    for row in frappe.get_all(doctype, filters={'name': ['in', names]}, fields=['name', 'owner']):
+        if row.owner != from_user:
+            owners.setdefault(row.owner, []).append(row.name)
+    
+    for owner, owned in owners.items():
+        make_notification_logs({
+            'type': 'Alert',
+            'document_type': doctype,
+            'document_name': owned[0],
+            'from_user': from_user,
+            'subject': _('{0} {1} moved to {2}: {3}').format(len(owned), _(doctype), state, ', '.join(owned[:10]))
+        }, [owner])
+    
+    frappe.publish_realtime('list_update', {'doctype': doctype}, after_commit=True)
+
+
+def run_bulk_transition(bulk_job_id, doctype, names, status=None, workflow_state=None, chunk_size=200):
+    """Background job entry point for bulk_transition"""
+    run_bulk_job(
+        bulk_job_id,
+        lambda: transition_documents(doctype, names, status, workflow_state, chunk_size, bulk_job_id)
+    )
@@ -3,6 +3,8 @@ from frappe import _
 from frappe.utils import now, today, get_datetime
 import json
 
+from asset_lite.api.projections import get_list_fields
+
 @frappe.whitelist(allow_guest=False)
 def get_user_details(user_id=None):
     """
@@ -39,9 +41,11 @@ def get_user_details(user_id=None):
         frappe.response.status_code = 500
 
 @frappe.whitelist(allow_guest=False)
-def get_doctype_records(doctype, filters=None, fields=None, limit=20, offset=0):
+def get_doctype_records(doctype, filters=None, fields=None, limit=20, offset=0, profile=None):
     """
     Get records from any DocType with filtering and pagination
+    Without fields, the "table" projection profile is returned; pass profile
+    "card" or "full" for a narrower or the complete row
     Usage: /api/method/asset_lite.api.custom_api.get_doctype_records
     """
     try:
@@ -58,7 +62,7 @@ def get_doctype_records(doctype, filters=None, fields=None, limit=20, offset=0):
         records = frappe.get_list(
             doctype,
             filters=query_filters,
-            fields=fields or ["*"],
+            fields=get_list_fields(doctype, fields, profile),
             limit=limit,
             start=offset,
             order_by="creation desc"
@@ -0,0 +1,102 @@
+import json
+
+import frappe
+from frappe import _
+
+# Cached document payloads are dropped after this many seconds even if unchanged
+DETAIL_CACHE_TTL = 60 * 60
+
+
+def get_detail_cache_key(doctype, name):
+    return f"asset_lite_detail:{doctype}:{name}"
+
+
+def get_child_tables(doctype):
+    """Table fieldname -> child doctype"""
+    return {df.fieldname: df.options for df in frappe.get_meta(doctype).get_table_fields()}
+
+
+def parse_expand(doctype, expand=None):
+    """
+    Child tables to include in a detail response
+
+    Args:
+        doctype: Parent DocType
+        expand: None or "*" for every child table, "" or [] for none, or a JSON
+            string list / comma separated string / list of table fieldnames
+
+    Returns:
+        List of table fieldnames
+    """
+    tables = get_child_tables(doctype)
+    if expand is None or expand == "*":
+        return list(tables)
+
+    if isinstance(expand, str):
+        expand = expand.strip()
+        expand = json.loads(expand) if expand.startswith("[") else [field.strip() for field in expand.split(",")]
+
+    expand = [field for field in expand if field]
+    unknown = [field for field in expand if field not in tables]
+    if unknown:
+        frappe.throw(_("Unknown child tables for {0}: {1}").format(_(doctype), ", ".join(unknown)))
+    return list(dict.fromkeys(expand))
+
+
+def get_child_rows(doctype, name, fieldname, child_doctype):
+    rows = frappe.db.get_all(
+        child_doctype,
+        filters={"parent": name, "parenttype": doctype, "parentfield": fieldname},
+        fields=["*"],
+        order_by="idx asc",
+    )
+    for row in rows:
+        row["doctype"] = child_doctype
+    return rows
+
+
+def get_document_details(doctype, name, expand=None):
+    """
+    Parent fields of a document plus the requested child tables, in the shape of doc.as_dict()
+
+    The parent row is read with a single query and every requested child
+    table with one query of its own; tables that are not requested are never
+    read. Parent and tables are cached per document and reused while the
+    document's modified timestamp is unchanged, so only a cheap lookup of
+    modified is needed on a hit. The caller checks read permission.
+
+    Args:
+        doctype: Parent DocType
+        name: Document name
+        expand: Child tables to include (see parse_expand)
+
+    Returns:
+        Dictionary of parent fields and the requested child tables
+    """
+    expand = parse_expand(doctype, expand)
+    modified = frappe.db.get_value(doctype, name, "modified")
+    if modified is None:
+        raise frappe.DoesNotExistError(_("{0} {1} not found").format(_(doctype), name))
+
+    key = get_detail_cache_key(doctype, name)
+    cached = frappe.cache().get_value(key)
+    changed = False
+    if not cached or cached["modified"] != modified:
+        parent = frappe.db.get_value(doctype, name, "*", as_dict=True)
+        parent["doctype"] = doctype
+        cached = {"modified": parent.modified, "parent": parent, "tables": {}}
+        changed = True
+
+    tables = get_child_tables(doctype)
+    for fieldname in expand:
+        if fieldname not in cached["tables"]:
+            cached["tables"][fieldname] = get_child_rows(doctype, name, fieldname, tables[fieldname])
+            changed = True
+
+    if changed:
+        frappe.cache().set_value(key, cached, expires_in_sec=DETAIL_CACHE_TTL)
+
+    details = frappe._dict(cached["parent"])
+    for fieldname in expand:
+        details[fieldname] = cached["tables"][fieldname]
+    return details
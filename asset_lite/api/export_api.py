@@ -0,0 +1,188 @@
+import csv
+import io
+import json
+import os
+
+import frappe
+from frappe import _
+from werkzeug.wrappers import Response
+
+from asset_lite.api.projections import get_list_fields
+
+# Doctypes that can be exported in full
+EXPORT_DOCTYPES = ("Asset", "Work_Order", "Asset Maintenance Log", "Asset Maintenance")
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+# Rows written to the response or file per chunk
+EXPORT_CHUNK_SIZE = 1000
+
+
+def get_export_query(doctype, filters=None, fields=None, profile="full"):
+    """
+    SQL for an export, with the session user's permission conditions applied
+
+    The query is built by frappe.get_list, so it matches what the list
+    endpoints would return, just without a page limit.
+    """
+    return frappe.get_list(
+        doctype,
+        filters=filters or {},
+        fields=get_list_fields(doctype, fields, profile),
+        order_by="name asc",
+        limit_page_length=0,
+        run=False,
+    )
+
+
+def iter_export_chunks(query, file_format="ndjson", chunk_size=EXPORT_CHUNK_SIZE, on_chunk=None):
+    """
+    Run query on an unbuffered (server-side) cursor and yield the rows
+    encoded as NDJSON or CSV, chunk_size rows at a time
+
+    Only one chunk is held in memory regardless of how many rows match.
+    on_chunk, if given, is called with the number of rows written so far.
+    """
+    buffer = io.StringIO()
+    writer = None
+    count = 0
+
+    with frappe.db.unbuffered_cursor():
+        for row in frappe.db.sql(query, as_dict=True, as_iterator=True):
+            if file_format == "csv":
+                if writer is None:
+                    writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+                    writer.writeheader()
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(row, default=str, separators=(",", ":")))
+                buffer.write("\n")
+
+            count += 1
+            if count % chunk_size == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+                if on_chunk:
+                    on_chunk(count)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+    if on_chunk:
+        on_chunk(count)
+
+
+def stream_export(site, query, file_format):
+    """
+    Response body generator. Frappe closes the request's connection before
+    the body is sent, so the rows are read on a connection of their own.
+    """
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        yield from iter_export_chunks(query, file_format)
+    finally:
+        frappe.destroy()
+
+
+def validate_export(doctype, file_format):
+    if doctype not in EXPORT_DOCTYPES:
+        frappe.throw(_('Export is not supported for {0}').format(doctype))
+    if file_format not in EXPORT_FORMATS:
+        frappe.throw(_('Unsupported export format {0}').format(file_format))
+    if not frappe.has_permission(doctype, 'export'):
+        frappe.throw(_('Not permitted to export {0}').format(_(doctype)), frappe.PermissionError)
+
+
+@frappe.whitelist()
+def export_records(doctype, file_format="ndjson", filters=None, fields=None, profile="full", to_file=False):
+    """
+    Export every matching row of a doctype as NDJSON or CSV
+
+    The response is streamed chunk by chunk from a server-side cursor, so
+    memory use does not grow with the number of rows. With to_file the export
+    runs as a background job instead and writes a private File.
+
+    Args:
+        doctype: "Asset", "Work_Order", "Asset Maintenance Log" or "Asset Maintenance"
+        file_format: "ndjson" (default) or "csv"
+        filters: JSON string of filters (e.g., '{"company": "ABC Corp"}')
+        fields: JSON string list of fields (default: the profile's fields)
+        profile: Projection profile used when fields is not given (default: "full")
+        to_file: Queue the export and return a job id to poll with
+            asset_lite.api.bulk_api.get_bulk_job_status; the finished job
+            reports the file_url
+
+    Returns:
+        A streamed NDJSON/CSV response, or {"success": bool, "job_id": str} with to_file
+    """
+    from frappe.utils import cint
+    from asset_lite.api.bulk_api import enqueue_bulk_job
+
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    if isinstance(fields, str):
+        fields = json.loads(fields)
+
+    validate_export(doctype, file_format)
+    query = get_export_query(doctype, filters, fields, profile)
+
+    if cint(to_file):
+        job_id = enqueue_bulk_job(
+            'asset_lite.api.export_api.run_export_to_file',
+            total=None,
+            doctype=doctype,
+            query=query,
+            file_format=file_format
+        )
+        frappe.response['message'] = {
+            'success': True,
+            'job_id': job_id,
+            'message': _('Export queued')
+        }
+        return
+
+    mimetype, extension = EXPORT_FORMATS[file_format]
+    response = Response(stream_export(frappe.local.site, query, file_format), mimetype=mimetype, direct_passthrough=True)
+    response.headers["Content-Disposition"] = f'attachment; filename="{frappe.scrub(doctype)}.{extension}"'
+    return response
+
+
+def run_export_to_file(bulk_job_id, doctype, query, file_format):
+    """Background job entry point for export_records with to_file"""
+    from asset_lite.api.bulk_api import set_job_progress
+
+    set_job_progress(bulk_job_id, status="Running")
+    _mimetype, extension = EXPORT_FORMATS[file_format]
+    file_name = f"{frappe.scrub(doctype)}-{bulk_job_id}.{extension}"
+
+    path = frappe.get_site_path("private", "files", file_name)
+
+    try:
+        with open(path, "wb") as f:
+            for chunk in iter_export_chunks(
+                query, file_format, on_chunk=lambda count: set_job_progress(bulk_job_id, processed=count)
+            ):
+                f.write(chunk)
+
+        file_doc = frappe.get_doc({
+            "doctype": "File",
+            "file_name": file_name,
+            "file_url": f"/private/files/{file_name}",
+            "file_size": os.path.getsize(path),
+            "is_private": 1
+        })
+        # Hashing the content would read the whole export back into memory
+        file_doc.flags.ignore_duplicate_entry_error = True
+        file_doc.insert(ignore_permissions=True)
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), 'Export Records Error')
+        set_job_progress(bulk_job_id, status="Failed", error=str(e))
+        return
+
+    set_job_progress(bulk_job_id, status="Completed", file_url=file_doc.file_url)
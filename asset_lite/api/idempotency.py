@@ -0,0 +1,80 @@
+import hashlib
+import json
+
+import frappe
+from frappe import _
+
+# Responses of completed requests are replayed for this many seconds
+IDEMPOTENCY_TTL = 24 * 60 * 60
+# A claimed key whose request never finished becomes free again after this
+IDEMPOTENCY_LOCK_TTL = 5 * 60
+
+IN_PROGRESS = "in-progress"
+
+
+def get_idempotency_key():
+    """Idempotency-Key request header, or an idempotency_key form value"""
+    return frappe.get_request_header("Idempotency-Key") or frappe.form_dict.get("idempotency_key")
+
+
+def get_payload_fingerprint(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def claim_idempotency_key(endpoint, payload):
+    """
+    Claim the request's Idempotency-Key for endpoint, or find the response it already produced
+
+    The claim is a single Redis SET NX, so concurrent retries of the same key
+    cannot both run the insert. Keys are scoped to the user and endpoint.
+
+    Args:
+        endpoint: Name of the create endpoint
+        payload: Parsed request data, used to reject a key reused for a different body
+
+    Returns:
+        (cache_key, stored_response). cache_key is None when the request has no
+        key; stored_response is set when the request is a retry of a finished one.
+    """
+    key = get_idempotency_key()
+    if not key:
+        return None, None
+
+    cache_key = frappe.cache().make_key(f"asset_lite_idempotency:{frappe.session.user}:{endpoint}:{key}")
+    fingerprint = get_payload_fingerprint(payload)
+    claim = json.dumps({"status": IN_PROGRESS, "fingerprint": fingerprint})
+
+    if frappe.cache().set(cache_key, claim, nx=True, ex=IDEMPOTENCY_LOCK_TTL):
+        return cache_key, None
+
+    stored = frappe.cache().get(cache_key)
+    if not stored:
+        # The previous claim expired between the two calls
+        return claim_idempotency_key(endpoint, payload)
+
+    stored = json.loads(stored)
+    if stored["fingerprint"] != fingerprint:
+        frappe.throw(_("Idempotency-Key {0} was already used with a different request").format(key))
+    if stored["status"] == IN_PROGRESS:
+        frappe.throw(_("A request with Idempotency-Key {0} is still in progress").format(key))
+
+    return None, stored["response"]
+
+
+def store_idempotent_response(cache_key, response):
+    """Keep the response of a finished request so retries replay it"""
+    if not cache_key:
+        return
+
+    stored = json.loads(frappe.cache().get(cache_key) or "{}")
+    frappe.cache().set(
+        cache_key,
+        frappe.as_json({"status": "done", "fingerprint": stored.get("fingerprint"), "response": response}, indent=None),
+        ex=IDEMPOTENCY_TTL,
+    )
+
+
+def release_idempotency_key(cache_key):
+    """Free a claimed key after a failed request so the client can retry it"""
+    if cache_key:
+        frappe.cache().delete(cache_key)
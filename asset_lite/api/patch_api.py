@@ -0,0 +1,181 @@
+import frappe
+from frappe import _
+from frappe.model.workflow import get_workflow_name
+from frappe.utils import cstr, getdate, nowdate
+from frappe.utils.data import cast
+
+# Fields that can be written with a targeted column update instead of a full
+# get_doc / validate / save, per doctype. "hooks" lists the doc_events handlers
+# still run after the update together with the fields that trigger them, and
+# "validate" mirrors the controller checks that involve the declared fields.
+PATCH_PROFILES = {
+    # repair_status, completion_date and penalty drive the Work_Order After Save
+    # server scripts (asset Up/Down, warranty extension) and the downtime and
+    # penalty hooks, so they always go through a full save
+    "Work_Order": {
+        "fields": {
+            "workflow_state", "first_responded_on", "job_completed", "actions_performed", "description",
+            "customer_comments", "total_hours_spent", "feedback_rating",
+        },
+    },
+    "Asset Maintenance Log": {
+        "fields": {
+            "maintenance_status", "completion_date", "actions_performed", "workflow_state",
+            "custom_pm_overdue_reason", "custom_early_completion_reason", "custom_serviced_by",
+            "custom_total_main_hour_at_site", "custom_total_travel_hour", "custom_total_hours",
+        },
+        "validate": "asset_lite.api.patch_api.validate_maintenance_log_patch",
+    },
+    # custom_total_amount and custom_price_per_pm are recomputed by a Before Save server script
+    "Asset Maintenance": {
+        "fields": {
+            "custom_site_contractor", "custom_subcontractor", "custom_warranty_status",
+            "custom_service_contract_status",
+        },
+    },
+    # Uptime, downtime and total hours are computed by asset_lite.downtime
+    "Asset": {
+        "fields": {
+            "custom_device_status", "custom_room_number", "custom_comments",
+        },
+        "hooks": [
+            {
+                "method": "asset_lite.downtime.on_asset_update",
+                "fields": ("custom_device_status",),
+            },
+        ],
+    },
+}
+
+
+class PatchedDoc(frappe._dict):
+    """Parent row handed to doc_events hooks after a partial update"""
+
+    def __init__(self, row, before=None):
+        super().__init__(row)
+        object.__setattr__(self, "_doc_before_save", before)
+
+    def get_doc_before_save(self):
+        return self._doc_before_save
+
+
+def validate_maintenance_log_patch(current, values):
+    """Same status / completion date rules as AssetMaintenanceLog.validate"""
+    status = values.get("maintenance_status", current.maintenance_status)
+    completion_date = values.get("completion_date", current.completion_date)
+
+    if current.due_date and getdate(current.due_date) < getdate(nowdate()) and status not in ("Completed", "Cancelled"):
+        values["maintenance_status"] = "Overdue"
+    if status == "Completed" and not completion_date:
+        frappe.throw(_("Please select Completion Date for Completed Asset Maintenance Log"))
+    if status != "Completed" and completion_date:
+        frappe.throw(_("Please select Maintenance Status as Completed or remove Completion Date"))
+
+
+def get_patch_values(meta, current, data):
+    """
+    Cast data to the column types, or return None when a field cannot be patched
+
+    Fields missing from the doctype, or not allowed on submit for a submitted
+    document, leave the decision (and the error message) to the full save.
+    """
+    values = {}
+    for fieldname, value in data.items():
+        df = meta.get_field(fieldname)
+        if not df or (current.docstatus == 1 and not df.allow_on_submit):
+            return None
+
+        value = cast(df.fieldtype, value)
+        if df.fieldtype == "Select" and value and value not in (df.options or "").split("\n"):
+            frappe.throw(
+                _("{0} must be one of {1}").format(_(df.label), ", ".join((df.options or "").split("\n"))),
+                title=_("Invalid Value")
+            )
+        values[fieldname] = value
+    return values
+
+
+def apply_partial_update(doctype, name, data):
+    """
+    Update a document with targeted column writes when every field in data
+    is declared safe in PATCH_PROFILES
+
+    The row is locked and, when data carries "modified", compared against it
+    the same way Document.check_if_latest does. Only the hooks whose trigger
+    fields changed are run.
+
+    Args:
+        doctype: DocType name
+        name: Document name
+        data: Dictionary of fields to update, optionally with "modified"
+
+    Returns:
+        The updated parent row, or None when the caller has to fall back to a full save
+    """
+    profile = PATCH_PROFILES.get(doctype)
+    data = dict(data)
+    expected_modified = data.pop("modified", None)
+    if not profile or not data or not set(data) <= profile["fields"]:
+        return None
+
+    # Workflow transitions are validated by Document.save
+    workflow_name = get_workflow_name(doctype)
+    if workflow_name and frappe.get_cached_value("Workflow", workflow_name, "workflow_state_field") in data:
+        return None
+
+    current = frappe.db.get_value(doctype, name, "*", as_dict=True, for_update=True)
+    if not current:
+        frappe.throw(_("{0} {1} not found").format(_(doctype), name), frappe.DoesNotExistError)
+    if current.docstatus == 2:
+        return None
+
+    if expected_modified and cstr(current.modified) != cstr(expected_modified):
+        frappe.throw(
+            _("Error: Document has been modified after you have opened it")
+            + (f" ({current.modified}, {expected_modified}). ")
+            + _("Please refresh to get the latest document."),
+            frappe.TimestampMismatchError
+        )
+
+    meta = frappe.get_meta(doctype)
+    values = get_patch_values(meta, current, data)
+    if values is None:
+        return None
+
+    if profile.get("validate"):
+        frappe.get_attr(profile["validate"])(current, values)
+
+    changed = {fieldname: value for fieldname, value in values.items() if current.get(fieldname) != value}
+    if not changed:
+        return current
+
+    modified = frappe.utils.now_datetime()
+    frappe.db.set_value(
+        doctype, name,
+        {**changed, "modified": modified, "modified_by": frappe.session.user},
+        update_modified=False
+    )
+    frappe.clear_document_cache(doctype, name)
+
+    if meta.track_changes:
+        frappe.get_doc({
+            "doctype": "Version",
+            "ref_doctype": doctype,
+            "docname": name,
+            "data": frappe.as_json({
+                "changed": [[fieldname, current.get(fieldname), value] for fieldname, value in changed.items()],
+                "added": [],
+                "removed": [],
+                "row_changed": [],
+            })
+        }).insert(ignore_permissions=True)
+
+    before = PatchedDoc({**current, "doctype": doctype})
+    after = PatchedDoc({**current, **changed, "doctype": doctype, "modified": modified, "modified_by": frappe.session.user}, before)
+
+    method = "on_update_after_submit" if current.docstatus == 1 else "on_update"
+    for hook in profile.get("hooks", ()):
+        if set(hook["fields"]) & set(changed):
+            frappe.get_attr(hook["method"])(after, method)
+
+    return after
@@ -1,8 +1,14 @@
 import frappe
 from frappe import _
 
+from asset_lite.api.bulk_api import enqueue_bulk_job
+from asset_lite.api.details import get_document_details
+from asset_lite.api.idempotency import claim_idempotency_key, release_idempotency_key, store_idempotent_response
+from asset_lite.api.projections import get_list_fields
+from asset_lite.coverage import get_coverage_index
+
 @frappe.whitelist(allow_guest = True)
-def get_asset_maintenances(filters=None, fields=None, limit=20, offset=0, order_by=None):
+def get_asset_maintenances(filters=None, fields=None, limit=20, offset=0, order_by=None, profile=None):
     """
     Get list of asset maintenances (PPM schedules) with filters and pagination
     
@@ -12,6 +18,8 @@ def get_asset_maintenances(filters=None, fields=None, limit=20, offset=0, order_
         limit: Number of records to return (default: 20)
         offset: Number of records to skip (default: 0)
         order_by: Sort order (e.g., "creation desc")
+        profile: Projection profile used when fields is not given: "card", "table"
+            (default) or "full" (see asset_lite.api.projections)
     
     Returns:
         {
@@ -32,37 +40,9 @@ def get_asset_maintenances(filters=None, fields=None, limit=20, offset=0, order_
         if fields and isinstance(fields, str):
             import json
             fields = json.loads(fields)
-        else:
-            # Default fields to return
-            fields = [
-                'name',
-                'company',
-                'asset_name',
-                'custom_asset_type',
-                'asset_category',
-                'custom_type_of_maintenance',
-                'custom_asset_name',
-                'item_code',
-                'item_name',
-                'maintenance_team',
-                'custom_pm_schedule',
-                'maintenance_manager',
-                'maintenance_manager_name',
-                'custom_warranty',
-                'custom_warranty_status',
-                'custom_service_contract',
-                'custom_service_contract_status',
-                'custom_frequency',
-                'custom_total_amount',
-                'custom_no_of_pms',
-                'custom_price_per_pm',
-                'creation',
-                'modified',
-                'owner',
-                'modified_by',
-                'docstatus',
-                'idx'
-            ]
+        
+        # Explicit fields, or the requested projection profile
+        fields = get_list_fields('Asset Maintenance', fields, profile)
         
         # Get total count
         total_count = frappe.db.count('Asset Maintenance', filters=filters or {})
@@ -98,15 +78,17 @@ def get_asset_maintenances(filters=None, fields=None, limit=20, offset=0, order_
 
 
 @frappe.whitelist(allow_guest = True)
-def get_asset_maintenance_details(maintenance_name):
+def get_asset_maintenance_details(maintenance_name, expand=None):
     """
     Get detailed information about a specific asset maintenance (PPM schedule)
     
     Args:
         maintenance_name: Name/ID of the asset maintenance
+        expand: Child tables to include: JSON string list or comma separated fieldnames,
+            "" for none (default: all)
     
     Returns:
-        Asset Maintenance document with all fields including child tables
+        Asset Maintenance fields plus the requested child tables
     """
     try:
         if not maintenance_name:
@@ -116,10 +98,7 @@ def get_asset_maintenance_details(maintenance_name):
         if not frappe.has_permission('Asset Maintenance', 'read', maintenance_name):
             frappe.throw(_('Not permitted to access this asset maintenance'))
         
-        # Get asset maintenance details
-        maintenance = frappe.get_doc('Asset Maintenance', maintenance_name)
-        
-        frappe.response['message'] = maintenance.as_dict()
+        frappe.response['message'] = get_document_details('Asset Maintenance', maintenance_name, expand)
         
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), 'Get Asset Maintenance Details API Error')
@@ -136,9 +115,13 @@ def create_asset_maintenance(maintenance_data):
     Args:
         maintenance_data: JSON string containing asset maintenance fields
     
+    Send an Idempotency-Key header to make retries safe: a repeated key
+    returns the original response instead of creating another document.
+    
     Returns:
         Created asset maintenance document
     """
+    idempotency_key = None
     try:
         import json
         
@@ -146,6 +129,12 @@ def create_asset_maintenance(maintenance_data):
         if isinstance(maintenance_data, str):
             maintenance_data = json.loads(maintenance_data)
         
+        # Replay the original response for a retried request
+        idempotency_key, replay = claim_idempotency_key('create_asset_maintenance', maintenance_data)
+        if replay is not None:
+            frappe.response['message'] = replay
+            return
+        
         # Check if user has permission to create asset maintenance
         if not frappe.has_permission('Asset Maintenance', 'create'):
             frappe.throw(_('Not permitted to create asset maintenance'))
@@ -164,9 +153,11 @@ def create_asset_maintenance(maintenance_data):
             'asset_maintenance': maintenance.as_dict(),
             'message': _('Asset Maintenance created successfully')
         }
+        store_idempotent_response(idempotency_key, frappe.response['message'])
         
     except Exception as e:
         frappe.db.rollback()
+        release_idempotency_key(idempotency_key)
         frappe.log_error(frappe.get_traceback(), 'Create Asset Maintenance API Error')
         frappe.response['message'] = {
             'success': False,
@@ -184,10 +175,14 @@ def update_asset_maintenance(maintenance_name, maintenance_data):
         maintenance_data: JSON string containing fields to update
     
     Returns:
-        Updated asset maintenance document
+        Updated asset maintenance document. Updates touching only fields
+        declared in asset_lite.api.patch_api.PATCH_PROFILES are written without
+        a full save and return the parent fields only, with "partial": true.
+        Pass "modified" in maintenance_data to reject the update if it changed since.
     """
     try:
         import json
+        from asset_lite.api.patch_api import apply_partial_update
         
         if not maintenance_name:
             frappe.throw(_('Asset Maintenance name is required'))
@@ -200,6 +195,18 @@ def update_asset_maintenance(maintenance_name, maintenance_data):
         if not frappe.has_permission('Asset Maintenance', 'write', maintenance_name):
             frappe.throw(_('Not permitted to update this asset maintenance'))
         
+        # Declared fields skip loading and saving the maintenance tasks table
+        patched = apply_partial_update('Asset Maintenance', maintenance_name, maintenance_data)
+        if patched is not None:
+            frappe.db.commit()
+            frappe.response['message'] = {
+                'success': True,
+                'asset_maintenance': patched,
+                'partial': True,
+                'message': _('Asset Maintenance updated successfully')
+            }
+            return
+        
         # Get and update asset maintenance
         maintenance = frappe.get_doc('Asset Maintenance', maintenance_name)
         
@@ -526,9 +533,11 @@ def get_active_service_contracts(filters=None, limit=20, offset=0):
         if filters and isinstance(filters, str):
             additional_filters = json.loads(filters)
         
-        # Combine filters - get maintenances with service contract = 1
+        # Combine filters - get maintenances with service contract = 1 that
+        # is in force; coverage.update_coverage_statuses keeps the status current
         combined_filters = {
             'custom_service_contract': 1,
+            'custom_service_contract_status': 'Active',
             **additional_filters
         }
         
@@ -563,3 +572,109 @@ def get_active_service_contracts(filters=None, limit=20, offset=0):
             'asset_maintenances': [],
             'total_count': 0
         }
+
+
+@frappe.whitelist(allow_guest = True)
+def get_expiring_contracts(days=30, kinds=None, limit=20, offset=0):
+    """
+    Get warranties and service contracts ending within the next days
+    
+    Args:
+        days: Look-ahead in days, from today (default: 30)
+        kinds: Optional JSON list or comma-separated string of coverage kinds
+               (Warranty, Extended Warranty, Service Contract)
+        limit: Number of records to return (default: 20)
+        offset: Number of records to skip (default: 0)
+    
+    Returns:
+        Coverage windows ending soonest first, with the days left
+    """
+    try:
+        import json
+        
+        if kinds and isinstance(kinds, str):
+            kinds = json.loads(kinds) if kinds.strip().startswith('[') else [kind.strip() for kind in kinds.split(',')]
+        
+        today = frappe.utils.getdate()
+        to_date = frappe.utils.add_days(today, int(days))
+        
+        # Bisected from the cached coverage index; no table scan
+        windows = get_coverage_index().ending_between(today, to_date, kinds)
+        total_count = len(windows)
+        page = windows[int(offset):int(offset) + int(limit)]
+        
+        frappe.response['message'] = {
+            'contracts': [
+                {
+                    **window._asdict(),
+                    'days_left': frappe.utils.date_diff(window.end_date, today)
+                }
+                for window in page
+            ],
+            'total_count': total_count,
+            'limit': int(limit),
+            'offset': int(offset),
+            'has_more': (int(offset) + int(limit)) < total_count
+        }
+        
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), 'Get Expiring Contracts API Error')
+        frappe.response['message'] = {
+            'error': str(e),
+            'contracts': [],
+            'total_count': 0
+        }
+
+
+@frappe.whitelist(allow_guest = True)
+def generate_monthly_ppms(month, year, hospital=None):
+    """
+    Queue creation of the missing PPM documents of a month's maintenance logs
+    
+    Every Planned, Overdue or Completed Asset Maintenance Log due in the month
+    that has no PPM yet gets one, pre-filled from its checklist template.
+    
+    Args:
+        month: Month number or name (e.g. 10 or "October")
+        year: Year
+        hospital: Optional company (hospital) of the logs
+    
+    Returns:
+        {"success": bool, "job_id": str}; poll get_bulk_job_status for
+        "created" and the created "ppms"
+    """
+    try:
+        from asset_lite.ppm_generation import acquire_generation_lock, get_month_number, release_generation_lock
+        
+        if not frappe.has_permission('PPM', 'create'):
+            frappe.throw(_('Not permitted to create {0}').format(_('PPM')))
+        
+        month, year = get_month_number(month), frappe.utils.cint(year)
+        
+        # Double clicks and retries must not create every PPM twice; the job releases the lock
+        if not acquire_generation_lock(month, year):
+            frappe.throw(_('PPMs of {0}-{1:02d} are already being generated').format(year, month))
+        
+        try:
+            job_id = enqueue_bulk_job(
+                'asset_lite.ppm_generation.run_monthly_ppm_generation',
+                total=None,
+                month=month,
+                year=year,
+                hospital=hospital
+            )
+        except Exception:
+            release_generation_lock(month, year)
+            raise
+        frappe.response['message'] = {
+            'success': True,
+            'job_id': job_id,
+            'message': _('PPM generation queued')
+        }
+        
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), 'Generate Monthly PPMs API Error')
+        frappe.response['message'] = {
+            'success': False,
+            'error': str(e)
+        }
@@ -0,0 +1,160 @@
+import re
+
+import frappe
+from frappe import _
+from frappe.model import default_fields
+
+# Named field sets for the list endpoints, per doctype. "card" is enough for a
+# mobile list row, "table" is the default list/grid view and "full" is the wide
+# projection the endpoints returned before profiles existed.
+PROJECTION_PROFILES = {
+    "Work_Order": {
+        "card": [
+            'name', 'asset', 'asset_name', 'repair_status', 'custom_priority_', 'failure_date',
+            'workflow_state', 'modified'
+        ],
+        "table": [
+            'name', 'company', 'work_order_type', 'asset_type', 'asset', 'asset_name', 'department',
+            'repair_status', 'custom_priority_', 'supplier', 'model', 'serial_number', 'failure_date',
+            'first_responded_on', 'completion_date', 'total_hours_spent', 'workflow_state',
+            'creation', 'modified', 'docstatus'
+        ],
+        "full": [
+            'name', 'company', 'naming_series', 'work_order_type', 'asset_type', 'manufacturer',
+            'serial_number', 'custom_priority_', 'asset', 'custom_maintenance_manager', 'department',
+            'repair_status', 'asset_name', 'supplier', 'custom_pending_reason', 'model',
+            'custom_site_contractor', 'custom_subcontractor', 'custom_service_agreement',
+            'custom_service_coverage', 'custom_start_date', 'custom_end_date', 'custom_total_amount',
+            'warranty', 'service_contract', 'covering_spare_parts', 'spare_parts_labour',
+            'covering_labour', 'ppm_only', 'failure_date', 'total_hours_spent', 'job_completed',
+            'custom_difference', 'custom_vendors_hrs', 'custom_deadline_date', 'custom_diffrence',
+            'feedback_rating', 'first_responded_on', 'penalty', 'custom_assigned_supervisor',
+            'stock_consumption', 'need_procurement', 'repair_cost', 'total_repair_cost',
+            'capitalize_repair_cost', 'increase_in_asset_life', 'description', 'actions_performed',
+            'bio_med_dept', 'workflow_state', 'creation', 'modified', 'owner', 'modified_by',
+            'docstatus', 'idx'
+        ],
+    },
+    "Asset Maintenance Log": {
+        "card": [
+            'name', 'asset_name', 'custom_asset_names', 'task_name', 'maintenance_status', 'due_date',
+            'workflow_state', 'modified'
+        ],
+        "table": [
+            'name', 'asset_maintenance', 'asset_name', 'custom_asset_names', 'custom_asset_type',
+            'custom_hospital_name', 'task_name', 'maintenance_type', 'periodicity', 'maintenance_status',
+            'assign_to_name', 'due_date', 'completion_date', 'workflow_state', 'creation', 'modified',
+            'docstatus'
+        ],
+        "full": [
+            'name', 'asset_maintenance', 'naming_series', 'asset_name', 'custom_asset_type', 'item_code',
+            'item_name', 'custom_asset_names', 'custom_hospital_name', 'task', 'task_name',
+            'maintenance_type', 'periodicity', 'has_certificate', 'custom_early_completion',
+            'maintenance_status', 'custom_pm_overdue_reason', 'custom_accepted_by_moh', 'assign_to_name',
+            'due_date', 'custom_accepted_by_moh_', 'custom_template', 'workflow_state', 'creation',
+            'modified', 'owner', 'modified_by', 'docstatus', 'idx'
+        ],
+    },
+    "Asset Maintenance": {
+        "card": [
+            'name', 'asset_name', 'custom_asset_name', 'company', 'custom_type_of_maintenance',
+            'custom_frequency', 'modified'
+        ],
+        "table": [
+            'name', 'company', 'asset_name', 'custom_asset_name', 'custom_asset_type', 'asset_category',
+            'custom_type_of_maintenance', 'maintenance_team', 'maintenance_manager_name',
+            'custom_warranty_status', 'custom_service_contract_status', 'custom_frequency',
+            'custom_no_of_pms', 'creation', 'modified', 'docstatus'
+        ],
+        "full": [
+            'name', 'company', 'asset_name', 'custom_asset_type', 'asset_category',
+            'custom_type_of_maintenance', 'custom_asset_name', 'item_code', 'item_name',
+            'maintenance_team', 'custom_pm_schedule', 'maintenance_manager', 'maintenance_manager_name',
+            'custom_warranty', 'custom_warranty_status', 'custom_service_contract',
+            'custom_service_contract_status', 'custom_frequency', 'custom_total_amount',
+            'custom_no_of_pms', 'custom_price_per_pm', 'creation', 'modified', 'owner', 'modified_by',
+            'docstatus', 'idx'
+        ],
+    },
+}
+
+PROJECTION_CACHE_TTL = 60 * 60
+
+DEFAULT_PROFILE = "table"
+
+FIELDNAME_PATTERN = re.compile(r"^\w+$")
+
+
+def get_projection_cache_key(doctype, profile):
+    return f"asset_lite_projection:{doctype}:{profile}"
+
+
+def get_meta_profile(meta, profile):
+    """Profile for a doctype missing from PROJECTION_PROFILES, derived from its list view settings"""
+    if profile == "full":
+        return ["*"]
+
+    fields = ["name"]
+    if meta.title_field:
+        fields.append(meta.title_field)
+    fields += [df.fieldname for df in meta.fields if df.in_list_view]
+    if profile == "table":
+        fields += [df.fieldname for df in meta.fields if df.in_standard_filter]
+        fields += ["creation", "modified", "docstatus"]
+    else:
+        fields.append("modified")
+    return fields
+
+
+def get_projection(doctype, profile=DEFAULT_PROFILE):
+    """
+    Fields of a named projection profile, validated against the DocType meta
+
+    Fields the site does not have (e.g. a custom field that was never
+    installed) are dropped instead of failing the query. The result is cached
+    until the doctype's custom fields change.
+
+    Args:
+        doctype: DocType name
+        profile: "card", "table" or "full"
+    """
+    if profile not in ("card", "table", "full"):
+        frappe.throw(_("Unknown projection profile {0}").format(profile))
+
+    key = get_projection_cache_key(doctype, profile)
+    fields = frappe.cache().get_value(key)
+    if fields is None:
+        meta = frappe.get_meta(doctype)
+        fields = PROJECTION_PROFILES.get(doctype, {}).get(profile) or get_meta_profile(meta, profile)
+        fields = list(dict.fromkeys(
+            field for field in fields
+            if field == "*" or field in default_fields or meta.has_field(field)
+        ))
+        frappe.cache().set_value(key, fields, expires_in_sec=PROJECTION_CACHE_TTL)
+    return fields
+
+
+def get_list_fields(doctype, fields=None, profile=None):
+    """
+    Fields for a list endpoint: an explicit sparse fieldset, or a projection profile
+
+    Plain fieldnames in an explicit list must exist on the doctype; unknown
+    ones are rejected so typos surface instead of failing deep in the query.
+    """
+    if not fields:
+        return get_projection(doctype, profile or DEFAULT_PROFILE)
+
+    meta = frappe.get_meta(doctype)
+    unknown = [
+        field for field in fields
+        if FIELDNAME_PATTERN.match(field) and field not in default_fields and not meta.has_field(field)
+    ]
+    if unknown:
+        frappe.throw(_("Unknown fields for {0}: {1}").format(_(doctype), ", ".join(unknown)))
+    return fields
+
+
+def clear_projection_cache(doc, method=None):
+    """Custom Field hook: projections of the changed doctype are validated again"""
+    for profile in ("card", "table", "full"):
+        frappe.cache().delete_value(get_projection_cache_key(doc.dt, profile))
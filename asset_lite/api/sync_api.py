@@ -0,0 +1,184 @@
+import base64
+import gzip
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import add_to_date, now_datetime
+
+from asset_lite.api.userperm_api import get_permission_filters
+from asset_lite.downtime import DOWNTIME_TOTAL_FIELDS
+
+# Doctypes the mobile app can sync
+SYNC_DOCTYPES = ("Work_Order", "Asset Maintenance Log", "Asset Maintenance", "Asset")
+
+# Fields that change without modified, so a synced copy would go stale; read
+# them with the document details instead
+SYNC_EXCLUDED_FIELDS = {"Asset": DOWNTIME_TOTAL_FIELDS}
+
+# Rows modified within the last 10 minutes are left for a later sync, so a
+# transaction that commits late with an older timestamp is never skipped. It
+# must outlast the longest transaction: web requests time out after 2 minutes,
+# but a bulk job chunk of full document saves can hold one open for several.
+SYNC_SAFETY_LAG = 10 * 60
+
+SYNC_PAGE_LENGTH = 500
+
+
+def encode_sync_token(cursors):
+    return base64.urlsafe_b64encode(json.dumps(cursors, separators=(",", ":")).encode()).decode()
+
+
+def decode_sync_token(token):
+    try:
+        return json.loads(base64.urlsafe_b64decode(token.encode()))
+    except Exception:
+        frappe.throw(_("Invalid sync token"))
+
+
+def get_scope_filters(doctype):
+    """userperm_api restrictions of the session user for doctype, limited to existing columns"""
+    meta = frappe.get_meta(doctype)
+    return {
+        fieldname: condition
+        for fieldname, condition in get_permission_filters(doctype)["filters"].items()
+        if meta.has_field(fieldname)
+    }
+
+
+def get_changed_rows(doctype, cursor, upto, page_length):
+    """
+    Next page of rows modified after cursor, ordered by (modified, name)
+
+    Args:
+        cursor: [modified, name] of the last row already synced, or None
+        upto: Upper bound on modified for this sync
+    """
+    filters = [["modified", "<=", upto]]
+    filters += [[fieldname, *condition] for fieldname, condition in get_scope_filters(doctype).items()]
+    or_filters = None
+    if cursor:
+        filters.append(["modified", ">=", cursor[0]])
+        or_filters = [["modified", ">", cursor[0]], ["name", ">", cursor[1]]]
+
+    return frappe.get_list(
+        doctype,
+        filters=filters,
+        or_filters=or_filters,
+        fields=["*"],
+        order_by="modified asc, name asc",
+        limit_page_length=page_length + 1,
+    )
+
+
+def get_deleted_rows(doctypes, cursor, upto, page_length):
+    """Next page of Deleted Document entries for doctypes, ordered by (creation, name)"""
+    values = {"doctypes": doctypes, "upto": upto, "creation": cursor[0], "name": cursor[1], "limit": page_length + 1}
+    rows = frappe.db.sql("""
+        SELECT name, creation, deleted_doctype, deleted_name, data
+        FROM `tabDeleted Document`
+        WHERE deleted_doctype IN %(doctypes)s
+            AND creation <= %(upto)s
+            AND (creation > %(creation)s OR (creation = %(creation)s AND name > %(name)s))
+        ORDER BY creation ASC, name ASC
+        LIMIT %(limit)s
+    """, values, as_dict=True)
+
+    # Deletions of documents outside the user's restrictions are not reported
+    scopes = {doctype: get_scope_filters(doctype) for doctype in doctypes}
+    for row in rows:
+        scope = scopes[row.deleted_doctype]
+        data = json.loads(row.data or "{}") if scope else {}
+        row.visible = all(data.get(fieldname) in condition[1] for fieldname, condition in scope.items())
+    return rows
+
+
+@frappe.whitelist(allow_guest = True)
+def sync_changes(doctypes=None, since_token=None, page_length=SYNC_PAGE_LENGTH, compress=False):
+    """
+    Rows created, modified or deleted since the last sync
+
+    Call without since_token for the first sync, then keep passing back
+    next_token. While has_more is true, call again straight away to fetch the
+    next page. Changes of the last SYNC_SAFETY_LAG seconds arrive with a later
+    sync. Rows are limited by the user's userperm_api restrictions and
+    returned column-wise to keep the payload small.
+
+    Args:
+        doctypes: JSON string list of doctypes (default: all of SYNC_DOCTYPES)
+        since_token: next_token of the previous call
+        page_length: Maximum rows per doctype per call (default: 500)
+        compress: Return the payload gzipped and base64 encoded under "data"
+
+    Returns:
+        {
+            "changes": {doctype: {"fields": [...], "rows": [[...], ...]}},
+            "deleted": {doctype: [name, ...]},
+            "next_token": str,
+            "has_more": bool
+        }
+    """
+    try:
+        from frappe.utils import cint
+
+        # Parse doctypes
+        if doctypes and isinstance(doctypes, str):
+            doctypes = json.loads(doctypes)
+        doctypes = doctypes or list(SYNC_DOCTYPES)
+
+        for doctype in doctypes:
+            if doctype not in SYNC_DOCTYPES:
+                frappe.throw(_('Sync is not supported for {0}').format(doctype))
+            if not frappe.has_permission(doctype, 'read'):
+                frappe.throw(_('Not permitted to read {0}').format(_(doctype)))
+
+        page_length = min(max(cint(page_length), 1), 5000)
+        upto = str(add_to_date(now_datetime(), seconds=-SYNC_SAFETY_LAG))
+        token = decode_sync_token(since_token) if since_token else {}
+        cursors = token.get("cursors", {})
+        # A first sync has nothing to delete locally, so deletions start now
+        deleted_cursor = token.get("deleted") or [upto, ""]
+
+        changes = {}
+        has_more = False
+        for doctype in doctypes:
+            rows = get_changed_rows(doctype, cursors.get(doctype), upto, page_length)
+            if len(rows) > page_length:
+                rows = rows[:page_length]
+                has_more = True
+            if rows:
+                fields = [field for field in rows[0] if field not in SYNC_EXCLUDED_FIELDS.get(doctype, ())]
+                changes[doctype] = {"fields": fields, "rows": [[row[field] for field in fields] for row in rows]}
+                cursors[doctype] = [str(rows[-1].modified), rows[-1].name]
+
+        deleted = {}
+        deleted_rows = get_deleted_rows(doctypes, deleted_cursor, upto, page_length)
+        if len(deleted_rows) > page_length:
+            deleted_rows = deleted_rows[:page_length]
+            has_more = True
+        for row in deleted_rows:
+            if row.visible:
+                deleted.setdefault(row.deleted_doctype, []).append(row.deleted_name)
+        if deleted_rows:
+            deleted_cursor = [str(deleted_rows[-1].creation), deleted_rows[-1].name]
+
+        payload = {
+            "changes": changes,
+            "deleted": deleted,
+            "next_token": encode_sync_token({"cursors": cursors, "deleted": deleted_cursor}),
+            "has_more": has_more
+        }
+
+        if cint(compress):
+            payload = {
+                "encoding": "gzip+base64",
+                "data": base64.b64encode(gzip.compress(frappe.as_json(payload, indent=None).encode())).decode()
+            }
+
+        frappe.response['message'] = payload
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), 'Sync Changes API Error')
+        frappe.response['message'] = {
+            'error': str(e)
+        }
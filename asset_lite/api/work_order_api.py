@@ -1,8 +1,13 @@
 import frappe
 from frappe import _
 
+from asset_lite.api.details import get_document_details
+from asset_lite.api.idempotency import claim_idempotency_key, release_idempotency_key, store_idempotent_response
+from asset_lite.api.projections import get_list_fields
+from asset_lite.coverage import resolve_coverage as resolve_asset_coverage, resolve_coverage_batch
+
 @frappe.whitelist(allow_guest = True)
-def get_work_orders(filters=None, fields=None, limit=20, offset=0, order_by=None):
+def get_work_orders(filters=None, fields=None, limit=20, offset=0, order_by=None, profile=None):
     """
     Get list of work orders with filters and pagination
     
@@ -12,6 +17,8 @@ def get_work_orders(filters=None, fields=None, limit=20, offset=0, order_by=None
         limit: Number of records to return (default: 20)
         offset: Number of records to skip (default: 0)
         order_by: Sort order (e.g., "creation desc")
+        profile: Projection profile used when fields is not given: "card", "table"
+            (default) or "full" (see asset_lite.api.projections)
     
     Returns:
         {
@@ -32,66 +39,9 @@ def get_work_orders(filters=None, fields=None, limit=20, offset=0, order_by=None
         if fields and isinstance(fields, str):
             import json
             fields = json.loads(fields)
-        else:
-            # Default fields to return
-            fields = [
-                'name',
-                'company',
-                'naming_series',
-                'work_order_type',
-                'asset_type',
-                'manufacturer',
-                'serial_number',
-                'custom_priority_',
-                'asset',
-                'custom_maintenance_manager',
-                'department',
-                'repair_status',
-                'asset_name',
-                'supplier',
-                'custom_pending_reason',
-                'model',
-                'custom_site_contractor',
-                'custom_subcontractor',
-                'custom_service_agreement',
-                'custom_service_coverage',
-                'custom_start_date',
-                'custom_end_date',
-                'custom_total_amount',
-                'warranty',
-                'service_contract',
-                'covering_spare_parts',
-                'spare_parts_labour',
-                'covering_labour',
-                'ppm_only',
-                'failure_date',
-                'total_hours_spent',
-                'job_completed',
-                'custom_difference',
-                'custom_vendors_hrs',
-                'custom_deadline_date',
-                'custom_diffrence',
-                'feedback_rating',
-                'first_responded_on',
-                'penalty',
-                'custom_assigned_supervisor',
-                'stock_consumption',
-                'need_procurement',
-                'repair_cost',
-                'total_repair_cost',
-                'capitalize_repair_cost',
-                'increase_in_asset_life',
-                'description',
-                'actions_performed',
-                'bio_med_dept',
-                'workflow_state',
-                'creation',
-                'modified',
-                'owner',
-                'modified_by',
-                'docstatus',
-                'idx'
-            ]
+        
+        # Explicit fields, or the requested projection profile
+        fields = get_list_fields('Work_Order', fields, profile)
         
         # Get total count
         total_count = frappe.db.count('Work_Order', filters=filters or {})
@@ -127,15 +77,17 @@ def get_work_orders(filters=None, fields=None, limit=20, offset=0, order_by=None
 
 
 @frappe.whitelist(allow_guest = True)
-def get_work_order_details(work_order_name):
+def get_work_order_details(work_order_name, expand=None):
     """
     Get detailed information about a specific work order
     
     Args:
         work_order_name: Name/ID of the work order
+        expand: Child tables to include: JSON string list or comma separated fieldnames
+            (e.g., '["table_cmqp"]' for spare parts), "" for none (default: all)
     
     Returns:
-        Work Order document with all fields including child tables
+        Work Order fields plus the requested child tables
     """
     try:
         if not work_order_name:
@@ -145,10 +97,7 @@ def get_work_order_details(work_order_name):
         if not frappe.has_permission('Work_Order', 'read', work_order_name):
             frappe.throw(_('Not permitted to access this work order'))
         
-        # Get work order details
-        work_order = frappe.get_doc('Work_Order', work_order_name)
-        
-        frappe.response['message'] = work_order.as_dict()
+        frappe.response['message'] = get_document_details('Work_Order', work_order_name, expand)
         
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), 'Get Work Order Details API Error')
@@ -165,9 +114,13 @@ def create_work_order(work_order_data):
     Args:
         work_order_data: JSON string containing work order fields
     
+    Send an Idempotency-Key header to make retries safe: a repeated key
+    returns the original response instead of creating another document.
+    
     Returns:
         Created work order document
     """
+    idempotency_key = None
     try:
         import json
         
@@ -175,6 +128,12 @@ def create_work_order(work_order_data):
         if isinstance(work_order_data, str):
             work_order_data = json.loads(work_order_data)
         
+        # Replay the original response for a retried request
+        idempotency_key, replay = claim_idempotency_key('create_work_order', work_order_data)
+        if replay is not None:
+            frappe.response['message'] = replay
+            return
+        
         # Check if user has permission to create work order
         if not frappe.has_permission('Work_Order', 'create'):
             frappe.throw(_('Not permitted to create work order'))
@@ -193,9 +152,11 @@ def create_work_order(work_order_data):
             'work_order': work_order.as_dict(),
             'message': _('Work Order created successfully')
         }
+        store_idempotent_response(idempotency_key, frappe.response['message'])
         
     except Exception as e:
         frappe.db.rollback()
+        release_idempotency_key(idempotency_key)
         frappe.log_error(frappe.get_traceback(), 'Create Work Order API Error')
         frappe.response['message'] = {
             'success': False,
@@ -213,10 +174,14 @@ def update_work_order(work_order_name, work_order_data):
         work_order_data: JSON string containing fields to update
     
     Returns:
-        Updated work order document
+        Updated work order document. Updates touching only fields declared in
+        asset_lite.api.patch_api.PATCH_PROFILES are written without a full save
+        and return the parent fields only, with "partial": true. Pass "modified"
+        in work_order_data to reject the update if the document changed since.
     """
     try:
         import json
+        from asset_lite.api.patch_api import apply_partial_update
         
         if not work_order_name:
             frappe.throw(_('Work Order name is required'))
@@ -229,6 +194,18 @@ def update_work_order(work_order_name, work_order_data):
         if not frappe.has_permission('Work_Order', 'write', work_order_name):
             frappe.throw(_('Not permitted to update this work order'))
         
+        # Declared fields skip the full document save; status changes need it
+        patched = apply_partial_update('Work_Order', work_order_name, work_order_data)
+        if patched is not None:
+            frappe.db.commit()
+            frappe.response['message'] = {
+                'success': True,
+                'work_order': patched,
+                'partial': True,
+                'message': _('Work Order updated successfully')
+            }
+            return
+        
         # Get and update work order
         work_order = frappe.get_doc('Work_Order', work_order_name)
         
@@ -339,3 +316,187 @@ def update_work_order_status(work_order_name, repair_status=None, workflow_state
             'success': False,
             'error': str(e)
         }
+
+
+# Requests with more rows than this are processed as a background job
+BULK_UPSERT_JOB_THRESHOLD = 1000
+
+
+@frappe.whitelist(allow_guest = True)
+def bulk_upsert_work_orders(rows, chunk_size=200, run_in_background=False):
+    """
+    Create or update many work orders in one call
+    
+    Rows with a "name" of an existing work order are updated, all others are
+    inserted. Each row runs inside its own savepoint and every chunk is committed
+    once, so one invalid row never discards the rest.
+    
+    Args:
+        rows: JSON string list of work order dicts
+        chunk_size: Number of rows per commit (default: 200)
+        run_in_background: Queue the import and return a job id to poll with
+            asset_lite.api.bulk_api.get_bulk_job_status (forced above 1000 rows)
+    
+    Returns:
+        {
+            "success": bool,
+            "results": [{"index", "success", "name", "action"} | {"index", "success", "error"}],
+            "succeeded": int,
+            "failed": int
+        }
+        or {"success": bool, "job_id": str, "total": int} for background runs
+    """
+    try:
+        import json
+        from frappe.utils import cint
+        from asset_lite.api.bulk_api import enqueue_bulk_job
+        
+        # Parse rows
+        if isinstance(rows, str):
+            rows = json.loads(rows)
+        
+        # Check if user has permission to create and update work orders
+        if not frappe.has_permission('Work_Order', 'create') or not frappe.has_permission('Work_Order', 'write'):
+            frappe.throw(_('Not permitted to create or update work orders'))
+        
+        if cint(run_in_background) or len(rows) > BULK_UPSERT_JOB_THRESHOLD:
+            job_id = enqueue_bulk_job(
+                'asset_lite.api.work_order_api.run_bulk_upsert_work_orders',
+                total=len(rows),
+                rows=rows,
+                chunk_size=cint(chunk_size)
+            )
+            frappe.response['message'] = {
+                'success': True,
+                'job_id': job_id,
+                'total': len(rows),
+                'message': _('Work Order import queued')
+            }
+            return
+        
+        results = upsert_work_order_rows(rows, cint(chunk_size))
+        
+        frappe.response['message'] = {
+            'success': True,
+            'results': results,
+            'succeeded': sum(1 for result in results if result['success']),
+            'failed': sum(1 for result in results if not result['success'])
+        }
+        
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), 'Bulk Upsert Work Orders API Error')
+        frappe.response['message'] = {
+            'success': False,
+            'error': str(e)
+        }
+
+
+def upsert_work_order_rows(rows, chunk_size=200, job_id=None):
+    """Insert or update work order rows in committed chunks, returning per-row results"""
+    from asset_lite.api.bulk_api import process_in_chunks
+    
+    def upsert(row):
+        row = dict(row)
+        name = row.pop('name', None)
+        
+        if name and frappe.db.exists('Work_Order', name):
+            if not frappe.has_permission('Work_Order', 'write', name):
+                frappe.throw(_('Not permitted to update this work order'))
+            
+            work_order = frappe.get_doc('Work_Order', name)
+            for key, value in row.items():
+                if hasattr(work_order, key):
+                    setattr(work_order, key, value)
+            work_order.save()
+            return {'name': work_order.name, 'action': 'updated'}
+        
+        work_order = frappe.get_doc({
+            'doctype': 'Work_Order',
+            **row
+        })
+        work_order.insert()
+        return {'name': work_order.name, 'action': 'inserted'}
+    
+    return process_in_chunks(rows, upsert, chunk_size, job_id)
+
+
+def run_bulk_upsert_work_orders(bulk_job_id, rows, chunk_size=200):
+    """Background job entry point for bulk_upsert_work_orders"""
+    from asset_lite.api.bulk_api import run_bulk_job
+    
+    run_bulk_job(bulk_job_id, lambda: upsert_work_order_rows(rows, chunk_size, bulk_job_id))
+
+
+def format_coverage(coverage):
+    """Coverage fields plus the windows they come from, as plain dicts"""
+    return {
+        **coverage,
+        'windows': [window._asdict() for window in coverage['windows']]
+    }
+
+
+@frappe.whitelist(allow_guest = True)
+def resolve_coverage(asset, date=None):
+    """
+    Resolve what covers an asset on a date, as Work_Order coverage fields
+    
+    Args:
+        asset: Asset name
+        date: Date to resolve for (default: today)
+    
+    Returns:
+        {"warranty", "service_contract", "covering_spare_parts", "covering_labour",
+         "ppm_only", "spare_parts_labour", "windows"}
+    """
+    try:
+        if not asset:
+            frappe.throw(_('Asset is required'))
+        
+        if not frappe.has_permission('Asset', 'read', asset):
+            frappe.throw(_('Not permitted to read {0}').format(asset), frappe.PermissionError)
+        
+        frappe.response['message'] = format_coverage(resolve_asset_coverage(asset, date))
+        
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), 'Resolve Coverage API Error')
+        frappe.response['message'] = {
+            'success': False,
+            'error': str(e)
+        }
+
+
+@frappe.whitelist(allow_guest = True)
+def resolve_coverage_bulk(items):
+    """
+    Resolve the coverage of many assets at once, e.g. before importing work orders
+    
+    Args:
+        items: JSON string list of {"asset", "date"} dicts
+    
+    Returns:
+        {"success": bool, "results": [resolve_coverage result, ...]} in the order of items
+    """
+    try:
+        import json
+        
+        if isinstance(items, str):
+            items = json.loads(items)
+        
+        # One query for every asset instead of has_permission per item
+        assets = {item.get('asset') for item in items} - {None, ''}
+        permitted = set(frappe.get_list('Asset', filters={'name': ['in', list(assets)]}, pluck='name', limit_page_length=0))
+        if assets - permitted:
+            frappe.throw(_('Not permitted to read {0}').format(', '.join(sorted(assets - permitted))), frappe.PermissionError)
+        
+        frappe.response['message'] = {
+            'success': True,
+            'results': [format_coverage(coverage) for coverage in resolve_coverage_batch(items)]
+        }
+        
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), 'Resolve Coverage Bulk API Error')
+        frappe.response['message'] = {
+            'success': False,
+            'error': str(e)
+        }
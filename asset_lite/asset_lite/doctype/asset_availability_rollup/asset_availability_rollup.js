@@ -0,0 +1,8 @@
+// Copyright (c) 2026, seyfert and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Asset Availability Rollup", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,14 @@
+# Copyright (c) 2026, seyfert and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class AssetAvailabilityRollup(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Asset Availability Rollup", ["period_type", "period"])
+	frappe.db.add_index("Asset Availability Rollup", ["period_type", "company", "period"])
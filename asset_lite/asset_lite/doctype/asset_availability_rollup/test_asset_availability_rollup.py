@@ -0,0 +1,68 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.availability import count_in_service, get_availability, get_rollup_ranges
+
+# Set AVAILABILITY_BENCHMARK_ASSETS=100000 to time a year of daily counts for that many assets
+BENCHMARK_ASSETS = int(os.environ.get("AVAILABILITY_BENCHMARK_ASSETS") or 0)
+
+
+class TestAssetAvailabilityRollup(FrappeTestCase):
+	def test_availability(self):
+		self.assertEqual(get_availability(1440, 144), 90)
+		# No asset in service is not an outage
+		self.assertEqual(get_availability(0, 0), 100)
+
+	def test_assets_in_service_per_day(self):
+		rows = [
+			("Hospital A", "CT", date(2026, 1, 1), None, 2),
+			("Hospital A", "CT", date(2026, 1, 3), date(2026, 1, 5), 1),
+			("Hospital B", "MRI", date(2026, 1, 4), None, 1),
+		]
+		days = [date(2026, 1, day) for day in range(1, 7)]
+		counts = count_in_service(rows, days)
+
+		self.assertEqual(
+			counts[("Hospital A", "CT")],
+			{days[0]: 2, days[1]: 2, days[2]: 3, days[3]: 3, days[4]: 2, days[5]: 2},
+		)
+		self.assertEqual(counts[("Hospital B", "MRI")], {days[3]: 1, days[4]: 1, days[5]: 1})
+
+	def test_rollup_ranges(self):
+		self.assertEqual(
+			get_rollup_ranges("2026-01-15", "2026-04-10"),
+			[
+				("Month", date(2026, 2, 1), date(2026, 3, 1)),
+				("Day", date(2026, 1, 15), date(2026, 1, 31)),
+				("Day", date(2026, 4, 1), date(2026, 4, 10)),
+			],
+		)
+		self.assertEqual(get_rollup_ranges("2026-01-01", "2026-02-28"), [("Month", date(2026, 1, 1), date(2026, 2, 1))])
+		self.assertEqual(get_rollup_ranges("2026-01-02", "2026-01-30"), [("Day", date(2026, 1, 2), date(2026, 1, 30))])
+		self.assertEqual(get_rollup_ranges("2026-02-01", "2026-01-31"), [])
+
+	def test_benchmark_year_of_counts(self):
+		if not BENCHMARK_ASSETS:
+			self.skipTest("set AVAILABILITY_BENCHMARK_ASSETS to run")
+
+		rng = random.Random(42)
+		rows = []
+		for _ in range(BENCHMARK_ASSETS):
+			since = date(2020, 1, 1) + timedelta(days=rng.randint(0, 6 * 365))
+			until = since + timedelta(days=rng.randint(365, 3650)) if rng.random() < 0.2 else None
+			rows.append((f"Hospital {rng.randint(1, 20)}", f"Modality {rng.randint(1, 30)}", since, until, 1))
+		days = [date(2025, 10, 19) + timedelta(days=offset) for offset in range(365)]
+
+		start = time.perf_counter()
+		counts = count_in_service(rows, days)
+		elapsed = time.perf_counter() - start
+
+		print(f"Counted {BENCHMARK_ASSETS} assets over {len(days)} days in {len(counts)} groups in {elapsed:.2f} s")
+		self.assertLess(elapsed, 30)
@@ -0,0 +1,78 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.downtime import compute_downtime_buckets, get_status_down_intervals, merge_intervals
+
+# Set DOWNTIME_BENCHMARK_OUTAGES=1000000 to time bucketing that many outages
+BENCHMARK_OUTAGES = int(os.environ.get("DOWNTIME_BENCHMARK_OUTAGES") or 0)
+
+
+class TestAssetDowntimeBucket(FrappeTestCase):
+	def test_merge_intervals(self):
+		self.assertEqual(merge_intervals([(5, 8), (1, 3), (2, 4), (8, 9)]), [[1, 4], [5, 9]])
+
+	def test_overlapping_outages_are_bucketed_once_per_day(self):
+		now = datetime(2026, 10, 19, 12)
+		buckets, downtime = compute_downtime_buckets(
+			[
+				(datetime(2026, 10, 16, 20), datetime(2026, 10, 17, 6)),
+				# A second ticket and a Down status within the first outage
+				(datetime(2026, 10, 16, 22), datetime(2026, 10, 17, 2)),
+				(datetime(2026, 10, 17, 4), datetime(2026, 10, 17, 8)),
+				# Still open
+				(datetime(2026, 10, 19, 9), None),
+			],
+			now=now,
+		)
+
+		self.assertEqual(
+			[(b["day"], b["downtime_hours"], b["uptime_hours"], b["outages"]) for b in buckets],
+			[(date(2026, 10, 16), 4, 20, 1), (date(2026, 10, 17), 8, 16, 1), (date(2026, 10, 19), 3, 9, 1)],
+		)
+		self.assertEqual(downtime, 15)
+
+	def test_outages_before_service_are_ignored(self):
+		buckets, downtime = compute_downtime_buckets(
+			[(datetime(2026, 1, 1), datetime(2026, 1, 3))], in_service_from="2026-01-02", now=datetime(2026, 10, 19)
+		)
+		self.assertEqual([b["day"] for b in buckets], [date(2026, 1, 2)])
+		self.assertEqual(downtime, 24)
+
+	def test_status_down_intervals(self):
+		now = datetime(2026, 10, 19)
+		changes = [
+			(datetime(2026, 10, 1), "Down"),
+			(datetime(2026, 10, 2), "Up"),
+			(datetime(2026, 10, 5), "Down"),
+		]
+		self.assertEqual(
+			get_status_down_intervals(changes, "Down", now),
+			[(datetime(2026, 10, 1), datetime(2026, 10, 2)), (datetime(2026, 10, 5), now)],
+		)
+		# Set Up again without a tracked change: the open interval is dropped
+		self.assertEqual(len(get_status_down_intervals(changes, "Up", now)), 1)
+
+	def test_benchmark_bucketing(self):
+		if not BENCHMARK_OUTAGES:
+			self.skipTest("set DOWNTIME_BENCHMARK_OUTAGES to run")
+
+		rng = random.Random(42)
+		assets = max(BENCHMARK_OUTAGES // 50, 1)
+		outages = [[] for _ in range(assets)]
+		for i in range(BENCHMARK_OUTAGES):
+			start = datetime(2025, 1, 1) + timedelta(minutes=rng.randint(0, 600 * 24 * 60))
+			outages[i % assets].append((start, start + timedelta(minutes=rng.randint(30, 72 * 60))))
+
+		start = time.perf_counter()
+		buckets = sum(len(compute_downtime_buckets(intervals, now=datetime(2026, 10, 19))[0]) for intervals in outages)
+		elapsed = time.perf_counter() - start
+
+		print(f"Bucketed {BENCHMARK_OUTAGES} outages of {assets} assets into {buckets} daily buckets in {elapsed:.1f} s")
+		self.assertLess(elapsed, 60)
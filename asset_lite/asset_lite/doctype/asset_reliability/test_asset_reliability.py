@@ -0,0 +1,74 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+from datetime import datetime
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.reliability import compute_reliability, get_failure_history_metrics, update_asset_reliability
+
+ASSET = "_REL-TEST-ASSET"
+
+
+def insert_work_orders(rows):
+	now = frappe.utils.now()
+	frappe.db.bulk_insert(
+		"Work_Order",
+		["name", "creation", "modified", "owner", "asset", "failure_date", "completion_date", "repair_status",
+			"docstatus"],
+		[(name, now, now, "Administrator", ASSET, *row, 0) for name, *row in rows],
+	)
+
+
+class TestAssetReliability(FrappeTestCase):
+	def setUp(self):
+		now = frappe.utils.now()
+		frappe.db.bulk_insert(
+			"Asset",
+			["name", "creation", "modified", "owner", "asset_name", "company", "available_for_use_date", "docstatus"],
+			[(ASSET, now, now, "Administrator", ASSET, "_Test Company", "2026-01-01", 1)],
+		)
+
+	def tearDown(self):
+		frappe.db.delete("Asset Reliability", {"name": ASSET})
+		frappe.db.delete("Work_Order", {"asset": ASSET})
+		frappe.db.delete("Asset", {"name": ASSET})
+		frappe.db.commit()
+
+	def test_compute_reliability(self):
+		values = compute_reliability({
+			"failures": 2, "repairs": 1, "uptime_hours": 480, "trailing_uptime_hours": 20, "repair_hours": 12,
+		})
+		self.assertEqual(values["operating_hours"], 500)
+		self.assertEqual(values["mtbf_hours"], 250)
+		self.assertEqual(values["mttr_hours"], 12)
+		self.assertEqual(values["availability"], 97.66)
+
+		# Nothing failed yet: no MTBF rather than a division by zero
+		values = compute_reliability({})
+		self.assertEqual((values["mtbf_hours"], values["mttr_hours"], values["availability"]), (0, 0, 100))
+
+	def test_failure_history_metrics(self):
+		insert_work_orders([
+			("_REL-TEST-WO-1", datetime(2026, 1, 11), datetime(2026, 1, 11, 12), "Completed"),
+			("_REL-TEST-WO-2", datetime(2026, 1, 21, 12), datetime(2026, 1, 22), "Completed"),
+			("_REL-TEST-WO-3", datetime(2026, 1, 25), None, "Cancelled"),
+		])
+
+		row = get_failure_history_metrics([ASSET])[0]
+
+		self.assertEqual((row.failures, row.repairs), (2, 2))
+		# In service from Jan 1 to the first failure, then from each repair to the next failure
+		self.assertEqual(float(row.uptime_hours), 240 + 240)
+		self.assertEqual(float(row.repair_hours), 12 + 12)
+		self.assertEqual(row.last_completion_date, datetime(2026, 1, 22))
+
+	def test_cancelled_history_drops_the_row(self):
+		insert_work_orders([("_REL-TEST-WO-1", datetime(2026, 1, 11), datetime(2026, 1, 11, 12), "Completed")])
+		update_asset_reliability([ASSET])
+		self.assertEqual(frappe.db.get_value("Asset Reliability", ASSET, "failures"), 1)
+
+		frappe.db.set_value("Work_Order", "_REL-TEST-WO-1", "repair_status", "Cancelled")
+		update_asset_reliability([ASSET])
+		self.assertFalse(frappe.db.exists("Asset Reliability", ASSET))
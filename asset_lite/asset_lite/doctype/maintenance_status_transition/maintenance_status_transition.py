@@ -0,0 +1,99 @@
+# Copyright (c) 2026, seyfert and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import getdate, now_datetime
+
+# Logs moved per UPDATE and commit
+STATUS_SWEEP_BATCH_SIZE = 10000
+
+
+class MaintenanceStatusTransition(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Maintenance Status Transition", ["maintenance_log"])
+
+
+def move_logs(from_status, to_status, due_condition, today, batch_size=STATUS_SWEEP_BATCH_SIZE, logs=None):
+	"""
+	Move maintenance logs from one status to another in batches, recording each move
+
+	Candidates are read by range on the (maintenance_status, due_date) index,
+	updated by primary key and written to Maintenance Status Transition with
+	one bulk insert per batch. Moved logs leave the range, so every batch
+	starts from the front of it again. logs limits the move to those names.
+
+	Returns:
+		Number of logs moved
+	"""
+	conditions = " AND name IN %(logs)s" if logs else ""
+	moved = 0
+	while True:
+		rows = frappe.db.sql(f"""
+			SELECT name, due_date
+			FROM `tabAsset Maintenance Log`
+			WHERE maintenance_status = %(from_status)s
+				AND due_date {due_condition} %(today)s
+				AND docstatus < 2
+				{conditions}
+			ORDER BY due_date
+			LIMIT %(limit)s
+		""", {
+			"from_status": from_status,
+			"today": today,
+			"limit": batch_size,
+			"logs": tuple(logs or ()),
+		}, as_dict=True)
+		if not rows:
+			break
+
+		now = now_datetime()
+		frappe.db.sql("""
+			UPDATE `tabAsset Maintenance Log`
+			SET maintenance_status = %(to_status)s, modified = %(now)s, modified_by = %(user)s
+			WHERE name IN %(names)s AND maintenance_status = %(from_status)s
+		""", {
+			"to_status": to_status,
+			"from_status": from_status,
+			"now": now,
+			"user": frappe.session.user,
+			"names": tuple(row.name for row in rows),
+		})
+		frappe.db.bulk_insert(
+			"Maintenance Status Transition",
+			["creation", "modified", "owner", "modified_by", "maintenance_log", "from_status", "to_status",
+				"due_date", "transitioned_on"],
+			[
+				(now, now, "Administrator", "Administrator", row.name, from_status, to_status, row.due_date, now)
+				for row in rows
+			],
+			chunk_size=batch_size,
+		)
+		frappe.db.commit()
+
+		moved += len(rows)
+		if len(rows) < batch_size:
+			break
+
+	return moved
+
+
+def sweep_maintenance_status(today=None, batch_size=STATUS_SWEEP_BATCH_SIZE, logs=None):
+	"""
+	Scheduled job: mark past-due Planned logs Overdue
+
+	Overdue logs whose due date was moved to today or later go back to
+	Planned, so maintenance_status alone tells whether a log is overdue.
+	Pass logs to sweep only those, e.g. in tests.
+
+	Returns:
+		{"overdue": int, "replanned": int}
+	"""
+	today = getdate(today)
+	return {
+		"overdue": move_logs("Planned", "Overdue", "<", today, batch_size, logs),
+		"replanned": move_logs("Overdue", "Planned", ">=", today, batch_size, logs),
+	}
@@ -0,0 +1,93 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate
+
+from asset_lite.asset_lite.doctype.maintenance_status_transition.maintenance_status_transition import (
+	sweep_maintenance_status,
+)
+
+# Set OVERDUE_SWEEP_BENCHMARK_LOGS=1000000 to time the sweep over a million logs
+BENCHMARK_LOGS = int(os.environ.get("OVERDUE_SWEEP_BENCHMARK_LOGS") or 0)
+
+PREFIX = "_MST-TEST-"
+
+
+def insert_logs(due_dates, status="Planned"):
+	now = frappe.utils.now()
+	frappe.db.bulk_insert(
+		"Asset Maintenance Log",
+		["name", "creation", "modified", "owner", "maintenance_status", "due_date", "docstatus"],
+		((f"{PREFIX}{i:07d}", now, now, "Administrator", status, due_date, 0) for i, due_date in enumerate(due_dates)),
+		chunk_size=10000,
+	)
+	frappe.db.commit()
+
+
+def count_test_logs(status):
+	return frappe.db.count("Asset Maintenance Log", {"maintenance_status": status, "name": ["like", f"{PREFIX}%"]})
+
+
+class TestMaintenanceStatusTransition(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.delete("Maintenance Status Transition", {"maintenance_log": ["like", f"{PREFIX}%"]})
+		frappe.db.delete("Asset Maintenance Log", {"name": ["like", f"{PREFIX}%"]})
+		frappe.db.commit()
+
+	def test_sweep_marks_past_due_logs_overdue(self):
+		today = getdate("2026-10-19")
+		insert_logs([add_days(today, -3), add_days(today, -1), today, add_days(today, 5)])
+		# Only the test's own logs, whatever else the site holds
+		logs = [f"{PREFIX}{i:07d}" for i in range(4)]
+
+		self.assertEqual(sweep_maintenance_status(today, batch_size=1, logs=logs), {"overdue": 2, "replanned": 0})
+		statuses = dict(frappe.get_all(
+			"Asset Maintenance Log", {"name": ["like", f"{PREFIX}%"]}, ["name", "maintenance_status"], as_list=True
+		))
+		self.assertEqual(
+			[statuses[f"{PREFIX}{i:07d}"] for i in range(4)], ["Overdue", "Overdue", "Planned", "Planned"]
+		)
+		self.assertEqual(
+			frappe.get_all(
+				"Maintenance Status Transition",
+				{"maintenance_log": f"{PREFIX}0000000"},
+				["from_status", "to_status"],
+				as_list=True,
+			),
+			[("Planned", "Overdue")],
+		)
+
+		# A rescheduled log goes back to Planned, and a second run is a no-op
+		frappe.db.set_value("Asset Maintenance Log", f"{PREFIX}0000001", "due_date", add_days(today, 7))
+		self.assertEqual(sweep_maintenance_status(today, logs=logs), {"overdue": 0, "replanned": 1})
+		self.assertEqual(sweep_maintenance_status(today, logs=logs), {"overdue": 0, "replanned": 0})
+
+	def test_benchmark_sweep_million_logs(self):
+		if not BENCHMARK_LOGS:
+			self.skipTest("set OVERDUE_SWEEP_BENCHMARK_LOGS to run")
+
+		today = getdate("2026-10-19")
+		# Half of the logs are past due
+		offsets = [(i % 730) - 365 for i in range(BENCHMARK_LOGS)]
+		insert_logs(add_days(today, offset) for offset in offsets)
+
+		# The real job runs over the whole table; only the test's logs are checked
+		start = time.perf_counter()
+		result = sweep_maintenance_status(today)
+		elapsed = time.perf_counter() - start
+
+		start = time.perf_counter()
+		overdue = count_test_logs("Overdue")
+		count_elapsed = time.perf_counter() - start
+
+		print(
+			f"Swept {BENCHMARK_LOGS} logs in {elapsed:.1f} s: {result['overdue']} marked overdue; "
+			f"overdue count in {count_elapsed * 1000:.0f} ms"
+		)
+		self.assertEqual(overdue, sum(1 for offset in offsets if offset < 0))
+		self.assertEqual(count_test_logs("Planned"), sum(1 for offset in offsets if offset >= 0))
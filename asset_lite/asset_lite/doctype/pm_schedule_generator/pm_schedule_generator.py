@@ -1,9 +1,29 @@
 # Copyright (c) 2025, seyfert and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
+from frappe import _
 from frappe.model.document import Document
 
 
 class PMScheduleGenerator(Document):
-	pass
+	def on_submit(self):
+		# The job must see this submit and the Asset Maintenance rows its After Submit script inserts
+		self.generate_maintenance_logs(enqueue_after_commit=True)
+
+	@frappe.whitelist()
+	def generate_maintenance_logs(self, enqueue_after_commit=False):
+		"""Queue creation of the plan's Asset Maintenance Logs; logs that already exist are skipped"""
+		from asset_lite.api.bulk_api import enqueue_bulk_job
+
+		if self.docstatus != 1:
+			frappe.throw(_("Submit the PM Schedule Generator before generating maintenance logs"))
+
+		job_id = enqueue_bulk_job(
+			"asset_lite.pm_schedule.run_pm_schedule_generation",
+			total=None,
+			enqueue_after_commit=enqueue_after_commit,
+			generator=self.name,
+		)
+		frappe.msgprint(_("Maintenance logs are being generated in the background"), alert=True)
+		return job_id
@@ -1,9 +1,88 @@
 # Copyright (c) 2025, seyfert and Contributors
 # See license.txt
 
-# import frappe
+import os
+import time
+from datetime import date
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from asset_lite.pm_schedule import compute_due_dates, generate_pm_logs, get_schedule_assets
+
+# Set PM_SCHEDULE_BENCHMARK_ASSETS=10000 to time a 3-year quarterly plan
+BENCHMARK_ASSETS = int(os.environ.get("PM_SCHEDULE_BENCHMARK_ASSETS") or 0)
+
+PREFIX = "_PMSG-TEST-"
+
+
+def insert_assets(count):
+	"""Bare Asset and Asset Maintenance rows, enough for the schedule query"""
+	now = frappe.utils.now()
+	names = [f"{PREFIX}{i:06d}" for i in range(count)]
+	frappe.db.bulk_insert(
+		"Asset",
+		["name", "creation", "modified", "owner", "asset_name", "company", "docstatus"],
+		[(name, now, now, "Administrator", name, "_Test Company", 1) for name in names],
+		chunk_size=5000,
+	)
+	frappe.db.bulk_insert(
+		"Asset Maintenance",
+		["name", "creation", "modified", "owner", "asset_name"],
+		[(name, now, now, "Administrator", name) for name in names],
+		chunk_size=5000,
+	)
+	frappe.db.commit()
+	return names
+
 
 class TestPMScheduleGenerator(FrappeTestCase):
-	pass
+	def tearDown(self):
+		logs = frappe.get_all("Asset Maintenance Log", {"asset_maintenance": ["like", f"{PREFIX}%"]}, pluck="name")
+		if logs:
+			frappe.db.delete("PPM Table", {"parent": ["in", logs], "parenttype": "Asset Maintenance Log"})
+			frappe.db.delete("Asset Maintenance Log", {"name": ["in", logs]})
+		frappe.db.delete("Asset Maintenance", {"name": ["like", f"{PREFIX}%"]})
+		frappe.db.delete("Asset", {"name": ["like", f"{PREFIX}%"]})
+		frappe.db.commit()
+
+	def test_due_dates_keep_day_of_month(self):
+		asset_index, due_dates = compute_due_dates(
+			["2026-01-31", "2026-03-01"], ["2026-12-31", "2026-04-15"], "Quarterly"
+		)
+		self.assertEqual(asset_index.tolist(), [0, 0, 0])
+		self.assertEqual(due_dates.tolist(), [date(2026, 4, 30), date(2026, 7, 31), date(2026, 10, 31)])
+
+		_asset_index, due_dates = compute_due_dates(["2026-01-01"], ["2026-01-22"], "Weekly")
+		self.assertEqual(due_dates.tolist(), [date(2026, 1, 8), date(2026, 1, 15), date(2026, 1, 22)])
+
+	def test_generation_skips_existing_logs(self):
+		names = insert_assets(3)
+		assets = get_schedule_assets(entries=names, periodicity="Quarterly")
+
+		result = generate_pm_logs(assets, "Quarterly", "2026-01-01", "2026-12-31", chunk_size=2)
+		self.assertEqual(result, {"assets": 3, "created": 9, "skipped": 0})
+		self.assertEqual(
+			frappe.get_all(
+				"Asset Maintenance Log", {"asset_maintenance": names[0]}, pluck="due_date", order_by="due_date"
+			),
+			[date(2026, 4, 1), date(2026, 7, 1), date(2026, 10, 1)],
+		)
+
+		# Extending the horizon only adds the new quarters
+		result = generate_pm_logs(assets, "Quarterly", "2026-01-01", "2027-06-30")
+		self.assertEqual(result, {"assets": 3, "created": 6, "skipped": 9})
+
+	def test_benchmark_quarterly_plan(self):
+		if not BENCHMARK_ASSETS:
+			self.skipTest("set PM_SCHEDULE_BENCHMARK_ASSETS to run")
+
+		names = insert_assets(BENCHMARK_ASSETS)
+		start = time.perf_counter()
+		assets = get_schedule_assets(entries=names, periodicity="Quarterly")
+		result = generate_pm_logs(assets, "Quarterly", "2026-01-01", "2029-01-01")
+		elapsed = time.perf_counter() - start
+
+		print(f"3-year quarterly plan for {BENCHMARK_ASSETS} assets: {result['created']} logs in {elapsed:.1f} s")
+		self.assertEqual(result["created"], BENCHMARK_ASSETS * 12)
+		self.assertLess(elapsed, 60)
@@ -0,0 +1,95 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.pm_workload import level_pm_workload
+
+# Set PM_WORKLOAD_BENCHMARK_JOBS=50000 to time a year of PMs
+BENCHMARK_JOBS = int(os.environ.get("PM_WORKLOAD_BENCHMARK_JOBS") or 0)
+
+
+def make_jobs(count, due_date, site="Site A", city="City A", periodicity="Quarterly"):
+	return [
+		{"name": f"{site}-{i}", "team": "Team", "due_date": due_date, "periodicity": periodicity, "site": site, "city": city}
+		for i in range(count)
+	]
+
+
+class TestPMWorkload(FrappeTestCase):
+	def test_piled_up_due_dates_are_spread_within_capacity(self):
+		due = date(2026, 11, 30)
+		assignments = level_pm_workload(make_jobs(20, due), {"Team": ["tech1", "tech2"]}, {"Team": 3})
+
+		per_slot = Counter((row["assign_to"], row["scheduled_date"]) for row in assignments)
+		self.assertLessEqual(max(per_slot.values()), 3)
+		self.assertTrue(all(due - timedelta(days=10) <= row["scheduled_date"] <= due for row in assignments))
+		self.assertFalse(any(row["over_capacity"] for row in assignments))
+
+	def test_technicians_stay_at_one_site_per_day(self):
+		due = date(2026, 11, 30)
+		jobs = make_jobs(2, due, "Site A", "City A") + make_jobs(2, due, "Site B", "City B")
+		assignments = level_pm_workload(jobs, {"Team": ["tech1", "tech2"]}, {"Team": 4})
+
+		sites = {}
+		for row in assignments:
+			sites.setdefault((row["assign_to"], row["scheduled_date"]), set()).add(row["name"].split("-")[0])
+		self.assertTrue(all(len(value) == 1 for value in sites.values()))
+
+	def test_holidays_and_overflow(self):
+		due = date(2026, 11, 30)
+		assignments = level_pm_workload(
+			make_jobs(3, due, periodicity="Daily"), {"Team": ["tech1"]}, {"Team": 2}, {"Team": set()}
+		)
+		self.assertEqual([row["over_capacity"] for row in assignments], [False, False, True])
+
+		assignments = level_pm_workload(
+			make_jobs(1, due, periodicity="Weekly"), {"Team": ["tech1"]}, {"Team": 2}, {"Team": {due}}
+		)
+		self.assertEqual(assignments[0]["scheduled_date"], due - timedelta(days=1))
+
+	def test_already_assigned_pms_count_against_capacity(self):
+		due = date(2026, 11, 30)
+		# Another plan already filled tech1 on the due date
+		assignments = level_pm_workload(
+			make_jobs(2, due, periodicity="Daily"),
+			{"Team": ["tech1", "tech2"]},
+			{"Team": 2},
+			assigned=[("tech1", due, "Site A", "City A", 2)],
+		)
+		self.assertEqual({row["assign_to"] for row in assignments}, {"tech2"})
+		self.assertFalse(any(row["over_capacity"] for row in assignments))
+
+	def test_benchmark_year_of_pms(self):
+		if not BENCHMARK_JOBS:
+			self.skipTest("set PM_WORKLOAD_BENCHMARK_JOBS to run")
+
+		rng = random.Random(42)
+		teams = {f"Team {t}": [f"tech{t}-{i}" for i in range(8)] for t in range(20)}
+		jobs = [
+			{
+				"name": f"PM-{i}",
+				"team": f"Team {i % 20}",
+				# Due dates piled on the first of the month, as generated plans produce them
+				"due_date": date(2026, rng.randint(1, 12), 1),
+				"periodicity": "Quarterly",
+				"site": f"Site {rng.randint(0, 200)}",
+				"city": f"City {rng.randint(0, 20)}",
+			}
+			for i in range(BENCHMARK_JOBS)
+		]
+
+		start = time.perf_counter()
+		assignments = level_pm_workload(jobs, teams, {team: 6 for team in teams})
+		elapsed = time.perf_counter() - start
+
+		peak = max(Counter((row["assign_to"], row["scheduled_date"]) for row in assignments).values())
+		over = sum(row["over_capacity"] for row in assignments)
+		print(f"Levelled {BENCHMARK_JOBS} PMs in {elapsed:.1f} s, peak daily load {peak}, over capacity {over}")
+		self.assertLess(elapsed, 60)
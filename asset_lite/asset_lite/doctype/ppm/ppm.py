@@ -1,9 +1,19 @@
 # Copyright (c) 2024, seyfert and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
+from asset_lite.ppm_template import encode_results, fill_checklist
+
 
 class PPM(Document):
-	pass
+	def validate(self):
+		# Checklist from the cached template, results kept compact for reports
+		fill_checklist(self)
+		self.checklist_results = encode_results(self.table)
+
+
+def on_doctype_update():
+	# Monthly PPM generation looks up the PPM of each maintenance log
+	frappe.db.add_index("PPM", ["asset_maintenance_log"])
@@ -1,9 +1,16 @@
 # Copyright (c) 2024, seyfert and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from asset_lite.ppm_generation import get_month_number
+
 
 class TestPPM(FrappeTestCase):
-	pass
+	def test_month_number(self):
+		self.assertEqual(get_month_number(10), 10)
+		self.assertEqual(get_month_number("October"), 10)
+		self.assertEqual(get_month_number("october"), 10)
+		self.assertRaises(frappe.ValidationError, get_month_number, 13)
+		self.assertRaises(frappe.ValidationError, get_month_number, "Octember")
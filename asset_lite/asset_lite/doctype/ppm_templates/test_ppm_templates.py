@@ -1,9 +1,55 @@
 # Copyright (c) 2024, seyfert and Contributors
 # See license.txt
 
-# import frappe
+import os
+import time
+from datetime import datetime
+
 from frappe.tests.utils import FrappeTestCase
 
+from asset_lite.ppm_template import build_checklist_rows, decode_results, encode_results
+
+# Set PPM_TEMPLATE_BENCHMARK_PPMS=5000 to time expanding that many checklists
+BENCHMARK_PPMS = int(os.environ.get("PPM_TEMPLATE_BENCHMARK_PPMS") or 0)
+
 
 class TestPPMTemplates(FrappeTestCase):
-	pass
+	def test_checklist_rows(self):
+		now = datetime(2026, 10, 19)
+		rows = build_checklist_rows("PPM", [("PPM-1", ("Cleaning", "Calibration")), ("PPM-2", ())], now, "Administrator")
+		self.assertEqual(
+			rows,
+			[
+				(now, now, "Administrator", "Administrator", 0, "PPM-1", "PPM", "table", 1, "Cleaning"),
+				(now, now, "Administrator", "Administrator", 0, "PPM-1", "PPM", "table", 2, "Calibration"),
+			],
+		)
+
+	def test_results_round_trip(self):
+		rows = [
+			{"maintenance_name": "Cleaning", "working": 1, "defect_found": 0, "not_working": 0},
+			# The worst checked result wins
+			{"maintenance_name": "Calibration", "working": 1, "defect_found": 1, "not_working": 0},
+			{"maintenance_name": "Power supply", "working": 0, "defect_found": 0, "not_working": 1},
+			{"maintenance_name": "Display", "working": 0, "defect_found": 0, "not_working": 0},
+		]
+		results = encode_results(rows)
+		self.assertEqual(results, "WDN-")
+
+		decoded = decode_results(results, [row["maintenance_name"] for row in rows])
+		self.assertEqual(decoded[0], rows[0])
+		self.assertEqual(decoded[1]["defect_found"], 1)
+		self.assertEqual(decoded[1]["working"], 0)
+		self.assertEqual(decoded[2:], rows[2:])
+
+	def test_benchmark_checklist_expansion(self):
+		if not BENCHMARK_PPMS:
+			self.skipTest("set PPM_TEMPLATE_BENCHMARK_PPMS to run")
+
+		items = tuple(f"Check {i}" for i in range(40))
+		start = time.perf_counter()
+		rows = build_checklist_rows("PPM", [(f"PPM-{i}", items) for i in range(BENCHMARK_PPMS)], user="Administrator")
+		elapsed = time.perf_counter() - start
+
+		print(f"Expanded {BENCHMARK_PPMS} checklists into {len(rows)} rows in {elapsed:.2f} s")
+		self.assertLess(elapsed, 10)
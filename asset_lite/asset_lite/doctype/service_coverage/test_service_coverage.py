@@ -0,0 +1,145 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import random
+import time
+from datetime import date, timedelta
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.coverage import (
+	CoverageIndex,
+	CoverageWindow,
+	coverage_changed,
+	resolve_coverage,
+	update_coverage_statuses,
+)
+
+# Set COVERAGE_BENCHMARK_ASSETS=100000 to time lookups over that many assets
+BENCHMARK_ASSETS = int(os.environ.get("COVERAGE_BENCHMARK_ASSETS") or 0)
+
+PREFIX = "_COV-TEST-"
+
+
+def window(asset, kind, start_date, end_date):
+	return CoverageWindow(asset, kind, start_date, end_date, "Warranty", f"{asset}-{kind}", None)
+
+
+class TestCoverage(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.delete("Warranty", {"name": ["like", f"{PREFIX}%"]})
+		frappe.db.commit()
+
+	def test_covering_windows(self):
+		index = CoverageIndex([
+			# A long warranty overlapping a later, shorter contract
+			window("A", "Warranty", date(2024, 1, 1), date(2026, 12, 31)),
+			window("A", "Service Contract", date(2025, 1, 1), date(2025, 6, 30)),
+			window("A", "Extended Warranty", date(2027, 1, 1), date(2027, 12, 31)),
+			window("B", "Service Contract", date(2026, 1, 1), date(2026, 1, 31)),
+		])
+
+		self.assertEqual([w.kind for w in index.covering("A", "2025-03-01")], ["Warranty", "Service Contract"])
+		self.assertEqual([w.kind for w in index.covering("A", "2026-10-19")], ["Warranty"])
+		self.assertEqual(index.covering("A", "2026-10-19", kinds=["Service Contract"]), [])
+		self.assertEqual(index.covering("B", "2026-02-01"), [])
+		self.assertEqual(index.covering("C", "2026-02-01"), [])
+
+		self.assertEqual(
+			[(w.asset, w.kind) for w in index.ending_between("2025-06-30", "2026-12-31")],
+			[("A", "Service Contract"), ("B", "Service Contract"), ("A", "Warranty")],
+		)
+
+	def test_resolve_work_order_coverage(self):
+		index = CoverageIndex([
+			window("A", "Extended Warranty", date(2026, 1, 1), date(2026, 12, 31)),
+			CoverageWindow("A", "Service Contract", date(2026, 6, 1), date(2027, 5, 31), "Support Plans", "SP-1",
+				None, spare_parts=1, ppm_only=1),
+			CoverageWindow("A", "Service Contract", date(2026, 9, 1), date(2026, 9, 30), "Asset Maintenance", "AM-1",
+				None, labour=1),
+		])
+
+		coverage = resolve_coverage("A", "2026-09-15", index)
+		self.assertEqual(
+			{key: value for key, value in coverage.items() if key != "windows"},
+			{"warranty": 1, "service_contract": 1, "covering_spare_parts": 1, "covering_labour": 1, "ppm_only": 0,
+				"spare_parts_labour": 0},
+		)
+		self.assertEqual(len(coverage["windows"]), 3)
+
+		coverage = resolve_coverage("A", "2027-02-01", index)
+		self.assertEqual((coverage["warranty"], coverage["ppm_only"], coverage["covering_labour"]), (0, 1, 0))
+		self.assertEqual(resolve_coverage("B", "2027-02-01", index)["service_contract"], 0)
+
+	def test_statuses_follow_dates(self):
+		today = date(2026, 10, 19)
+		now = frappe.utils.now()
+		frappe.db.bulk_insert(
+			"Warranty",
+			["name", "creation", "modified", "owner", "warranty_start_date", "warranty_end_date", "start_date",
+				"end_date", "warranty_status"],
+			[
+				(f"{PREFIX}1", now, now, "Administrator", "2025-01-01", "2026-12-31", None, None, "Expired"),
+				(f"{PREFIX}2", now, now, "Administrator", "2024-01-01", "2025-12-31", None, None, "Active"),
+				# Out of warranty, but within the extension
+				(f"{PREFIX}3", now, now, "Administrator", "2023-01-01", "2024-12-31", "2025-01-01", "2027-12-31", ""),
+				(f"{PREFIX}4", now, now, "Administrator", "2027-01-01", "2027-12-31", None, None, "Active"),
+			],
+		)
+
+		result = update_coverage_statuses(today)
+		self.assertGreaterEqual(result["Warranty.warranty_status"], 4)
+		statuses = dict(frappe.get_all(
+			"Warranty", {"name": ["like", f"{PREFIX}%"]}, ["name", "warranty_status"], as_list=True
+		))
+		self.assertEqual(
+			[statuses[f"{PREFIX}{i}"] for i in range(1, 5)], ["Active", "Expired", "Active", ""]
+		)
+		self.assertEqual(update_coverage_statuses(today)["Warranty.warranty_status"], 0)
+
+	def test_only_coverage_changes_drop_the_index(self):
+		before = frappe.get_doc({"doctype": "Support Plans", "start_date": "2026-01-01", "end_date": "2026-12-31"})
+		before.append("asset_list", {"asset_id": "A"})
+
+		doc = frappe.copy_doc(before)
+		doc.get_doc_before_save = lambda: before
+		# Status flips do not move a window
+		doc.service_contract_status = "Expired"
+		self.assertFalse(coverage_changed(doc))
+
+		doc.append("asset_list", {"asset_id": "B"})
+		self.assertTrue(coverage_changed(doc))
+
+		doc = frappe.copy_doc(before)
+		doc.get_doc_before_save = lambda: before
+		doc.end_date = "2027-12-31"
+		self.assertTrue(coverage_changed(doc))
+
+	def test_benchmark_lookups(self):
+		if not BENCHMARK_ASSETS:
+			self.skipTest("set COVERAGE_BENCHMARK_ASSETS to run")
+
+		rng = random.Random(42)
+		windows = []
+		for i in range(BENCHMARK_ASSETS):
+			start = date(2020, 1, 1) + timedelta(days=rng.randint(0, 2000))
+			windows.append(window(f"A{i}", "Warranty", start, start + timedelta(days=730)))
+			windows.append(window(f"A{i}", "Service Contract", start + timedelta(days=731), start + timedelta(days=1095)))
+
+		start = time.perf_counter()
+		index = CoverageIndex(windows)
+		build_elapsed = time.perf_counter() - start
+
+		today = date(2026, 10, 19)
+		start = time.perf_counter()
+		covered = sum(1 for i in range(BENCHMARK_ASSETS) if index.covering(f"A{i}", today))
+		lookup_elapsed = time.perf_counter() - start
+		expiring = index.ending_between(today, today + timedelta(days=30))
+
+		print(
+			f"Indexed {len(index)} windows in {build_elapsed:.1f} s; {BENCHMARK_ASSETS} lookups in "
+			f"{lookup_elapsed:.2f} s ({covered} covered), {len(expiring)} expiring within 30 days"
+		)
+		self.assertLess(lookup_elapsed, 10)
@@ -0,0 +1,83 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import random
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.supplier_score_criteria_override import FORMULA_GLOBALS, evaluate_formula
+
+# Suppliers scored over 12 periods each
+BENCHMARK_SUPPLIERS = int(os.environ.get("SCORE_FORMULA_BENCHMARK_SUPPLIERS") or 0)
+
+FORMULAS = [
+	"(({cost_of_delayed_shipments} / {cost_of_shipments}) * 100)",
+	"max(0, min(100, 100 - safe_div({total_repair_hours}, {total_assets}) * 2))",
+	"{pm_compliance} if {pm_due} > 0 else 100",
+	"min({on_time_shipment_num}, {total_shipments}) / max(1, {total_shipments}) * 100",
+	"100 - {downtime_percentage}",
+	"round(float({pm_compliance}) / max(1, int({pm_due})), 2)",
+]
+
+
+def substitute(formula, values):
+	"""Formula text with values substituted the way ERPNext's scorecard period does it"""
+	for param, value in values.items():
+		if "{" + param + "}" in formula:
+			formula = formula.replace("{" + param + "}", f"{value:.2f}" if value else "0.0")
+	return formula
+
+
+class TestSupplierScoreCriteriaOverride(FrappeTestCase):
+	def random_values(self):
+		return {
+			param: random.choice([0, None, random.uniform(0, 500)])
+			for param in (
+				"cost_of_delayed_shipments", "cost_of_shipments", "total_repair_hours", "total_assets",
+				"pm_compliance", "pm_due", "on_time_shipment_num", "total_shipments", "downtime_percentage",
+			)
+		}
+
+	def test_compiled_formula_matches_safe_eval(self):
+		random.seed(29)
+		for _i in range(500):
+			values = self.random_values()
+			for formula in FORMULAS:
+				try:
+					expected = frappe.safe_eval(substitute(formula, values), None, dict(FORMULA_GLOBALS))
+				except ZeroDivisionError:
+					self.assertRaises(ZeroDivisionError, evaluate_formula, formula, values)
+					continue
+				self.assertEqual(evaluate_formula(formula, values), expected, formula)
+
+	def test_rejects_unsafe_formula(self):
+		for formula in ("().__class__", "__import__('os')", "[x for x in (1, 2)]", "{a}.real"):
+			self.assertRaises(Exception, evaluate_formula, formula, {})
+
+	def test_unknown_variable_raises(self):
+		# Like ERPNext, whose unreplaced {variable} fails to evaluate, instead of counting as 0
+		self.assertRaises(NameError, evaluate_formula, "{unknown} + 1", {"pm_due": 5})
+		# A variable without a value still counts as 0
+		self.assertEqual(evaluate_formula("{pm_due} + 1", {"pm_due": None}), 1)
+
+	def test_benchmark_evaluate_formula(self):
+		if not BENCHMARK_SUPPLIERS:
+			self.skipTest("set SCORE_FORMULA_BENCHMARK_SUPPLIERS to run")
+
+		random.seed(2000)
+		periods = [self.random_values() for _i in range(BENCHMARK_SUPPLIERS * 12)]
+
+		start = time.perf_counter()
+		for values in periods:
+			for formula in FORMULAS:
+				try:
+					evaluate_formula(formula, values)
+				except ZeroDivisionError:
+					pass
+		elapsed = time.perf_counter() - start
+
+		print(f"evaluate_formula: {len(periods) * len(FORMULAS)} evaluations in {elapsed:.2f} s")
+		self.assertLess(elapsed, 10)
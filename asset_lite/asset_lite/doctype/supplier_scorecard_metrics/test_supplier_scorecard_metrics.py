@@ -0,0 +1,45 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import time
+
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.supplier_scorecard import build_supplier_metrics
+
+BENCHMARK_SUPPLIERS = int(os.environ.get("SCORECARD_BENCHMARK_SUPPLIERS") or 0)
+
+
+def make_metric_rows(suppliers):
+	rows = []
+	for i in range(suppliers):
+		supplier = f"Supplier {i:04d}"
+		rows.append({"supplier": supplier, "source": "wo", "v1": 40, "v2": 120.0, "v3": 40 * 7200, "v4": 40})
+		rows.append({"supplier": supplier, "source": "asset", "v1": 25, "v2": 1000.0, "v3": 50.0, "v4": 0})
+		rows.append({"supplier": supplier, "source": "pm", "v1": 100, "v2": 90, "v3": 0, "v4": 0})
+	return rows
+
+
+class TestSupplierScorecardMetrics(FrappeTestCase):
+	def test_build_supplier_metrics(self):
+		metrics = build_supplier_metrics(make_metric_rows(1))["Supplier 0000"]
+
+		self.assertEqual(metrics["hours_per_asset"], 4.8)
+		self.assertEqual(metrics["avg_response_hours"], 2)
+		self.assertEqual(metrics["downtime_percentage"], 5)
+		self.assertEqual(metrics["pm_compliance"], 90)
+
+	def test_benchmark_build_supplier_metrics(self):
+		if not BENCHMARK_SUPPLIERS:
+			self.skipTest("set SCORECARD_BENCHMARK_SUPPLIERS to run")
+
+		rows = make_metric_rows(BENCHMARK_SUPPLIERS)
+
+		start = time.perf_counter()
+		metrics = build_supplier_metrics(rows)
+		elapsed = time.perf_counter() - start
+
+		print(f"build_supplier_metrics: {BENCHMARK_SUPPLIERS} suppliers in {elapsed * 1000:.1f} ms")
+		self.assertEqual(len(metrics), BENCHMARK_SUPPLIERS)
+		self.assertLess(elapsed, 1)
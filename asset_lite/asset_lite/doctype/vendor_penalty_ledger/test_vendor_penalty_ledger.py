@@ -0,0 +1,115 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.sla_penalty import compute_penalty_ledger, group_outages
+
+# Set SLA_PENALTY_BENCHMARK_CONTRACTS=500 to time a year of history for that many contracts
+BENCHMARK_CONTRACTS = int(os.environ.get("SLA_PENALTY_BENCHMARK_CONTRACTS") or 0)
+
+
+def contract(name, assets, max_downtime_hrs=10, penalty_factor=2, start_date="2026-01-01", end_date="2026-12-31"):
+	return {
+		"name": name,
+		"vendor": "Vendor",
+		"start_date": start_date,
+		"end_date": end_date,
+		"max_downtime_hrs": max_downtime_hrs,
+		"penalty_factor": penalty_factor,
+		"assets": assets,
+	}
+
+
+class TestVendorPenaltyLedger(FrappeTestCase):
+	def test_overlapping_outages_count_once(self):
+		outages = {
+			"A": [
+				("WO-1", datetime(2026, 3, 1, 8), datetime(2026, 3, 1, 20)),
+				# Second ticket for the same outage
+				("WO-2", datetime(2026, 3, 1, 10), datetime(2026, 3, 1, 16)),
+			],
+			"B": [("WO-3", datetime(2026, 3, 2, 8), datetime(2026, 3, 2, 12))],
+		}
+		rows = compute_penalty_ledger([contract("SP-1", ["A", "B"])], outages, "2026-01-01", "2026-12-31")
+
+		self.assertEqual(len(rows), 1)
+		self.assertEqual(
+			{key: rows[0][key] for key in ("month", "assets", "work_orders", "downtime_hours", "excess_downtime_hours")},
+			{"month": date(2026, 3, 1), "assets": 2, "work_orders": 3, "downtime_hours": 16, "excess_downtime_hours": 2},
+		)
+		self.assertEqual(rows[0]["penalty"], 4)
+
+	def test_outages_split_by_month_and_clipped_to_term(self):
+		outages = {
+			"A": [
+				("WO-1", datetime(2026, 1, 31, 12), datetime(2026, 2, 1, 12)),
+				("WO-2", datetime(2026, 6, 30, 12), None),
+			]
+		}
+		rows = compute_penalty_ledger(
+			[contract("SP-1", ["A"], max_downtime_hrs=0, end_date="2026-06-30")],
+			outages,
+			"2026-01-01",
+			"2026-12-31",
+			now=datetime(2026, 10, 19),
+		)
+		self.assertEqual(
+			[(row["month"], row["downtime_hours"]) for row in rows],
+			[(date(2026, 1, 1), 12), (date(2026, 2, 1), 12), (date(2026, 6, 1), 12)],
+		)
+
+	def test_closed_work_order_without_completion_date_is_no_outage(self):
+		rows = [
+			frappe._dict(name="WO-1", asset="A", failure_date=datetime(2026, 3, 1), completion_date=None, repair_status="Completed"),
+			frappe._dict(name="WO-2", asset="A", failure_date=datetime(2026, 3, 2), completion_date=None, repair_status="Closed"),
+			frappe._dict(name="WO-3", asset="A", failure_date=datetime(2026, 3, 3), completion_date=None, repair_status="Open"),
+			frappe._dict(
+				name="WO-4", asset="B", failure_date=datetime(2026, 3, 4), completion_date=datetime(2026, 3, 5),
+				repair_status="Closed",
+			),
+		]
+		outages = group_outages(rows)
+
+		self.assertEqual(dict(outages), {
+			"A": [("WO-3", datetime(2026, 3, 3), None)],
+			"B": [("WO-4", datetime(2026, 3, 4), datetime(2026, 3, 5))],
+		})
+
+		# Only the open one runs until now
+		rows = compute_penalty_ledger(
+			[contract("SP-1", ["A"], max_downtime_hrs=0)], outages, "2026-01-01", "2026-12-31",
+			now=datetime(2026, 3, 4),
+		)
+		self.assertEqual([(row["month"], row["downtime_hours"]) for row in rows], [(date(2026, 3, 1), 24)])
+
+	def test_benchmark_year_of_contracts(self):
+		if not BENCHMARK_CONTRACTS:
+			self.skipTest("set SLA_PENALTY_BENCHMARK_CONTRACTS to run")
+
+		rng = random.Random(42)
+		contracts, outages = [], {}
+		for c in range(BENCHMARK_CONTRACTS):
+			assets = [f"A{c}-{a}" for a in range(20)]
+			contracts.append(contract(f"SP-{c}", assets))
+			for asset in assets:
+				outages[asset] = []
+				for w in range(12):
+					start = datetime(2026, 1, 1) + timedelta(hours=rng.randint(0, 364 * 24))
+					outages[asset].append((f"WO-{asset}-{w}", start, start + timedelta(hours=rng.randint(1, 96))))
+
+		start = time.perf_counter()
+		rows = compute_penalty_ledger(contracts, outages, "2026-01-01", "2026-12-31")
+		elapsed = time.perf_counter() - start
+
+		print(
+			f"Penalty ledger for {BENCHMARK_CONTRACTS} contracts, {BENCHMARK_CONTRACTS * 240} outages: "
+			f"{len(rows)} rows in {elapsed:.2f} s"
+		)
+		self.assertLess(elapsed, 10)
@@ -0,0 +1,14 @@
+# Copyright (c) 2026, seyfert and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class VendorPenaltyLedger(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Vendor Penalty Ledger", ["support_plan", "month"])
+	frappe.db.add_index("Vendor Penalty Ledger", ["vendor", "month"])
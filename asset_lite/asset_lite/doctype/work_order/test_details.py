@@ -0,0 +1,87 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.api.details import get_document_details, parse_expand
+from asset_lite.api.work_order_api import get_work_order_details
+
+# Set DETAIL_BENCHMARK_SPARE_PARTS=2000 to compare payload and latency with and without expand
+BENCHMARK_SPARE_PARTS = int(os.environ.get("DETAIL_BENCHMARK_SPARE_PARTS") or 0)
+
+
+def make_work_order(spare_parts):
+	if not frappe.db.exists("Asset Type", "_Test Asset Type"):
+		frappe.get_doc({"doctype": "Asset Type", "asset_type": "_Test Asset Type"}).insert()
+
+	work_order = frappe.get_doc({
+		"doctype": "Work_Order",
+		"asset_type": "_Test Asset Type",
+		"failure_date": "2026-01-01 10:00:00",
+		"description": "Detail test",
+	})
+	for i in range(spare_parts):
+		work_order.append("table_cmqp", {"item_name": f"Part {i}", "qty": 1, "rate": 10, "amount": 10})
+	return work_order.insert()
+
+
+class TestDetails(FrappeTestCase):
+	def test_expand_selects_child_tables(self):
+		work_order = make_work_order(3)
+
+		summary = get_document_details("Work_Order", work_order.name, "")
+		self.assertEqual(summary.description, "Detail test")
+		self.assertNotIn("table_cmqp", summary)
+
+		details = get_document_details("Work_Order", work_order.name, '["table_cmqp"]')
+		self.assertEqual([row.item_name for row in details.table_cmqp], ["Part 0", "Part 1", "Part 2"])
+		self.assertNotIn("stock_items", details)
+
+		full = get_document_details("Work_Order", work_order.name)
+		self.assertEqual(set(parse_expand("Work_Order")), {"table_cmqp", "stock_items", "invoice_table"})
+		self.assertEqual(len(full.table_cmqp), 3)
+
+		self.assertRaises(frappe.ValidationError, parse_expand, "Work_Order", "no_such_table")
+
+	def test_cache_follows_modified(self):
+		work_order = make_work_order(1)
+		get_document_details("Work_Order", work_order.name, "table_cmqp")
+
+		work_order.reload()
+		work_order.description = "Changed"
+		work_order.append("table_cmqp", {"item_name": "Part 1", "qty": 1, "rate": 10, "amount": 10})
+		work_order.save()
+
+		details = get_document_details("Work_Order", work_order.name, "table_cmqp")
+		self.assertEqual(details.description, "Changed")
+		self.assertEqual(len(details.table_cmqp), 2)
+
+	def test_benchmark_expand_vs_full_document(self):
+		if not BENCHMARK_SPARE_PARTS:
+			self.skipTest("set DETAIL_BENCHMARK_SPARE_PARTS to run")
+
+		work_order = make_work_order(BENCHMARK_SPARE_PARTS)
+		runs = 20
+
+		start = time.perf_counter()
+		for _i in range(runs):
+			payload = frappe.as_json(frappe.get_doc("Work_Order", work_order.name).as_dict(), indent=None)
+		full = (time.perf_counter() - start) / runs
+		full_size = len(payload)
+
+		for expand in ("", "table_cmqp"):
+			start = time.perf_counter()
+			for _i in range(runs):
+				get_work_order_details(work_order.name, expand)
+				payload = frappe.as_json(frappe.response["message"], indent=None)
+			elapsed = (time.perf_counter() - start) / runs
+			print(
+				f"Work_Order with {BENCHMARK_SPARE_PARTS} spare parts, expand={expand!r}: "
+				f"{len(payload) / 1024:.0f} KiB in {elapsed * 1000:.1f} ms "
+				f"(get_doc().as_dict(): {full_size / 1024:.0f} KiB in {full * 1000:.1f} ms)"
+			)
+			self.assertLess(elapsed, full)
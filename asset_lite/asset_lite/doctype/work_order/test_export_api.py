@@ -0,0 +1,63 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import json
+import os
+import time
+import tracemalloc
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.api.export_api import get_export_query, iter_export_chunks
+
+# Set EXPORT_BENCHMARK_ROWS=1000000 to measure peak memory of a full export
+BENCHMARK_ROWS = int(os.environ.get("EXPORT_BENCHMARK_ROWS") or 0)
+
+
+def insert_work_orders(count, prefix):
+	now = frappe.utils.now()
+	frappe.db.bulk_insert(
+		"Work_Order",
+		["name", "creation", "modified", "owner", "asset_type", "failure_date", "repair_status", "description"],
+		(
+			(f"{prefix}-{i:07d}", now, now, "Administrator", "_Test Asset Type", now, "Open", "x" * 200)
+			for i in range(count)
+		),
+		chunk_size=10000,
+	)
+
+
+class TestExportApi(FrappeTestCase):
+	def test_export_is_chunked(self):
+		insert_work_orders(3, "EXPORT-TEST")
+		query = get_export_query("Work_Order", {"name": ["like", "EXPORT-TEST-%"]}, ["name", "repair_status"])
+
+		chunks = list(iter_export_chunks(query, "ndjson", chunk_size=2))
+		self.assertEqual(len(chunks), 2)
+		rows = [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+		self.assertEqual([row["name"] for row in rows], [f"EXPORT-TEST-{i:07d}" for i in range(3)])
+
+		csv_lines = b"".join(iter_export_chunks(query, "csv")).decode().splitlines()
+		self.assertEqual(csv_lines[0], "name,repair_status")
+		self.assertEqual(len(csv_lines), 4)
+
+	def test_benchmark_export_memory(self):
+		if not BENCHMARK_ROWS:
+			self.skipTest("set EXPORT_BENCHMARK_ROWS to run")
+
+		insert_work_orders(BENCHMARK_ROWS, "EXPORT-BENCH")
+		query = get_export_query("Work_Order", {"name": ["like", "EXPORT-BENCH-%"]})
+
+		tracemalloc.start()
+		start = time.perf_counter()
+		size = sum(len(chunk) for chunk in iter_export_chunks(query, "ndjson"))
+		elapsed = time.perf_counter() - start
+		_current, peak = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+
+		print(
+			f"NDJSON export of {BENCHMARK_ROWS} work orders: {size / 1024 / 1024:.0f} MiB in {elapsed:.1f} s, "
+			f"peak Python memory {peak / 1024 / 1024:.1f} MiB"
+		)
+		self.assertLess(peak, 64 * 1024 * 1024)
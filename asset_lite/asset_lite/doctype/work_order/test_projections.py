@@ -0,0 +1,52 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import os
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from asset_lite.api.projections import PROJECTION_PROFILES, get_list_fields, get_projection
+from asset_lite.api.work_order_api import get_work_orders
+
+# Set PROJECTION_BENCHMARK_ROWS=1000 to compare payload size and latency per profile
+BENCHMARK_ROWS = int(os.environ.get("PROJECTION_BENCHMARK_ROWS") or 0)
+
+
+class TestProjections(FrappeTestCase):
+	def test_profiles_only_contain_existing_fields(self):
+		for doctype in PROJECTION_PROFILES:
+			meta = frappe.get_meta(doctype)
+			for profile in ("card", "table", "full"):
+				fields = get_projection(doctype, profile)
+				self.assertIn("name", fields)
+				self.assertTrue(all(meta.has_field(field) or field in frappe.model.default_fields for field in fields))
+
+			self.assertLess(len(get_projection(doctype, "card")), len(get_projection(doctype, "table")))
+
+	def test_unknown_fields_are_rejected(self):
+		self.assertEqual(get_list_fields("Work_Order", ["name", "count(name) as total"]), ["name", "count(name) as total"])
+		self.assertRaises(frappe.ValidationError, get_list_fields, "Work_Order", ["name", "no_such_field"])
+		self.assertRaises(frappe.ValidationError, get_projection, "Work_Order", "wide")
+
+	def test_benchmark_payload_per_profile(self):
+		if not BENCHMARK_ROWS:
+			self.skipTest("set PROJECTION_BENCHMARK_ROWS to run")
+
+		now = frappe.utils.now()
+		frappe.db.bulk_insert(
+			"Work_Order",
+			["name", "creation", "modified", "owner", "asset_type", "failure_date", "repair_status", "description", "actions_performed"],
+			[
+				(f"PROJ-BENCH-{i}", now, now, "Administrator", "_Test Asset Type", now, "Open", "x" * 500, "y" * 500)
+				for i in range(BENCHMARK_ROWS)
+			],
+		)
+
+		for profile in ("card", "table", "full"):
+			start = time.perf_counter()
+			get_work_orders(limit=BENCHMARK_ROWS, profile=profile)
+			elapsed = time.perf_counter() - start
+			payload = len(frappe.as_json(frappe.response["message"], indent=None))
+			print(f"get_work_orders {profile}: {payload / 1024:.0f} KiB, {elapsed * 1000:.0f} ms for {BENCHMARK_ROWS} rows")
@@ -1,9 +1,149 @@
 # Copyright (c) 2024, seyfert and Contributors
 # See license.txt
 
-# import frappe
+import os
+import time
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from asset_lite.api.bulk_api import transition_documents
+from asset_lite.api.patch_api import apply_partial_update
+from asset_lite.api.work_order_api import create_work_order, update_work_order, upsert_work_order_rows
+
+# Set WORK_ORDER_BENCHMARK_ROWS=5000 to compare bulk and single-row throughput
+BENCHMARK_ROWS = int(os.environ.get("WORK_ORDER_BENCHMARK_ROWS") or 0)
+# Set WORK_ORDER_BENCHMARK_CHILD_ROWS=500 to time field edits on a large spare parts table
+BENCHMARK_CHILD_ROWS = int(os.environ.get("WORK_ORDER_BENCHMARK_CHILD_ROWS") or 0)
+
+
+def make_rows(count):
+	return [
+		{"asset_type": "_Test Asset Type", "failure_date": "2026-01-01 10:00:00", "description": f"Bulk {i}"}
+		for i in range(count)
+	]
+
 
 class TestWork_Order(FrappeTestCase):
-	pass
+	def setUp(self):
+		if not frappe.db.exists("Asset Type", "_Test Asset Type"):
+			frappe.get_doc({"doctype": "Asset Type", "asset_type": "_Test Asset Type"}).insert()
+		self.created = []
+
+	def tearDown(self):
+		for name in self.created:
+			frappe.delete_doc("Work_Order", name, force=True)
+		frappe.db.commit()
+
+	def test_bulk_upsert_reports_per_row_results(self):
+		rows = make_rows(3)
+		rows[1].pop("failure_date")
+
+		results = upsert_work_order_rows(rows, chunk_size=2)
+		self.created = [result["name"] for result in results if result["success"]]
+
+		self.assertEqual([result["success"] for result in results], [True, False, True])
+		self.assertEqual(len(self.created), 2)
+
+		results = upsert_work_order_rows([{"name": self.created[0], "description": "Updated"}])
+		self.assertEqual(results[0]["action"], "updated")
+		self.assertEqual(frappe.db.get_value("Work_Order", self.created[0], "description"), "Updated")
+
+	def test_benchmark_bulk_vs_single_row(self):
+		if not BENCHMARK_ROWS:
+			self.skipTest("set WORK_ORDER_BENCHMARK_ROWS to run")
+
+		start = time.perf_counter()
+		for row in make_rows(BENCHMARK_ROWS):
+			create_work_order(frappe.as_json(row))
+			self.created.append(frappe.response["message"]["work_order"]["name"])
+		single = time.perf_counter() - start
+
+		start = time.perf_counter()
+		results = upsert_work_order_rows(make_rows(BENCHMARK_ROWS), chunk_size=500)
+		bulk = time.perf_counter() - start
+		self.created += [result["name"] for result in results if result["success"]]
+
+		print(
+			f"{BENCHMARK_ROWS} work orders: single-row {BENCHMARK_ROWS / single:.0f} rows/s, "
+			f"bulk {BENCHMARK_ROWS / bulk:.0f} rows/s"
+		)
+		self.assertLess(bulk, single)
+
+	def test_partial_update_checks_modified(self):
+		results = upsert_work_order_rows(make_rows(1))
+		self.created = [results[0]["name"]]
+		modified = frappe.db.get_value("Work_Order", self.created[0], "modified")
+
+		patched = apply_partial_update(
+			"Work_Order", self.created[0], {"description": "Patched", "modified": modified}
+		)
+		self.assertEqual(patched.description, "Patched")
+		self.assertEqual(frappe.db.get_value("Work_Order", self.created[0], "description"), "Patched")
+
+		with self.assertRaises(frappe.TimestampMismatchError):
+			apply_partial_update("Work_Order", self.created[0], {"description": "Stale", "modified": modified})
+
+		# Fields outside the patch profile fall back to a full save
+		self.assertIsNone(apply_partial_update("Work_Order", self.created[0], {"asset_type": "_Test Asset Type"}))
+		# Status changes run the server scripts and hooks of a full save
+		self.assertIsNone(apply_partial_update("Work_Order", self.created[0], {"repair_status": "Completed"}))
+
+	def test_bulk_transition_reports_per_row_outcome(self):
+		results = upsert_work_order_rows(make_rows(2))
+		self.created = [result["name"] for result in results]
+
+		results = transition_documents("Work_Order", [*self.created, "_Missing Work Order"], status="Completed")
+
+		self.assertEqual([result["success"] for result in results], [True, True, False])
+		self.assertEqual(results[2]["name"], "_Missing Work Order")
+		self.assertEqual(
+			set(frappe.get_all("Work_Order", {"name": ["in", self.created]}, pluck="repair_status")), {"Completed"}
+		)
+
+	def test_create_replays_idempotency_key(self):
+		frappe.form_dict["idempotency_key"] = frappe.generate_hash()
+		try:
+			create_work_order(frappe.as_json(make_rows(1)[0]))
+			first = frappe.response["message"]
+			create_work_order(frappe.as_json(make_rows(1)[0]))
+			second = frappe.response["message"]
+		finally:
+			frappe.form_dict.pop("idempotency_key")
+
+		self.created = [first["work_order"]["name"]]
+		self.assertTrue(first["success"])
+		self.assertEqual(second["work_order"]["name"], first["work_order"]["name"])
+		self.assertEqual(frappe.db.count("Work_Order", {"description": "Bulk 0"}), 1)
+
+	def test_benchmark_field_edit_partial_vs_full_save(self):
+		if not BENCHMARK_CHILD_ROWS:
+			self.skipTest("set WORK_ORDER_BENCHMARK_CHILD_ROWS to run")
+
+		work_order = frappe.get_doc({"doctype": "Work_Order", **make_rows(1)[0]})
+		for i in range(BENCHMARK_CHILD_ROWS):
+			work_order.append("table_cmqp", {"item_name": f"Part {i}", "qty": 1, "rate": 10, "amount": 10})
+		work_order.insert()
+		self.created = [work_order.name]
+
+		# repair_status always takes a full save, so time a field of the patch profile
+		hours = [1.5, 2.5] * 10
+
+		start = time.perf_counter()
+		for value in hours:
+			doc = frappe.get_doc("Work_Order", work_order.name)
+			doc.total_hours_spent = value
+			doc.save()
+		full = (time.perf_counter() - start) / len(hours)
+
+		start = time.perf_counter()
+		for value in hours:
+			update_work_order(work_order.name, {"total_hours_spent": value})
+			self.assertTrue(frappe.response["message"]["partial"])
+		partial = (time.perf_counter() - start) / len(hours)
+
+		print(
+			f"total_hours_spent edit with {BENCHMARK_CHILD_ROWS} child rows: "
+			f"full save {full * 1000:.1f} ms, partial update {partial * 1000:.1f} ms"
+		)
+		self.assertLess(partial, full)
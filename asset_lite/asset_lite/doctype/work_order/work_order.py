@@ -4,7 +4,32 @@
 import frappe
 from frappe.model.document import Document
 
+from asset_lite.coverage import resolve_coverage
+
+# Work_Order fields filled from the asset's coverage on insert
+COVERAGE_FIELDS = ("warranty", "service_contract", "covering_spare_parts", "covering_labour", "ppm_only",
+    "spare_parts_labour")
+
 class Work_Order(Document):
+    def before_insert(self):
+        self.set_coverage()
+
+    def validate(self):
+        # A draft moved to another asset or failure date is covered by what covers that
+        before = self.get_doc_before_save()
+        if self.docstatus == 0 and before and (before.asset != self.asset or before.failure_date != self.failure_date):
+            self.set_coverage(overwrite=True)
+
+    def set_coverage(self, overwrite=False):
+        # Coverage on the failure date, from the cached coverage index. Flags the
+        # client already set are kept unless overwrite
+        if not self.asset:
+            return
+        coverage = resolve_coverage(self.asset, self.failure_date)
+        for fieldname in COVERAGE_FIELDS:
+            if overwrite or not self.get(fieldname):
+                self.set(fieldname, coverage[fieldname])
+
     @frappe.whitelist()
     def check_site_version(self):
         # Fetch the site version type from the site configuration
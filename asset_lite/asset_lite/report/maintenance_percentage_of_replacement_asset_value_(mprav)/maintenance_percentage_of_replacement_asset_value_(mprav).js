@@ -4,6 +4,13 @@
 frappe.query_reports["Maintenance Percentage of Replacement Asset Value (MPRAV)"] = {
 	"filters": [
 
+		{
+            "fieldname": "company",
+            "label": "Hospital",
+            "fieldtype": "Link",
+            "options": "Company",
+            "reqd": 0
+        },
 		{
             "fieldname": "department",
             "label": "Department",
@@ -32,6 +39,12 @@ frappe.query_reports["Maintenance Percentage of Replacement Asset Value (MPRAV)"
             "options": "\nMonthly\nQuarterly\nHalf-Yearly\nYearly",
             "default": "Monthly",
             "reqd": 1
+        },
+        {
+            "fieldname": "group_by_hospital",
+            "label": "Breakdown by Hospital",
+            "fieldtype": "Check",
+            "default": 0
         }
 
 	]
@@ -1,50 +1,23 @@
+import hashlib
+import json
+
 import frappe
-from frappe.utils import flt, fmt_money
+from frappe.utils import flt, getdate
 
-def execute(filters=None):
-    filters = filters or {}
+# Results are cached per filter combination for this many seconds
+CACHE_TTL = 600
 
-    # Determine the grouping format based on periodicity
-    periodicity = filters.get("periodicity", "Monthly")
-    if periodicity == "Quarterly":
-        date_format = "CONCAT(YEAR(wo.failure_date), ' Q', QUARTER(wo.failure_date))"
-    elif periodicity == "Half-Yearly":
-        date_format = "CONCAT(YEAR(wo.failure_date), ' H', IF(MONTH(wo.failure_date) <= 6, 1, 2))"
-    elif periodicity == "Yearly":
-        date_format = "YEAR(wo.failure_date)"
-    else:  # Default to Monthly
-        date_format = "DATE_FORMAT(wo.failure_date, '%%m-%%Y')"
+# SQL expression giving the first day of the period containing a date column
+PERIOD_START = {
+    "Monthly": "DATE(DATE_FORMAT({0}, '%%Y-%%m-01'))",
+    "Quarterly": "MAKEDATE(YEAR({0}), 1) + INTERVAL (QUARTER({0}) - 1) QUARTER",
+    "Half-Yearly": "MAKEDATE(YEAR({0}), 1) + INTERVAL IF(MONTH({0}) <= 6, 0, 6) MONTH",
+    "Yearly": "MAKEDATE(YEAR({0}), 1)",
+}
 
-    # Construct conditions for filtering based on Asset fields
-    asset_conditions = ""
-    if filters.get("department"):
-        asset_conditions += " AND asset.department = %(department)s"
-    if filters.get("vendor"):
-        asset_conditions += " AND asset.custom_vendor = %(vendor)s"
-    if filters.get("asset_class"):
-        asset_conditions += " AND asset.custom_class = %(asset_class)s"
 
-    # Query to calculate the sum of repair costs from Material Request linked to Work Order and Asset
-    repair_costs = frappe.db.sql(f"""
-        SELECT SUM(mri.amount) AS total_repair_cost,
-               {date_format} AS date
-        FROM `tabMaterial Request Item` mri
-        JOIN `tabMaterial Request` mr ON mri.parent = mr.name
-        JOIN `tabWork_Order` wo ON mr.custom_work_orders = wo.name
-        JOIN `tabAsset` asset ON wo.asset = asset.name
-        WHERE mr.material_request_type = 'Purchase'
-        {asset_conditions}
-        GROUP BY {date_format}
-    """, filters, as_dict=True)
-
-    # Query to calculate the sum of actual asset costs for the filtered assets
-    actual_asset_cost = frappe.db.sql(f"""
-        SELECT SUM(asset.gross_purchase_amount) AS total_actual_cost
-        FROM `tabAsset` asset
-        WHERE 1=1 {asset_conditions}
-    """, filters, as_dict=True)[0]
-
-    total_actual_cost = flt(actual_asset_cost['total_actual_cost'])
+def execute(filters=None):
+    filters = filters or {}
 
     # Prepare columns
     columns = [
@@ -73,58 +46,172 @@ def execute(filters=None):
             "width": 200
         }
     ]
+    if filters.get("group_by_hospital"):
+        columns.insert(1, {
+            "label": "Hospital",
+            "fieldname": "company",
+            "fieldtype": "Link",
+            "options": "Company",
+            "width": 200
+        })
+
+    cache_key = "mprav_report:" + hashlib.sha1(
+        json.dumps(filters, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    cached = frappe.cache().get_value(cache_key)
+    if cached:
+        return columns, cached["data"], None, cached["chart"]
+
+    data = get_data(filters)
+    chart = get_chart(data, filters)
+    frappe.cache().set_value(cache_key, {"data": data, "chart": chart}, expires_in_sec=CACHE_TTL)
+
+    # Return the report data and chart
+    return columns, data, None, chart
+
+
+def get_data(filters):
+    periodicity = filters.get("periodicity") if filters.get("periodicity") in PERIOD_START else "Monthly"
+    period_start = PERIOD_START[periodicity]
+
+    # Construct conditions for filtering based on Asset fields
+    asset_conditions = ""
+    if filters.get("company"):
+        asset_conditions += " AND asset.company = %(company)s"
+    if filters.get("department"):
+        asset_conditions += " AND asset.department = %(department)s"
+    if filters.get("vendor"):
+        asset_conditions += " AND asset.custom_vendor = %(vendor)s"
+    if filters.get("asset_class"):
+        asset_conditions += " AND asset.custom_class = %(asset_class)s"
+
+    # Repair costs per period and asset value added (in service) or removed
+    # (disposed) per period, all in one round trip
+    rows = frappe.db.sql(f"""
+        SELECT 'cost' AS kind,
+               {period_start.format("wo.failure_date")} AS period,
+               asset.company AS company,
+               SUM(mri.amount) AS amount
+        FROM `tabMaterial Request Item` mri
+        JOIN `tabMaterial Request` mr ON mri.parent = mr.name
+        JOIN `tabWork_Order` wo ON mr.custom_work_orders = wo.name
+        JOIN `tabAsset` asset ON wo.asset = asset.name
+        WHERE mr.material_request_type = 'Purchase'
+            AND wo.failure_date IS NOT NULL
+            {asset_conditions}
+        GROUP BY period, asset.company
+
+        UNION ALL
+
+        SELECT 'value',
+               {period_start.format("asset.available_for_use_date")},
+               asset.company,
+               SUM(asset.gross_purchase_amount)
+        FROM `tabAsset` asset
+        WHERE asset.docstatus = 1
+            AND asset.available_for_use_date IS NOT NULL
+            {asset_conditions}
+        GROUP BY 2, asset.company
+
+        UNION ALL
+
+        SELECT 'value',
+               {period_start.format("asset.disposal_date")},
+               asset.company,
+               -SUM(asset.gross_purchase_amount)
+        FROM `tabAsset` asset
+        WHERE asset.docstatus = 1
+            AND asset.available_for_use_date IS NOT NULL
+            AND asset.disposal_date IS NOT NULL
+            {asset_conditions}
+        GROUP BY 2, asset.company
+    """, filters, as_dict=True)
 
-    # Prepare data for report and chart
+    return build_period_rows(rows, periodicity, bool(filters.get("group_by_hospital")))
+
+
+def build_period_rows(rows, periodicity, group_by_hospital=False):
+    """
+    Sweep period-ordered rows once, keeping a running in-service asset value
+    so every period's repair cost is divided by the asset base of that period
+
+    Args:
+        rows: Dicts with kind ('cost' or 'value'), period, company and amount
+        periodicity: Monthly, Quarterly, Half-Yearly or Yearly (for labels)
+        group_by_hospital: Keep a separate asset base and row per company
+
+    Returns:
+        Report rows in chronological order
+    """
+    # Asset value changes sort before costs of the same period
+    rows = sorted(rows, key=lambda row: (getdate(row["period"]), row["kind"] == "cost"))
+
+    asset_value = {}
     data = []
-    chart_labels = []
-    chart_values = []
-    tooltip_data = []
-
-    for row in repair_costs:
-        total_repair_cost = flt(row['total_repair_cost'])
-        cost_ratio = round(((total_repair_cost * 100) / total_actual_cost), 2) if total_actual_cost else 0
-        data.append({
-            "date": row['date'],
-            "total_repair_cost": total_repair_cost,
-            "total_actual_cost": total_actual_cost,
-            "cost_ratio": cost_ratio
-        })
-        chart_labels.append(row['date'])
-        chart_values.append(cost_ratio)
-        tooltip_data.append(f"Date: {row['date']}<br>Cost Ratio: {cost_ratio}%<br>"
-                            f"Repair Cost: {fmt_money(total_repair_cost)}<br>"
-                            f"Actual Asset Cost: {fmt_money(total_actual_cost)}")
+    for row in rows:
+        key = row["company"] if group_by_hospital else None
+        if row["kind"] == "value":
+            asset_value[key] = asset_value.get(key, 0) + flt(row["amount"])
+            continue
+
+        total_repair_cost = flt(row["amount"])
+        total_actual_cost = flt(asset_value.get(key))
+        period_label = get_period_label(getdate(row["period"]), periodicity)
+        if not group_by_hospital and data and data[-1]["date"] == period_label:
+            # Several companies contributed to the same period
+            data[-1]["total_repair_cost"] += total_repair_cost
+        else:
+            data.append({
+                "date": period_label,
+                "company": key,
+                "total_repair_cost": total_repair_cost,
+                "total_actual_cost": total_actual_cost,
+            })
+
+    for row in data:
+        row["cost_ratio"] = (
+            round((row["total_repair_cost"] * 100) / row["total_actual_cost"], 2)
+            if row["total_actual_cost"] else 0
+        )
+
+    return data
+
+
+def get_period_label(period, periodicity):
+    """Label for a period start date, matching the report's historical format"""
+    if periodicity == "Quarterly":
+        return f"{period.year} Q{(period.month - 1) // 3 + 1}"
+    if periodicity == "Half-Yearly":
+        return f"{period.year} H{1 if period.month <= 6 else 2}"
+    if periodicity == "Yearly":
+        return str(period.year)
+    return period.strftime("%m-%Y")
+
+
+def get_chart(data, filters):
+    # One dataset overall, or one per hospital when broken down
+    labels = list(dict.fromkeys(row["date"] for row in data))
+    if filters.get("group_by_hospital"):
+        index = {label: i for i, label in enumerate(labels)}
+        datasets = {}
+        for row in data:
+            values = datasets.setdefault(row["company"], [0] * len(labels))
+            values[index[row["date"]]] = row["cost_ratio"]
+        datasets = [{"name": company, "values": values} for company, values in datasets.items()]
+    else:
+        datasets = [{
+            "name": "Repair Cost to Asset Cost Ratio (%)",
+            "values": [row["cost_ratio"] for row in data],
+        }]
 
     # Define the chart
-    chart = {
+    return {
         "data": {
-            "labels": chart_labels,
-            "datasets": [
-                {
-                    "name": "Repair Cost to Asset Cost Ratio (%)",
-                    "values": chart_values,
-                    "type": "bar",
-                    "barWidth": 15,
-                    "color": "#FF5733"
-                }
-            ]
+            "labels": labels,
+            "datasets": datasets
         },
         "type": "bar",
         "height": 300,
-        "tooltip_options": {
-            "enabled": True,
-            "custom": {
-                "content": lambda tooltip_item: {
-                    "title": tooltip_data[tooltip_item['dataIndex']]['date'],
-                    "body": [
-                        f"Repair Cost: {tooltip_data[tooltip_item['dataIndex']]['repair_cost']}",
-                        f"Actual Asset Cost: {tooltip_data[tooltip_item['dataIndex']]['actual_cost']}",
-                        #f"Cost Ratio: {tooltip_data[tooltip_item['dataIndex']]['cost_ratio']}"
-                    ]
-                }
-            }
-        }
+        "colors": ["#FF5733"],
+        "fieldtype": "Percent"
     }
-
-    # Return the report data and chart
-    return columns, data, None, chart
\ No newline at end of file
@@ -0,0 +1,78 @@
+# Copyright (c) 2026, seyfert and Contributors
+# See license.txt
+
+import importlib
+import os
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+REPORT_MODULE = (
+	"asset_lite.asset_lite.report.maintenance_percentage_of_replacement_asset_value_(mprav)"
+	".maintenance_percentage_of_replacement_asset_value_(mprav)"
+)
+
+# Set MPRAV_BENCHMARK_ROWS=1000000 to run the material request item benchmark
+BENCHMARK_ROWS = int(os.environ.get("MPRAV_BENCHMARK_ROWS") or 0)
+
+
+class TestMPRAVReport(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.report = importlib.import_module(REPORT_MODULE)
+
+	def test_asset_base_follows_available_for_use_date(self):
+		rows = [
+			{"kind": "value", "period": "2025-01-01", "company": "H1", "amount": 1000},
+			{"kind": "cost", "period": "2025-01-01", "company": "H1", "amount": 100},
+			{"kind": "cost", "period": "2025-03-01", "company": "H2", "amount": 30},
+			{"kind": "value", "period": "2025-03-01", "company": "H2", "amount": 500},
+			{"kind": "value", "period": "2025-04-01", "company": "H1", "amount": -1000},
+			{"kind": "cost", "period": "2025-04-01", "company": "H2", "amount": 50},
+		]
+
+		data = self.report.build_period_rows(rows, "Monthly")
+		self.assertEqual([row["date"] for row in data], ["01-2025", "03-2025", "04-2025"])
+		self.assertEqual([row["total_actual_cost"] for row in data], [1000, 1500, 500])
+		self.assertEqual([row["cost_ratio"] for row in data], [10, 2, 10])
+
+		data = self.report.build_period_rows(rows, "Quarterly", group_by_hospital=True)
+		self.assertEqual(
+			[(row["date"], row["company"], row["total_actual_cost"]) for row in data],
+			[("2025 Q1", "H1", 1000), ("2025 Q1", "H2", 500), ("2025 Q2", "H2", 500)],
+		)
+
+	def test_benchmark_material_request_items(self):
+		if not BENCHMARK_ROWS:
+			self.skipTest("set MPRAV_BENCHMARK_ROWS to run")
+
+		asset = frappe.db.get_value("Asset", {"docstatus": 1}, "name")
+		work_order = frappe.db.get_value("Work_Order", {"asset": asset, "failure_date": ["is", "set"]}, "name")
+		if not work_order:
+			self.skipTest("needs a submitted Asset with a Work_Order that has a failure date")
+
+		now = frappe.utils.now()
+		requests = max(BENCHMARK_ROWS // 100, 1)
+		frappe.db.bulk_insert(
+			"Material Request",
+			["name", "creation", "modified", "material_request_type", "custom_work_orders", "docstatus"],
+			[(f"MPRAV-BENCH-{i}", now, now, "Purchase", work_order, 1) for i in range(requests)],
+		)
+		frappe.db.bulk_insert(
+			"Material Request Item",
+			["name", "creation", "modified", "parent", "parenttype", "parentfield", "qty", "amount"],
+			(
+				(f"MPRAV-BENCH-ITEM-{i}", now, now, f"MPRAV-BENCH-{i % requests}", "Material Request", "items", 1, 10)
+				for i in range(BENCHMARK_ROWS)
+			),
+			chunk_size=10000,
+		)
+
+		start = time.perf_counter()
+		_columns, data, _message, _chart = self.report.execute({"periodicity": "Monthly", "benchmark": start})
+		elapsed = time.perf_counter() - start
+
+		print(f"MPRAV report over {BENCHMARK_ROWS} material request items: {elapsed:.2f} s")
+		self.assertTrue(data)
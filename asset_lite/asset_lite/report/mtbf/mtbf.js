@@ -4,6 +4,21 @@
 frappe.query_reports["MTBF"] = {
 	"filters": [
 		{
+            "fieldname": "group_by",
+            "label": "Group By",
+            "fieldtype": "Select",
+            "options": ["Asset","Model","Manufacturer","Department"],
+            "default": "Asset",
+            "reqd": 1
+        },
+		{
+            "fieldname": "company",
+            "label": "Hospital",
+            "fieldtype": "Link",
+            "options": "Company",
+            "reqd": 0
+        },
+		{
             "fieldname": "department",
             "label": "Department",
             "fieldtype": "Link",
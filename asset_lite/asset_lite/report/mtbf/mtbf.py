@@ -1,22 +1,27 @@
 # Copyright (c) 2025, seyfert and contributors
 # For license information, please see license.txt
 
-# import frappe
-
-
-#def execute(filters=None):
-#	columns, data = [], []
-#	return columns, data
-
-
 import frappe
 from frappe.utils import flt
 
+# Group by option -> (SQL expression, column definition)
+GROUP_BY_FIELDS = {
+    "Asset": ("ar.asset", {"fieldtype": "Link", "options": "Asset"}),
+    "Model": ("asset.custom_model", {"fieldtype": "Data"}),
+    "Manufacturer": ("asset.custom_manufacturer", {"fieldtype": "Link", "options": "Manufacturer"}),
+    "Department": ("asset.department", {"fieldtype": "Link", "options": "Department"}),
+}
+
+
 def execute(filters=None):
     filters = filters or {}
+    group_by = filters.get("group_by") if filters.get("group_by") in GROUP_BY_FIELDS else "Asset"
+    group_field, group_column = GROUP_BY_FIELDS[group_by]
 
     # Construct conditions for filtering based on Asset fields
     asset_conditions = ""
+    if filters.get("company"):
+        asset_conditions += " AND asset.company = %(company)s"
     if filters.get("department"):
         asset_conditions += " AND asset.department = %(department)s"
     if filters.get("asset"):
@@ -26,40 +31,42 @@ def execute(filters=None):
     if filters.get("vendor"):
         asset_conditions += " AND asset.custom_vendor = %(vendor)s"
 
-    # Query to calculate sum of uptime and downtime hours grouped by asset and available for use date
-    uptime_downtime = frappe.db.sql("""
-        SELECT 
-            asset.name AS asset_name,
-			asset.asset_name AS asset,
-            DATE_FORMAT(asset.available_for_use_date, '%%m-%%Y') AS available_date,
-            SUM(asset.custom_up_time) AS total_uptime_hours,
-            SUM(asset.custom_down_time) AS total_downtime_hours
-        FROM `tabAsset` asset
-        
+    # Roll up the per-asset metrics cached from work order failure history
+    reliability = frappe.db.sql("""
+        SELECT
+            {group_field} AS group_value,
+            MAX(asset.asset_name) AS asset,
+            COUNT(*) AS asset_count,
+            SUM(ar.failures) AS failures,
+            SUM(ar.repairs) AS repairs,
+            SUM(ar.operating_hours) AS operating_hours,
+            SUM(ar.repair_hours) AS repair_hours
+        FROM `tabAsset Reliability` ar
+        JOIN `tabAsset` asset ON asset.name = ar.asset
         WHERE 1=1 {asset_conditions}
-        GROUP BY asset.asset_name,asset.custom_vendor,asset.department
-    """.format(asset_conditions=asset_conditions), filters, as_dict=True)
+        GROUP BY {group_field}
+        ORDER BY failures DESC
+    """.format(group_field=group_field, asset_conditions=asset_conditions), filters, as_dict=True)
 
     # Prepare columns
     columns = [
         {
-            "label": "Asset",
-            "fieldname": "asset_name",
-            "fieldtype": "Link",
-			"options":"Asset",
-            "width": 150
+            "label": group_by,
+            "fieldname": "group_value",
+            "width": 180,
+            **group_column
         },
-		 {
-            "label": "Asset Name",
-            "fieldname": "asset",
-            "fieldtype": "Data",
+        {
+            "label": "Asset Name" if group_by == "Asset" else "Assets",
+            "fieldname": "asset" if group_by == "Asset" else "asset_count",
+            "fieldtype": "Data" if group_by == "Asset" else "Int",
             "width": 150
         },
         {
-            "label": "Available Date",
-            "fieldname": "available_date",
-            "fieldtype": "Data",
-            "width": 150
+            "label": "Failures",
+            "fieldname": "failures",
+            "fieldtype": "Int",
+            "width": 100
         },
         {
             "label": "Total Uptime Hours",
@@ -74,29 +81,43 @@ def execute(filters=None):
             "width": 150
         },
         {
-            "label": "Uptime to Downtime Ratio",
-            "fieldname": "uptime_downtime_ratio",
+            "label": "MTBF (Hours)",
+            "fieldname": "mtbf_hours",
             "fieldtype": "Float",
-            "width": 200
+            "width": 130
+        },
+        {
+            "label": "MTTR (Hours)",
+            "fieldname": "mttr_hours",
+            "fieldtype": "Float",
+            "width": 130
+        },
+        {
+            "label": "Availability",
+            "fieldname": "availability",
+            "fieldtype": "Percent",
+            "width": 120
         }
     ]
 
     # Prepare data
     data = []
-    for row in uptime_downtime:
-        total_uptime_hours = flt(row['total_uptime_hours'])
-        total_downtime_hours = flt(row['total_downtime_hours'])
-        ratio = (total_uptime_hours / total_downtime_hours) if total_downtime_hours else 0
+    for row in reliability:
+        failures = int(row['failures'] or 0)
+        repairs = int(row['repairs'] or 0)
+        total_uptime_hours = flt(row['operating_hours'])
+        total_downtime_hours = flt(row['repair_hours'])
+        total_hours = total_uptime_hours + total_downtime_hours
         data.append({
-            "asset_name": row['asset_name'],
-			"asset": row['asset'],
-            "available_date": row['available_date'],
-            "total_uptime_hours": total_uptime_hours,
-            "total_downtime_hours": total_downtime_hours,
-            "uptime_downtime_ratio": round(ratio, 2)
+            "group_value": row['group_value'],
+            "asset": row['asset'],
+            "asset_count": row['asset_count'],
+            "failures": failures,
+            "total_uptime_hours": flt(total_uptime_hours, 2),
+            "total_downtime_hours": flt(total_downtime_hours, 2),
+            "mtbf_hours": flt(total_uptime_hours / failures, 2) if failures else 0,
+            "mttr_hours": flt(total_downtime_hours / repairs, 2) if repairs else 0,
+            "availability": flt(total_uptime_hours * 100 / total_hours, 2) if total_hours else 100
         })
 
     return columns, data
-
-
-
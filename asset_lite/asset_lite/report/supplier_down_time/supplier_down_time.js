@@ -9,6 +9,25 @@ frappe.query_reports["Supplier Down Time"] = {
             "fieldtype": "Link",
             "options": "Supplier",
             "reqd": 0, // Optional filter
+        },
+        {
+            "fieldname": "company",
+            "label": __("Hospital"),
+            "fieldtype": "Link",
+            "options": "Company",
+            "reqd": 0
+        },
+        {
+            "fieldname": "from_date",
+            "label": __("From Date"),
+            "fieldtype": "Date",
+            "reqd": 0
+        },
+        {
+            "fieldname": "to_date",
+            "label": __("To Date"),
+            "fieldtype": "Date",
+            "reqd": 0
         }
 
 	],
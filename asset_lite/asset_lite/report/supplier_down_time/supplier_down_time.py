@@ -2,6 +2,9 @@
 # For license information, please see license.txt
 
 import frappe
+from frappe.utils import flt, getdate
+
+from asset_lite.availability import get_rollup_ranges
 
 
 #def execute(filters=None):
@@ -23,33 +26,51 @@ def get_columns():
     ]
 
 def get_data(filters):
-    # Apply filters for supplier if provided
-    supplier_condition = ""
+    filters = frappe._dict(filters or {})
+    to_date = min(getdate(filters.get("to_date") or None), getdate())
+    from_date = filters.get("from_date") or frappe.db.sql("""
+        SELECT MIN(period) FROM `tabAsset Availability Rollup` WHERE period_type = 'Day'
+    """)[0][0]
+    ranges = get_rollup_ranges(from_date, to_date) if from_date else []
+    if not ranges:
+        return []
+
+    # Parameterized conditions on the rollup dimensions
+    conditions = ""
     if filters.get("supplier"):
-        supplier_condition = f"AND a.custom_vendor = '{filters.get('supplier')}'"
+        conditions += " AND vendor = %(supplier)s"
+    if filters.get("company"):
+        conditions += " AND company = %(company)s"
+
+    values = {"supplier": filters.get("supplier"), "company": filters.get("company")}
+    periods = []
+    for i, (period_type, first, last) in enumerate(ranges):
+        periods.append(f"(period_type = %(type_{i})s AND period BETWEEN %(from_{i})s AND %(to_{i})s)")
+        values.update({f"type_{i}": period_type, f"from_{i}": first, f"to_{i}": last})
 
-    # Fetch the Sum of Total Hours and Downtime grouped by Supplier
+    # Service and downtime minutes from the availability rollups, which are
+    # already summed per vendor and day or month: the cost grows with the
+    # number of suppliers and months, not with the number of assets
     results = frappe.db.sql(f"""
         SELECT
-            a.custom_vendor AS supplier,
-            SUM(a.custom_total_hours) AS total_hours,
-            SUM(a.custom_down_time) AS downtime
+            vendor AS supplier,
+            SUM(service_minutes) / 60 AS total_hours,
+            SUM(downtime_minutes) / 60 AS downtime
         FROM
-            `tabAsset` a
+            `tabAsset Availability Rollup`
         WHERE
-            a.docstatus = 1
-            {supplier_condition}
+            IFNULL(vendor, '') != ''
+            AND ({" OR ".join(periods)})
+            {conditions}
         GROUP BY
-            a.custom_vendor
-        ORDER BY
-            total_hours DESC
-    """, as_dict=True)
+            vendor
+    """, values, as_dict=True)
 
     # Prepare the data
     data = []
     for row in results:
-        total_hours = row.get("total_hours", 0)
-        downtime = row.get("downtime", 0)
+        total_hours = flt(row.get("total_hours"))
+        downtime = flt(row.get("downtime"))
 
         # Calculate percentage
         percentage = round((downtime / total_hours * 100), 2) if total_hours > 0 else 0
@@ -75,7 +96,7 @@ def get_data(filters):
             "status": status,
         })
 
-        # Sort data by percentage in ascending order
-        data.sort(key=lambda x: x["percentage"])
+    # Sort data by percentage in ascending order
+    data.sort(key=lambda x: x["percentage"])
 
     return data
@@ -27,47 +27,27 @@ def get_columns():
 def get_data(filters):
     supplier_condition = ""
     if filters and filters.get("vendor"):
-        supplier_condition = supplier_condition+f"AND wo.vendor = '{filters.get('vendor')}'"
+        supplier_condition = "AND m.supplier = %(vendor)s"
 
-    # Step 1: Fetch Total Hours and Group by Supplier
+    # Repair hours and asset counts come precomputed from the supplier scorecard pipeline
     work_orders = frappe.db.sql(f"""
         SELECT
-            wo.vendor AS vendor,
-            SUM(wo.total_hours_spent) AS total_hours
+            m.supplier AS vendor,
+            m.repair_hours AS total_hours,
+            m.total_assets AS total_assets
         FROM
-            `tabWork_Order` wo
+            `tabSupplier Scorecard Metrics` m
         WHERE
-         wo.vendor IS NOT NULL AND
-         wo.docstatus =1
-           {supplier_condition}
-        GROUP BY
-            wo.vendor
+            m.work_orders > 0
+            {supplier_condition}
         ORDER BY
             total_hours DESC
-    """, as_dict=True)
+    """, filters or {}, as_dict=True)
 
-    # Step 2: Fetch Total Assets for each Supplier
-    supplier_assets = frappe.db.sql(f"""
-        SELECT
-            asset.custom_vendor AS vendor,
-            COUNT(asset.name) AS total_assets
-        FROM
-            `tabAsset` asset
-        WHERE
-            asset.custom_vendor IS NOT NULL
-            AND asset.docstatus = 1
-            
-        GROUP BY
-            asset.custom_vendor
-    """, as_dict=True)
-
-    # Map total assets by vendor for easy lookup
-    asset_map = {entry["vendor"]: entry["total_assets"] for entry in supplier_assets}
-
-    # Step 3: Calculate Repair Hours per Asset and Status
+    # Calculate Repair Hours per Asset and Status
     data = []
     for wo in work_orders:
-        total_assets = asset_map.get(wo["vendor"], 0)  # Get total assets for the vendor
+        total_assets = wo["total_assets"] or 0  # Get total assets for the vendor
         total_hours = round(wo["total_hours"], 2)  # Round total hours to 2 decimal places
         hours_per_asset = round((wo["total_hours"] / total_assets),2) if total_assets > 0 else 0  # Avoid division by zero
 
@@ -1,5 +1,14 @@
 import frappe
-import random
+
+from asset_lite.supplier_scorecard import METRIC_FIELDS
+
+# Chart bands by minimum score, highest band first
+SCORE_BANDS = (
+    (80, "High", "#33FF57"),
+    (50, "Medium", "#F1C40F"),
+    (0, "Low", "#FF5733"),
+)
+
 
 def execute(filters=None):
     if not filters:
@@ -10,6 +19,10 @@ def execute(filters=None):
         {"label": "Supplier", "fieldname": "supplier", "fieldtype": "Link", "options": "Supplier", "width": 200},
         {"label": "Supplier Score", "fieldname": "supplier_score", "fieldtype": "Float", "width": 150},
         {"label": "Status", "fieldname": "status", "fieldtype": "Data", "width": 150},
+        {"label": "Repair Hours per Asset", "fieldname": "hours_per_asset", "fieldtype": "Float", "width": 150},
+        {"label": "Downtime Percentage", "fieldname": "downtime_percentage", "fieldtype": "Percent", "width": 150},
+        {"label": "Average Response Hours", "fieldname": "avg_response_hours", "fieldtype": "Float", "width": 150},
+        {"label": "PM Compliance", "fieldname": "pm_compliance", "fieldtype": "Percent", "width": 150},
     ]
     
     # Fetch data
@@ -18,6 +31,16 @@ def execute(filters=None):
         fields=["supplier", "supplier_score", "status"],
         filters=filters,
     )
+
+    # Metrics computed by the supplier scorecard pipeline, one lookup for all suppliers
+    metrics = {
+        row.supplier: row
+        for row in frappe.get_all(
+            "Supplier Scorecard Metrics",
+            filters={"supplier": ["in", [row.supplier for row in supplier_data]]},
+            fields=["supplier"] + METRIC_FIELDS,
+        )
+    } if supplier_data else {}
     
     data = []
     for row in supplier_data:
@@ -25,97 +48,47 @@ def execute(filters=None):
             supplier_score = float(row.supplier_score) if row.supplier_score else 0.0
         except ValueError:
             supplier_score = 0.0
-            
+
+        supplier_metrics = metrics.get(row.supplier) or {}
         data.append({
             "supplier": row.supplier,
             "supplier_score": supplier_score,
             "status": row.status,
+            "hours_per_asset": supplier_metrics.get("hours_per_asset", 0),
+            "downtime_percentage": supplier_metrics.get("downtime_percentage", 0),
+            "avg_response_hours": supplier_metrics.get("avg_response_hours", 0),
+            "pm_compliance": supplier_metrics.get("pm_compliance", 0),
         })
 
-    sorted_data = sorted(data, key=lambda x: x['supplier_score'])
-
     # Sort data by supplier score
     sorted_data = sorted(data, key=lambda x: x["supplier_score"])
-    
-    # Prepare chart data
-    suppliers = [d["supplier"] for d in sorted_data]
-    scores = [d["supplier_score"] for d in sorted_data]
-
-    # Generate dynamic colors for each supplier score
-    #color = [get_dynamic_color(d["supplier_score"]) for d in sorted_data]
 
-    # Filter sorted_data to include only suppliers with a valid score
-    
-    # Filter sorted_data to include only suppliers with a valid score
-    # Generate unique suppliers and assign colors
-    unique_suppliers = list(set(d["supplier"] for d in sorted_data))
-    colors = ["#FF5733", "#33FF57", "#3357FF", "#F1C40F", "#9B59B6"][: len(unique_suppliers)]
+    # Build chart data: one stacked dataset per score band, filled in a single pass
+    band_values = {name: [] for _threshold, name, _color in SCORE_BANDS}
+    for d in sorted_data:
+        band = get_score_band(d["supplier_score"])
+        for name, values in band_values.items():
+            values.append(d["supplier_score"] if name == band else None)
 
-    # Build chart data
     chart_data = {
         "data": {
-            "labels": [d["supplier"] for d in sorted_data],  # Supplier names
+            "labels": [d["supplier"] for d in sorted_data],
             "datasets": [
-                {
-                    "name": supplier,  # Supplier name
-                    "values": [
-                        d["supplier_score"] if d["supplier"] == supplier else  None
-                        for d in sorted_data
-                    ],
-                    "colors": [colors[i]],  # Unique color for each supplier
-                }
-                for i, supplier in enumerate(unique_suppliers)
-                if any(d["supplier"] == supplier for d in sorted_data) 
+                {"name": name, "values": band_values[name]}
+                for _threshold, name, _color in SCORE_BANDS
             ],
         },
-        "type": "bar",  # Chart type
-        "options": {
-        "scales": {
-            "x": {
-                "stacked": True  # Enable stacking
-            },
-            "y": {
-                "stacked": True  # Enable stacking
-            }
-        },
-        "plugins": {
-            "tooltip": {
-                "callbacks": {
-                    "title": lambda tooltipItem, data: data["labels"][tooltipItem[0]["dataIndex"]],  # Show supplier name
-                    "label": lambda tooltipItem, data: (
-                        f"Score: {data['datasets'][tooltipItem[0]['datasetIndex']]['data'][tooltipItem[0]['dataIndex']]}"
-                        if data['datasets'][tooltipItem[0]['datasetIndex']]['data'][tooltipItem[0]['dataIndex']] is not None
-                        else ""
-                    )  # Show score only if it is not None
-                }
-            }
-        }
-    }
+        "type": "bar",
+        "colors": [color for _threshold, _name, color in SCORE_BANDS],
+        "barOptions": {"stacked": True},
     }
 
-    # Output chart data for use in the frontend
-    import json
-    #print(json.dumps(chart_data, indent=4))
-
-
-
-
-
-
-
-    
-
-    # Debugging output
-    #frappe.msgprint(f"Scores: {scores}")
-    #frappe.msgprint(f"Colors: {color}")  # Check the colors applied
-
     return columns, sorted_data, None, chart_data
 
-def apply_dynamic_colors(value):
-    """Returns the color based on the value."""
-    if value > 50:
-        return "#FF5733"  # Red for high values
-    elif value > 20:
-        return "#FFC300"  # Yellow for medium values
-    else:
-        return "#4CAF50"  # Green for low values
+
+def get_score_band(score):
+    """Returns the chart band name for a supplier score."""
+    for threshold, name, _color in SCORE_BANDS:
+        if score >= threshold:
+            return name
+    return SCORE_BANDS[-1][1]
@@ -0,0 +1,329 @@
+import hashlib
+import json
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, flt, get_first_day, get_last_day, getdate, now_datetime
+
+# Rollup dimension -> Asset column
+AVAILABILITY_DIMENSIONS = {
+    "company": "company",
+    "modality": "custom_modality",
+    "vendor": "custom_vendor",
+    "department": "department",
+}
+
+# Days whose Asset Downtime Buckets changed since the rollups were last refreshed
+AVAILABILITY_DIRTY_DAYS_KEY = "asset_lite:availability_dirty_days"
+# Changes whenever rollups are rewritten, so cached trend series expire with it
+AVAILABILITY_VERSION_KEY = "asset_lite:availability_version"
+AVAILABILITY_TREND_CACHE_TTL = 60 * 60
+
+MINUTES_PER_DAY = 24 * 60
+
+ROLLUP_FIELDS = ["name", "creation", "modified", "owner", "modified_by", "period_type", "period", "company",
+    "modality", "vendor", "department", "asset_days", "down_asset_days", "service_minutes", "downtime_minutes",
+    "availability"]
+
+
+def get_availability(service_minutes, downtime_minutes):
+    return flt((service_minutes - downtime_minutes) * 100 / service_minutes, 2) if service_minutes else 100
+
+
+def mark_days_dirty(days):
+    """
+    Queue days for the next rollup refresh once their rewritten buckets are
+    committed; a refresh running before that would rebuild them from the old
+    buckets and clear the mark
+    """
+    if days:
+        frappe.db.after_commit.add(partial(frappe.cache().sadd, AVAILABILITY_DIRTY_DAYS_KEY, *(str(day) for day in days)))
+
+
+def count_in_service(rows, days):
+    """
+    Assets in service per dimension group on each day
+
+    Per group, the dates assets entered and left service become running
+    totals and each day is a bisect into them.
+
+    Args:
+        rows: (*group, since, until, assets) tuples; until None while in service
+        days: Sorted days to count
+
+    Returns:
+        {group: {day: assets}}, days without assets left out
+    """
+    events = defaultdict(lambda: defaultdict(int))
+    for *group, since, until, assets in rows:
+        events[tuple(group)][getdate(since)] += assets
+        if until:
+            events[tuple(group)][getdate(until)] -= assets
+
+    counts = {}
+    for group, changes in events.items():
+        dates = sorted(changes)
+        totals, running = [], 0
+        for date in dates:
+            running += changes[date]
+            totals.append(running)
+        counts[group] = {}
+        for day in days:
+            position = bisect_right(dates, day) - 1
+            if position >= 0 and totals[position] > 0:
+                counts[group][day] = totals[position]
+    return counts
+
+
+def get_in_service_counts(days):
+    """
+    Assets in service per (company, modality, vendor, department) on each day,
+    from one query grouping assets by dimensions and service dates
+    """
+    columns = ", ".join(f"a.{column}" for column in AVAILABILITY_DIMENSIONS.values())
+    rows = frappe.db.sql(f"""
+        SELECT {columns}, a.available_for_use_date AS since, a.disposal_date AS until, COUNT(*) AS assets
+        FROM `tabAsset` a
+        WHERE a.docstatus = 1
+            AND a.available_for_use_date IS NOT NULL
+            AND a.available_for_use_date <= %(last_day)s
+        GROUP BY {columns}, since, until
+    """, {"last_day": max(days)}, as_list=True)
+    return count_in_service(rows, days)
+
+
+def get_downtime_totals(days):
+    """Assets down and downtime hours per dimension group and day, from the buckets"""
+    columns = ", ".join(f"a.{column}" for column in AVAILABILITY_DIMENSIONS.values())
+    rows = frappe.db.sql(f"""
+        SELECT b.day, {columns}, COUNT(*) AS down_assets, SUM(b.downtime_hours) AS downtime_hours
+        FROM `tabAsset Downtime Bucket` b
+        JOIN `tabAsset` a ON a.name = b.asset
+        WHERE b.day IN %(days)s AND a.docstatus = 1
+        GROUP BY b.day, {columns}
+    """, {"days": tuple(days)}, as_list=True)
+    return {(getdate(day), tuple(group)): (down, flt(hours)) for day, *group, down, hours in rows}
+
+
+def compute_day_rollups(days, now=None):
+    """
+    Day rollup rows for the given days
+
+    Returns:
+        Dicts with period, company, modality, vendor, department, asset_days,
+        down_asset_days, service_minutes, downtime_minutes and availability
+    """
+    now = now or now_datetime()
+    days = sorted({getdate(day) for day in days if getdate(day) <= now.date()})
+    if not days:
+        return []
+
+    counts = get_in_service_counts(days)
+    downtime = get_downtime_totals(days)
+    minutes_today = int((now - datetime.combine(now.date(), time.min)).total_seconds() // 60)
+
+    rows = []
+    for group, per_day in counts.items():
+        for day, assets in per_day.items():
+            down_assets, hours = downtime.get((day, group), (0, 0))
+            service_minutes = assets * (minutes_today if day == now.date() else MINUTES_PER_DAY)
+            downtime_minutes = min(int(round(hours * 60)), service_minutes)
+            rows.append({
+                "period": day,
+                **dict(zip(AVAILABILITY_DIMENSIONS, group)),
+                "asset_days": assets,
+                "down_asset_days": down_assets,
+                "service_minutes": service_minutes,
+                "downtime_minutes": downtime_minutes,
+                "availability": get_availability(service_minutes, downtime_minutes),
+            })
+    return rows
+
+
+def insert_rollups(period_type, rows):
+    now = now_datetime()
+    frappe.db.bulk_insert("Asset Availability Rollup", ROLLUP_FIELDS, [
+        (frappe.generate_hash(length=10), now, now, "Administrator", "Administrator", period_type, row["period"],
+            row["company"], row["modality"], row["vendor"], row["department"], row["asset_days"],
+            row["down_asset_days"], row["service_minutes"], row["downtime_minutes"], row["availability"])
+        for row in rows
+    ], chunk_size=10000)
+
+
+def refresh_month_rollups(months):
+    """Rebuild the Month rows of the given months from their Day rows, one grouped query per month"""
+    dimensions = ", ".join(AVAILABILITY_DIMENSIONS)
+    for month in sorted(set(months)):
+        rows = frappe.db.sql(f"""
+            SELECT {dimensions},
+                SUM(asset_days) AS asset_days,
+                SUM(down_asset_days) AS down_asset_days,
+                SUM(service_minutes) AS service_minutes,
+                SUM(downtime_minutes) AS downtime_minutes
+            FROM `tabAsset Availability Rollup`
+            WHERE period_type = 'Day' AND period BETWEEN %(from_date)s AND %(to_date)s
+            GROUP BY {dimensions}
+        """, {"from_date": month, "to_date": get_last_day(month)}, as_dict=True)
+
+        frappe.db.delete("Asset Availability Rollup", {"period_type": "Month", "period": month})
+        insert_rollups("Month", [
+            {
+                **row,
+                "period": month,
+                "availability": get_availability(flt(row.service_minutes), flt(row.downtime_minutes)),
+            }
+            for row in rows
+        ])
+
+
+def expire_availability_trends():
+    frappe.cache().set_value(AVAILABILITY_VERSION_KEY, frappe.generate_hash(length=10))
+
+
+def refresh_availability_rollups(days):
+    """
+    Rewrite the Day rollups of the given days and the Month rollups of their
+    months, then expire cached trend series
+
+    Returns:
+        Number of Day rows written
+    """
+    days = sorted({getdate(day) for day in days})
+    if not days:
+        return 0
+
+    rows = compute_day_rollups(days)
+    frappe.db.delete("Asset Availability Rollup", {"period_type": "Day", "period": ["in", days]})
+    insert_rollups("Day", rows)
+    refresh_month_rollups(get_first_day(day) for day in days)
+    frappe.db.commit()
+
+    expire_availability_trends()
+    return len(rows)
+
+
+def refresh_dirty_availability():
+    """
+    Scheduled job: refresh the rollups of yesterday, today and every day
+    whose downtime buckets changed since the last run
+    """
+    dirty = [
+        value.decode() if isinstance(value, bytes) else value
+        for value in frappe.cache().smembers(AVAILABILITY_DIRTY_DAYS_KEY)
+    ]
+    today = getdate()
+    refresh_availability_rollups([*dirty, add_days(today, -1), today])
+    if dirty:
+        frappe.cache().srem(AVAILABILITY_DIRTY_DAYS_KEY, *dirty)
+
+
+def rebuild_availability(from_date, to_date=None, batch_days=31):
+    """
+    Backfill the rollups of a period, a month of days at a time
+
+    Run e.g. `bench execute asset_lite.availability.rebuild_availability --args "['2025-01-01']"`
+    after refresh_asset_downtime has filled the buckets.
+    """
+    day, to_date = getdate(from_date), getdate(to_date)
+    written = 0
+    while day <= to_date:
+        batch = [day + timedelta(days=offset) for offset in range(batch_days) if day + timedelta(days=offset) <= to_date]
+        written += refresh_availability_rollups(batch)
+        day = batch[-1] + timedelta(days=1)
+    return written
+
+
+def delete_availability_rollups(doc, method=None):
+    """On trash of Company, Modality or Department: drop its rollup rows, which no longer block the delete"""
+    frappe.db.delete("Asset Availability Rollup", {frappe.scrub(doc.doctype): doc.name})
+    frappe.db.after_commit.add(expire_availability_trends)
+
+
+def get_rollup_ranges(from_date, to_date):
+    """
+    Cover a date range with the fewest rollup rows: Month rows for the whole
+    months in it, Day rows for the days before and after them
+
+    Returns:
+        (period_type, first period, last period) tuples
+    """
+    from_date, to_date = getdate(from_date), getdate(to_date)
+    if from_date > to_date:
+        return []
+
+    first_month = from_date if from_date.day == 1 else add_days(get_last_day(from_date), 1)
+    last_month = get_first_day(to_date if to_date == get_last_day(to_date) else add_days(get_first_day(to_date), -1))
+    if first_month > last_month:
+        return [("Day", from_date, to_date)]
+
+    ranges = [("Month", first_month, last_month)]
+    if from_date < first_month:
+        ranges.append(("Day", from_date, add_days(first_month, -1)))
+    if get_last_day(last_month) < to_date:
+        ranges.append(("Day", add_days(get_last_day(last_month), 1), to_date))
+    return ranges
+
+
+def get_availability_trend(from_date, to_date, granularity="Day", group_by=None, filters=None):
+    """
+    Availability series from the rollups, one point per period and group
+
+    Results are cached until the rollups are next refreshed.
+
+    Args:
+        from_date: First day of the range
+        to_date: Last day of the range
+        granularity: "Day" or "Month"
+        group_by: Optional dimension: company, modality, vendor or department
+        filters: Optional {dimension: value} dict
+
+    Returns:
+        List of {"period", "group", "asset_days", "down_asset_days",
+        "service_minutes", "downtime_minutes", "availability"}
+    """
+    granularity = "Month" if str(granularity).lower() == "month" else "Day"
+    if group_by and group_by not in AVAILABILITY_DIMENSIONS:
+        frappe.throw(_("Cannot group availability by {0}").format(group_by))
+    filters = {key: value for key, value in (filters or {}).items() if value not in (None, "")}
+    for key in filters:
+        if key not in AVAILABILITY_DIMENSIONS:
+            frappe.throw(_("Cannot filter availability by {0}").format(key))
+
+    from_date, to_date = getdate(from_date), getdate(to_date)
+    if granularity == "Month":
+        from_date = get_first_day(from_date)
+
+    version = frappe.cache().get_value(AVAILABILITY_VERSION_KEY) or ""
+    args = json.dumps([str(from_date), str(to_date), granularity, group_by, filters], sort_keys=True)
+    key = f"asset_lite:availability_trend:{version}:{hashlib.md5(args.encode()).hexdigest()}"
+    series = frappe.cache().get_value(key)
+    if series is not None:
+        return series
+
+    conditions = "".join(f" AND `{dimension}` = %({dimension})s" for dimension in filters)
+    group_column = f"`{group_by}`" if group_by else "NULL"
+    series = frappe.db.sql(f"""
+        SELECT
+            period,
+            {group_column} AS `group`,
+            SUM(asset_days) AS asset_days,
+            SUM(down_asset_days) AS down_asset_days,
+            SUM(service_minutes) AS service_minutes,
+            SUM(downtime_minutes) AS downtime_minutes
+        FROM `tabAsset Availability Rollup`
+        WHERE period_type = %(granularity)s
+            AND period BETWEEN %(from_date)s AND %(to_date)s
+            {conditions}
+        GROUP BY period, `group`
+        ORDER BY period, `group`
+    """, {"granularity": granularity, "from_date": from_date, "to_date": to_date, **filters}, as_dict=True)
+
+    for point in series:
+        point["availability"] = get_availability(flt(point.service_minutes), flt(point.downtime_minutes))
+
+    frappe.cache().set_value(key, series, expires_in_sec=AVAILABILITY_TREND_CACHE_TTL)
+    return series
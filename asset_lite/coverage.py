@@ -0,0 +1,409 @@
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+import frappe
+from frappe.utils import getdate, now_datetime
+
+COVERAGE_CACHE_KEY = "asset_lite:coverage_index"
+COVERAGE_VERSION_KEY = "asset_lite:coverage_index_version"
+COVERAGE_CACHE_TTL = 24 * 60 * 60
+
+# Index of each site held by this process, with the version it was read at
+_local_indexes = {}
+
+# Rows whose status is written per UPDATE
+STATUS_FLIP_BATCH_SIZE = 10000
+
+# The flags only apply to service contracts: what the contract pays for
+CoverageWindow = namedtuple(
+    "CoverageWindow",
+    ["asset", "kind", "start_date", "end_date", "source_doctype", "source_name", "vendor", "spare_parts", "labour",
+        "ppm_only", "spare_parts_labour"],
+    defaults=(0, 0, 0, 0),
+)
+
+# Service Coverage agreements and the coverage kind they stand for
+SERVICE_AGREEMENT_KINDS = {"Warranty": "Warranty", "Contract": "Service Contract"}
+
+# Stored status fields kept in step with their dates by update_coverage_statuses.
+# Per field: the (start, end) column pairs that make it Active, the first one
+# being the main window, whose end makes it Expired. Same rules as the old
+# "Support Plan status set" server script; rows without a main window are left alone.
+STATUS_RULES = [
+    ("Warranty", "warranty_status", [("warranty_start_date", "warranty_end_date"), ("start_date", "end_date")]),
+    ("Support Plans", "service_contract_status", [("start_date", "end_date")]),
+    ("Support Plans", "war_status", [("warranty_start_date", "warranty_end_date"), ("start", "end")]),
+    ("Asset", "custom_service_contract_status", [("custom_service_contract_start", "custom_service_contract_end")]),
+    (
+        "Asset",
+        "custom_warranty_status",
+        [("custom_warranty_start_date", "custom_warranty_end_date"), ("custom_extended_start_date", "custom_extended_end_date")],
+    ),
+]
+
+# Asset Maintenance fetches these from its Asset, but only when it is saved
+ASSET_MAINTENANCE_STATUS_FIELDS = ["custom_warranty_status", "custom_service_contract_status"]
+
+# Fields the coverage windows are built from, per source: (parent fields, {table field: row fields}).
+# Saves that change none of them keep the cached index.
+COVERAGE_SOURCE_FIELDS = {
+    "Asset": (
+        ("custom_warranty_start_date", "custom_warranty_end_date", "custom_extended_start_date",
+            "custom_extended_end_date", "custom_service_contract_start", "custom_service_contract_end",
+            "custom_covering_spare_parts", "custom_covering_labour", "custom_ppm_only", "custom_spare_parts_labour"),
+        {},
+    ),
+    "Warranty": (
+        ("asset", "warranty_start_date", "warranty_end_date", "extended_warranty", "start_date", "end_date"),
+        {},
+    ),
+    "Support Plans": (
+        ("asset", "vendor", "service_contract", "start_date", "end_date", "warranty_start_date", "warranty_end_date",
+            "start", "end", "spare_parts", "labour", "ppm_only", "spare_parts_labour"),
+        {"asset_list": ("asset_id",)},
+    ),
+    "Asset Maintenance": (
+        ("asset_name",),
+        {"custom_service_coverage_table": ("service_agreement", "start_date", "end_date", "active")},
+    ),
+}
+
+
+class CoverageIndex:
+    """
+    Coverage windows of every asset, indexed for date lookups
+
+    Per asset, windows are sorted by start date with a running maximum of
+    their end dates, so the windows covering a date are found by bisecting
+    the starts and walking back only while the running maximum still
+    reaches the date: O(log n + k) for k hits. All windows are also sorted
+    by end date, so the ones ending in a period are a single bisected slice.
+    """
+
+    def __init__(self, windows):
+        self.assets = {}
+        for window in sorted(windows, key=lambda window: (window.asset, window.start_date, window.end_date)):
+            self.assets.setdefault(window.asset, []).append(window)
+
+        self.starts = {}
+        self.reach = {}
+        for asset, asset_windows in self.assets.items():
+            self.starts[asset] = [window.start_date for window in asset_windows]
+            reach, furthest = [], None
+            for window in asset_windows:
+                furthest = window.end_date if furthest is None else max(furthest, window.end_date)
+                reach.append(furthest)
+            self.reach[asset] = reach
+
+        self.by_end = sorted(windows, key=lambda window: (window.end_date, window.asset))
+        self.ends = [window.end_date for window in self.by_end]
+
+    def __len__(self):
+        return len(self.by_end)
+
+    def covering(self, asset, on_date, kinds=None):
+        """Windows of the asset that include on_date, by start date"""
+        on_date = getdate(on_date)
+        asset_windows = self.assets.get(asset)
+        if not asset_windows:
+            return []
+
+        reach = self.reach[asset]
+        hits = []
+        position = bisect_right(self.starts[asset], on_date) - 1
+        while position >= 0 and reach[position] >= on_date:
+            window = asset_windows[position]
+            if window.end_date >= on_date and (not kinds or window.kind in kinds):
+                hits.append(window)
+            position -= 1
+        hits.reverse()
+        return hits
+
+    def ending_between(self, from_date, to_date, kinds=None):
+        """Windows whose end date falls in [from_date, to_date], soonest first"""
+        window_slice = self.by_end[
+            bisect_left(self.ends, getdate(from_date)):bisect_right(self.ends, getdate(to_date))
+        ]
+        return [window for window in window_slice if not kinds or window.kind in kinds]
+
+
+def add_window(windows, seen, asset, kind, start_date, end_date, source_doctype, source_name, vendor=None, flags=None):
+    if not (asset and start_date and end_date):
+        return
+    start_date, end_date = getdate(start_date), getdate(end_date)
+    # Asset fields are copied from the plan; keep the window of the first source
+    key = (asset, kind, start_date, end_date)
+    if end_date < start_date or key in seen:
+        return
+    seen.add(key)
+    flags = flags or {}
+    windows.append(CoverageWindow(
+        asset, kind, start_date, end_date, source_doctype, source_name, vendor,
+        flags.get("spare_parts") or 0, flags.get("labour") or 0, flags.get("ppm_only") or 0,
+        flags.get("spare_parts_labour") or 0,
+    ))
+
+
+def get_coverage_windows():
+    """
+    Coverage windows from Support Plans (with their asset lists), Warranty,
+    the dates on Asset and the Service Coverage rows of Asset Maintenance,
+    read with one query per source
+    """
+    windows, seen = [], set()
+
+    plans = frappe.get_all(
+        "Support Plans",
+        fields=["name", "asset", "vendor", "service_contract", "start_date", "end_date", "warranty_start_date",
+            "warranty_end_date", "start", "end", "spare_parts", "labour", "ppm_only", "spare_parts_labour"],
+    )
+    plan_assets = {}
+    for row in frappe.get_all(
+        "Support Asset List", filters={"parenttype": "Support Plans"}, fields=["parent", "asset_id"]
+    ):
+        plan_assets.setdefault(row.parent, set()).add(row.asset_id)
+
+    for plan in plans:
+        for asset in {plan.asset} | plan_assets.get(plan.name, set()):
+            if plan.service_contract:
+                add_window(windows, seen, asset, "Service Contract", plan.start_date, plan.end_date,
+                    "Support Plans", plan.name, plan.vendor, plan)
+            add_window(windows, seen, asset, "Warranty", plan.warranty_start_date, plan.warranty_end_date,
+                "Support Plans", plan.name, plan.vendor)
+            add_window(windows, seen, asset, "Extended Warranty", plan.start, plan.end,
+                "Support Plans", plan.name, plan.vendor)
+
+    for warranty in frappe.get_all(
+        "Warranty",
+        fields=["name", "asset", "warranty_start_date", "warranty_end_date", "extended_warranty", "start_date",
+            "end_date"],
+    ):
+        add_window(windows, seen, warranty.asset, "Warranty", warranty.warranty_start_date,
+            warranty.warranty_end_date, "Warranty", warranty.name)
+        if warranty.extended_warranty:
+            add_window(windows, seen, warranty.asset, "Extended Warranty", warranty.start_date, warranty.end_date,
+                "Warranty", warranty.name)
+
+    for asset in frappe.get_all(
+        "Asset",
+        fields=["name", "custom_warranty_start_date", "custom_warranty_end_date", "custom_extended_start_date",
+            "custom_extended_end_date", "custom_service_contract_start", "custom_service_contract_end",
+            "custom_covering_spare_parts", "custom_covering_labour", "custom_ppm_only", "custom_spare_parts_labour"],
+    ):
+        add_window(windows, seen, asset.name, "Warranty", asset.custom_warranty_start_date,
+            asset.custom_warranty_end_date, "Asset", asset.name)
+        add_window(windows, seen, asset.name, "Extended Warranty", asset.custom_extended_start_date,
+            asset.custom_extended_end_date, "Asset", asset.name)
+        add_window(windows, seen, asset.name, "Service Contract", asset.custom_service_contract_start,
+            asset.custom_service_contract_end, "Asset", asset.name, flags={
+                "spare_parts": asset.custom_covering_spare_parts,
+                "labour": asset.custom_covering_labour,
+                "ppm_only": asset.custom_ppm_only,
+                "spare_parts_labour": asset.custom_spare_parts_labour,
+            })
+
+    for row in frappe.db.sql("""
+        SELECT coverage.parent, coverage.service_agreement, coverage.start_date, coverage.end_date, am.asset_name
+        FROM `tabService Coverage` coverage
+        JOIN `tabAsset Maintenance` am ON am.name = coverage.parent
+        WHERE coverage.parenttype = 'Asset Maintenance' AND IFNULL(coverage.active, '') != 'No'
+    """, as_dict=True):
+        kind = SERVICE_AGREEMENT_KINDS.get(row.service_agreement)
+        if kind:
+            add_window(windows, seen, row.asset_name, kind, row.start_date, row.end_date,
+                "Asset Maintenance", row.parent)
+
+    return windows
+
+
+def get_coverage_index():
+    """
+    The coverage index, rebuilt only when a source changed
+
+    The index is shared through Redis and also kept in process, tagged with
+    the version it was built at; as long as the version in Redis is the
+    same, a lookup costs one small Redis read instead of unpickling the
+    whole index.
+    """
+    version = frappe.cache().get_value(COVERAGE_VERSION_KEY)
+    local = _local_indexes.get(frappe.local.site)
+    if version and local and local[0] == version:
+        return local[1]
+
+    index = frappe.cache().get_value(COVERAGE_CACHE_KEY) if version else None
+    if index is None:
+        index = CoverageIndex(get_coverage_windows())
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(COVERAGE_CACHE_KEY, index, expires_in_sec=COVERAGE_CACHE_TTL)
+        frappe.cache().set_value(COVERAGE_VERSION_KEY, version, expires_in_sec=COVERAGE_CACHE_TTL)
+
+    _local_indexes[frappe.local.site] = (version, index)
+    return index
+
+
+def coverage_changed(doc):
+    """Whether a save changed any field the coverage windows are built from"""
+    before = doc.get_doc_before_save()
+    if not before or doc.doctype not in COVERAGE_SOURCE_FIELDS:
+        return True
+
+    fields, tables = COVERAGE_SOURCE_FIELDS[doc.doctype]
+    if any(before.get(fieldname) != doc.get(fieldname) for fieldname in fields):
+        return True
+
+    def rows(source, table, row_fields):
+        return sorted(tuple(str(row.get(fieldname) or "") for fieldname in row_fields) for row in source.get(table) or ())
+
+    return any(rows(before, table, row_fields) != rows(doc, table, row_fields) for table, row_fields in tables.items())
+
+
+def delete_coverage_cache():
+    frappe.cache().delete_value(COVERAGE_VERSION_KEY)
+    frappe.cache().delete_value(COVERAGE_CACHE_KEY)
+
+
+def clear_coverage_cache(doc=None, method=None):
+    """
+    Document event of every coverage source: the index is rebuilt on next use
+
+    Saves that leave the coverage fields alone keep the index. The keys are
+    dropped once the transaction commits, so a concurrent rebuild cannot
+    cache the data from before the change under a new version.
+    """
+    if doc is not None and method != "on_trash" and not coverage_changed(doc):
+        return
+    frappe.db.after_commit.add(delete_coverage_cache)
+
+
+def get_coverage(asset, on_date=None, kinds=None):
+    """Coverage windows of an asset on a date (default today)"""
+    return get_coverage_index().covering(asset, on_date or getdate(), kinds)
+
+
+def resolve_coverage(asset, on_date=None, index=None):
+    """
+    The Work_Order coverage fields of an asset on a date (default today)
+
+    Under warranty when a warranty or extended warranty covers the date. The
+    spare parts and labour flags are those of the service contracts in force;
+    ppm_only holds when every one of them is PM only.
+
+    Returns:
+        {"warranty", "service_contract", "covering_spare_parts", "covering_labour",
+         "ppm_only", "spare_parts_labour", "windows"}
+    """
+    windows = (index or get_coverage_index()).covering(asset, getdate(on_date)) if asset else []
+    contracts = [window for window in windows if window.kind == "Service Contract"]
+    return {
+        "warranty": int(any(window.kind in ("Warranty", "Extended Warranty") for window in windows)),
+        "service_contract": int(bool(contracts)),
+        "covering_spare_parts": int(any(window.spare_parts or window.spare_parts_labour for window in contracts)),
+        "covering_labour": int(any(window.labour or window.spare_parts_labour for window in contracts)),
+        "ppm_only": int(bool(contracts) and all(window.ppm_only for window in contracts)),
+        "spare_parts_labour": int(any(window.spare_parts_labour for window in contracts)),
+        "windows": windows,
+    }
+
+
+def resolve_coverage_batch(items):
+    """
+    Resolve many (asset, date) pairs against one copy of the index
+
+    Args:
+        items: Dicts with asset and an optional date
+
+    Returns:
+        resolve_coverage results, in the order of items
+    """
+    index = get_coverage_index()
+    return [resolve_coverage(item.get("asset"), item.get("date"), index) for item in items]
+
+
+def get_status_case(windows):
+    """SQL CASE giving the status of a row from its (start, end) column pairs"""
+    main_end = windows[0][1]
+    active = " OR ".join(f"%(today)s BETWEEN `{start}` AND `{end}`" for start, end in windows)
+    return f"""CASE
+        WHEN {active} THEN 'Active'
+        WHEN %(today)s > `{main_end}` THEN 'Expired'
+        ELSE ''
+    END"""
+
+
+def flip_statuses(doctype, fieldname, windows, today, batch_size=STATUS_FLIP_BATCH_SIZE):
+    """
+    Write the date-derived status of every row of doctype whose stored one differs
+
+    Stale rows are found with one query, then updated by primary key, one
+    UPDATE per status and batch. Returns the number of rows changed.
+    """
+    main_start, main_end = windows[0]
+    status_case = get_status_case(windows)
+    rows = frappe.db.sql(f"""
+        SELECT name, {status_case} AS status
+        FROM `tab{doctype}`
+        WHERE `{main_start}` IS NOT NULL
+            AND `{main_end}` IS NOT NULL
+            AND IFNULL(`{fieldname}`, '') != {status_case}
+    """, {"today": today}, as_dict=True)
+
+    by_status = {}
+    for row in rows:
+        by_status.setdefault(row.status, []).append(row.name)
+
+    for status, names in by_status.items():
+        for offset in range(0, len(names), batch_size):
+            frappe.db.sql(f"""
+                UPDATE `tab{doctype}`
+                SET `{fieldname}` = %(status)s, modified = %(now)s, modified_by = %(user)s
+                WHERE name IN %(names)s
+            """, {
+                "status": status,
+                "now": now_datetime(),
+                "user": frappe.session.user,
+                "names": tuple(names[offset:offset + batch_size]),
+            })
+            frappe.db.commit()
+
+    return len(rows)
+
+
+def sync_asset_maintenance_statuses(batch_size=STATUS_FLIP_BATCH_SIZE):
+    """Copy the coverage statuses of each Asset to its Asset Maintenance records"""
+    columns = ", ".join(f"asset.`{fieldname}` AS `{fieldname}`" for fieldname in ASSET_MAINTENANCE_STATUS_FIELDS)
+    stale = " OR ".join(
+        f"IFNULL(am.`{fieldname}`, '') != IFNULL(asset.`{fieldname}`, '')" for fieldname in ASSET_MAINTENANCE_STATUS_FIELDS
+    )
+    rows = frappe.db.sql(f"""
+        SELECT am.name, {columns}
+        FROM `tabAsset Maintenance` am
+        JOIN `tabAsset` asset ON asset.name = am.asset_name
+        WHERE {stale}
+    """, as_dict=True)
+
+    for offset in range(0, len(rows), batch_size):
+        frappe.db.bulk_update("Asset Maintenance", {
+            row.name: {fieldname: row[fieldname] or "" for fieldname in ASSET_MAINTENANCE_STATUS_FIELDS}
+            for row in rows[offset:offset + batch_size]
+        }, chunk_size=500)
+        frappe.db.commit()
+
+    return len(rows)
+
+
+def update_coverage_statuses(today=None, batch_size=STATUS_FLIP_BATCH_SIZE):
+    """
+    Scheduled job: bring every stored warranty and service contract status
+    in line with its dates, in bulk, and drop the cached coverage index
+
+    Returns:
+        {"<Doctype>.<field>": rows changed, ...}
+    """
+    today = getdate(today)
+    result = {}
+    for doctype, fieldname, windows in STATUS_RULES:
+        result[f"{doctype}.{fieldname}"] = flip_statuses(doctype, fieldname, windows, today, batch_size)
+    result["Asset Maintenance"] = sync_asset_maintenance_statuses(batch_size)
+
+    clear_coverage_cache()
+    return result
@@ -0,0 +1,269 @@
+import json
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from functools import partial
+
+import frappe
+from frappe.utils import flt, get_datetime, getdate, now_datetime
+
+from asset_lite.api.details import get_detail_cache_key
+from asset_lite.availability import mark_days_dirty
+
+# Assets whose buckets are rebuilt per query round and commit
+DOWNTIME_ASSET_CHUNK_SIZE = 500
+
+# Work order statuses that still keep the asset down
+OPEN_REPAIR_STATUSES = ("Open", "Work In Progress", "Pending Review")
+
+# Asset totals written without touching modified: they grow every day on every
+# asset, and bumping modified would resend every asset to each sync client
+DOWNTIME_TOTAL_FIELDS = ("custom_down_time", "custom_total_hours", "custom_up_time")
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or touching (start, end) intervals, sorted by start"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def split_by_day(start, end):
+    """Yield (day, hours) for the part of [start, end) in each day"""
+    while start < end:
+        day = start.date()
+        piece_end = min(end, datetime.combine(day + timedelta(days=1), time.min))
+        yield day, (piece_end - start).total_seconds() / 3600
+        start = piece_end
+
+
+def get_status_down_intervals(changes, current_status, now):
+    """
+    Down intervals from the custom_device_status history of one asset
+
+    Args:
+        changes: (changed_on, new_status) pairs, oldest first
+        current_status: The asset's status now, closing an open Down interval
+    """
+    intervals, down_since = [], None
+    for changed_on, status in changes:
+        if status == "Down" and down_since is None:
+            down_since = changed_on
+        elif status != "Down" and down_since is not None:
+            intervals.append((down_since, changed_on))
+            down_since = None
+    if down_since is not None and current_status == "Down":
+        intervals.append((down_since, now))
+    return intervals
+
+
+def compute_downtime_buckets(intervals, in_service_from=None, now=None):
+    """
+    Daily downtime buckets of one asset
+
+    The outage intervals are merged with one sort and sweep, so overlapping
+    work orders and status changes count once, and the merged outages are
+    split at midnight. Days without downtime get no bucket.
+
+    Args:
+        intervals: (start, end) outages; end None while the outage is open
+        in_service_from: Outages before this date are ignored
+        now: End of open outages and of today's bucket
+
+    Returns:
+        (buckets, downtime_hours): buckets is a list of dicts with day,
+        downtime_hours, uptime_hours and outages
+    """
+    now = get_datetime(now or now_datetime())
+    floor = datetime.combine(getdate(in_service_from), time.min) if in_service_from else None
+
+    clipped = []
+    for start, end in intervals:
+        start, end = get_datetime(start), min(get_datetime(end) if end else now, now)
+        if floor and start < floor:
+            start = floor
+        if start < end:
+            clipped.append((start, end))
+
+    downtime, outages = defaultdict(float), defaultdict(int)
+    for start, end in merge_intervals(clipped):
+        for day, hours in split_by_day(start, end):
+            downtime[day] += hours
+            outages[day] += 1
+
+    today = now.date()
+    buckets = []
+    for day in sorted(downtime):
+        day_hours = (now - datetime.combine(today, time.min)).total_seconds() / 3600 if day == today else 24
+        buckets.append({
+            "day": day,
+            "downtime_hours": flt(downtime[day], 2),
+            "uptime_hours": flt(max(day_hours - downtime[day], 0), 2),
+            "outages": outages[day],
+        })
+    return buckets, flt(sum(downtime.values()), 2)
+
+
+def get_asset_outages(assets):
+    """Outage intervals per asset from work orders and device status history, two queries"""
+    outages = defaultdict(list)
+    for row in frappe.db.sql("""
+        SELECT asset, failure_date, completion_date, repair_status
+        FROM `tabWork_Order`
+        WHERE asset IN %(assets)s
+            AND failure_date IS NOT NULL
+            AND docstatus < 2
+            AND repair_status != 'Cancelled'
+    """, {"assets": tuple(assets)}, as_dict=True):
+        # A closed work order without completion date has no known end
+        if row.completion_date or row.repair_status in OPEN_REPAIR_STATUSES:
+            outages[row.asset].append((row.failure_date, row.completion_date))
+
+    changes = defaultdict(list)
+    for row in frappe.db.sql("""
+        SELECT docname, creation, data
+        FROM `tabVersion`
+        WHERE ref_doctype = 'Asset'
+            AND docname IN %(assets)s
+            AND data LIKE '%%custom_device_status%%'
+        ORDER BY creation
+    """, {"assets": tuple(assets)}, as_dict=True):
+        for fieldname, _old, new in json.loads(row.data).get("changed") or ():
+            if fieldname == "custom_device_status":
+                changes[row.docname].append((row.creation, new))
+
+    return outages, changes
+
+
+def refresh_asset_downtime(assets=None, chunk_size=DOWNTIME_ASSET_CHUNK_SIZE, commit=True):
+    """
+    Rebuild the Asset Downtime Buckets and the downtime totals on Asset for
+    the given assets (all when omitted)
+
+    Per chunk of assets, outages are read with two queries, the buckets are
+    replaced with one delete and one bulk insert, and custom_down_time,
+    custom_total_hours and custom_up_time are written with one bulk update.
+    Days whose buckets changed are queued for the availability rollups.
+    The totals leave modified alone, so sync_changes does not carry them;
+    cached document details are dropped once they are committed.
+
+    Run `bench execute asset_lite.downtime.refresh_asset_downtime` once to
+    backfill; afterwards assets are refreshed as their work orders change.
+
+    Returns:
+        Number of buckets written
+    """
+    filters = {"docstatus": ["<", 2]}
+    if assets:
+        filters["name"] = ["in", list(assets)]
+    asset_rows = frappe.get_all(
+        "Asset", filters=filters, fields=["name", "available_for_use_date", "custom_device_status"], order_by="name"
+    )
+
+    now = now_datetime()
+    written = 0
+    for offset in range(0, len(asset_rows), chunk_size):
+        chunk = asset_rows[offset:offset + chunk_size]
+        names = [asset.name for asset in chunk]
+        outages, changes = get_asset_outages(names)
+
+        bucket_rows, totals = [], {}
+        for asset in chunk:
+            intervals = outages[asset.name] + get_status_down_intervals(
+                changes[asset.name], asset.custom_device_status, now
+            )
+            buckets, downtime = compute_downtime_buckets(intervals, asset.available_for_use_date, now)
+            bucket_rows += [
+                (frappe.generate_hash(length=10), now, now, "Administrator", "Administrator", asset.name,
+                    bucket["day"], bucket["downtime_hours"], bucket["uptime_hours"], bucket["outages"])
+                for bucket in buckets
+            ]
+
+            total_hours = flt(
+                (now - datetime.combine(getdate(asset.available_for_use_date), time.min)).total_seconds() / 3600, 2
+            ) if asset.available_for_use_date else 0
+            totals[asset.name] = {
+                "custom_down_time": downtime,
+                "custom_total_hours": total_hours,
+                "custom_up_time": flt(max(total_hours - downtime, 0), 2),
+            }
+
+        previous = set(frappe.get_all(
+            "Asset Downtime Bucket", filters={"asset": ["in", names]}, fields=["asset", "day", "downtime_hours"],
+            as_list=True,
+        ))
+        current = {(row[5], row[6], row[7]) for row in bucket_rows}
+        mark_days_dirty({getdate(day) for _asset, day, _hours in previous ^ current})
+
+        frappe.db.delete("Asset Downtime Bucket", {"asset": ["in", names]})
+        frappe.db.bulk_insert(
+            "Asset Downtime Bucket",
+            ["name", "creation", "modified", "owner", "modified_by", "asset", "day", "downtime_hours",
+                "uptime_hours", "outages"],
+            bucket_rows,
+            chunk_size=10000,
+        )
+        frappe.db.bulk_update("Asset", totals, chunk_size=500, update_modified=False)
+        frappe.db.after_commit.add(
+            partial(frappe.cache().delete_value, [get_detail_cache_key("Asset", name) for name in names])
+        )
+        if commit:
+            frappe.db.commit()
+        written += len(bucket_rows)
+
+    return written
+
+
+def refresh_open_downtime():
+    """
+    Scheduled job: extend the buckets of assets that are down and refresh
+    every asset's totals, which grow with time in service
+    """
+    down = set(frappe.get_all(
+        "Work_Order",
+        filters={"repair_status": ["in", OPEN_REPAIR_STATUSES], "failure_date": ["is", "set"], "docstatus": ["<", 2]},
+        pluck="asset",
+    )) | set(frappe.get_all("Asset", filters={"custom_device_status": "Down"}, pluck="name"))
+    refresh_asset_downtime(down - {None, ""})
+
+    frappe.db.sql("""
+        UPDATE `tabAsset`
+        SET custom_total_hours = ROUND(TIMESTAMPDIFF(SECOND, available_for_use_date, %(now)s) / 3600, 2),
+            custom_up_time = GREATEST(
+                ROUND(TIMESTAMPDIFF(SECOND, available_for_use_date, %(now)s) / 3600, 2) - IFNULL(custom_down_time, 0),
+                0
+            )
+        WHERE available_for_use_date IS NOT NULL AND docstatus < 2
+    """, {"now": now_datetime()})
+    frappe.db.after_commit.add(partial(frappe.cache().delete_keys, get_detail_cache_key("Asset", "")))
+
+
+def on_work_order_update(doc, method=None):
+    """Rebuild the buckets of the asset when a work order's outage changes"""
+    before = doc.get_doc_before_save()
+    fields = ("asset", "repair_status", "failure_date", "completion_date", "docstatus")
+    if before and not any(before.get(field) != doc.get(field) for field in fields):
+        return
+
+    assets = {doc.asset, before.asset if before else None} - {None, ""}
+    if assets:
+        refresh_asset_downtime(assets, commit=False)
+
+
+def on_asset_update(doc, method=None):
+    """Rebuild the buckets of an asset whose device status changed, once its Version is saved"""
+    before = doc.get_doc_before_save()
+    if before and before.custom_device_status != doc.custom_device_status:
+        frappe.enqueue(
+            "asset_lite.downtime.refresh_asset_downtime", assets=[doc.name], enqueue_after_commit=True
+        )
+
+
+def delete_asset_downtime(doc, method=None):
+    """On trash of Asset: drop its buckets, which no longer block the delete, and roll their days up again"""
+    mark_days_dirty(set(frappe.get_all("Asset Downtime Bucket", filters={"asset": doc.name}, pluck="day")))
+    frappe.db.delete("Asset Downtime Bucket", {"asset": doc.name})
@@ -86,7 +86,8 @@ on_session_creation = "asset_lite.api.api.set_default_homepage"
 # ------------
 
 # before_install = "asset_lite.install.before_install"
-# after_install = "asset_lite.install.after_install"
+after_install = "asset_lite.install.add_app_indexes"
+after_migrate = "asset_lite.install.add_app_indexes"
 
 # Uninstallation
 # ------------
@@ -133,7 +134,8 @@ on_session_creation = "asset_lite.api.api.set_default_homepage"
 # Override standard doctype classes
 
 override_doctype_class = {
-#    "Supplier Scorecard Criteria":"asset_lite.supplier_score_criteria_override.CustomSupplierScorecardCriteria"
+    "Supplier Scorecard Criteria":"asset_lite.supplier_score_criteria_override.CustomSupplierScorecardCriteria",
+    "Supplier Scorecard Period":"asset_lite.supplier_score_criteria_override.CustomSupplierScorecardPeriod"
 # 	"ToDo": "custom_app.overrides.CustomToDo"
 }
 
@@ -143,30 +145,107 @@ override_doctype_class = {
 
 doc_events = {
 	"Asset":{
-        "before_save": "asset_lite.public.py.asset.generate_asset_qr"
+        "before_save": "asset_lite.public.py.asset.generate_asset_qr",
+        "on_update": [
+            "asset_lite.coverage.clear_coverage_cache",
+            "asset_lite.downtime.on_asset_update"
+        ],
+        "on_update_after_submit": [
+            "asset_lite.coverage.clear_coverage_cache",
+            "asset_lite.downtime.on_asset_update"
+        ],
+        "on_trash": [
+            "asset_lite.coverage.clear_coverage_cache",
+            "asset_lite.downtime.delete_asset_downtime",
+            "asset_lite.reliability.delete_asset_reliability"
+        ]
+    },
+	"Company":{
+        "on_trash": [
+            "asset_lite.reliability.delete_asset_reliability",
+            "asset_lite.availability.delete_availability_rollups"
+        ]
+    },
+	"Modality":{
+        "on_trash": "asset_lite.availability.delete_availability_rollups"
+    },
+	"Department":{
+        "on_trash": "asset_lite.availability.delete_availability_rollups"
+    },
+	"Warranty":{
+        "on_update": "asset_lite.coverage.clear_coverage_cache",
+        "on_trash": "asset_lite.coverage.clear_coverage_cache"
+    },
+	"Support Plans":{
+        "on_update": [
+            "asset_lite.coverage.clear_coverage_cache",
+            "asset_lite.sla_penalty.on_support_plan_update"
+        ],
+        "on_trash": [
+            "asset_lite.coverage.clear_coverage_cache",
+            "asset_lite.sla_penalty.delete_penalty_ledger"
+        ]
+    },
+	"Supplier":{
+        "on_trash": "asset_lite.sla_penalty.delete_penalty_ledger"
+    },
+	"Asset Maintenance Log":{
+        "before_insert": "asset_lite.ppm_template.set_log_checklist"
+    },
+	"PPM Templates":{
+        "on_update": "asset_lite.ppm_template.clear_ppm_template_cache",
+        "on_trash": "asset_lite.ppm_template.clear_ppm_template_cache"
+    },
+	"Asset Maintenance":{
+        "on_update": "asset_lite.coverage.clear_coverage_cache",
+        "on_trash": "asset_lite.coverage.clear_coverage_cache"
+    },
+	"Work_Order":{
+        "on_update": [
+            "asset_lite.reliability.on_work_order_update",
+            "asset_lite.sla_penalty.on_work_order_update",
+            "asset_lite.downtime.on_work_order_update"
+        ],
+        "on_update_after_submit": [
+            "asset_lite.reliability.on_work_order_update",
+            "asset_lite.sla_penalty.on_work_order_update",
+            "asset_lite.downtime.on_work_order_update"
+        ],
+        "on_cancel": [
+            "asset_lite.reliability.on_work_order_update",
+            "asset_lite.sla_penalty.on_work_order_update",
+            "asset_lite.downtime.on_work_order_update"
+        ]
+    },
+	"Custom Field":{
+        "on_update": "asset_lite.api.projections.clear_projection_cache",
+        "on_trash": "asset_lite.api.projections.clear_projection_cache"
     }
 }
 
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# 	"all": [
-# 		"asset_lite.tasks.all"
-# 	],
-# 	"daily": [
-# 		"asset_lite.tasks.daily"
-# 	],
-# 	"hourly": [
-# 		"asset_lite.tasks.hourly"
-# 	],
-# 	"weekly": [
-# 		"asset_lite.tasks.weekly"
-# 	],
-# 	"monthly": [
-# 		"asset_lite.tasks.monthly"
-# 	],
-# }
+scheduler_events = {
+	"cron": {
+		# Right after midnight, so logs due yesterday are Overdue for the whole day
+		"5 0 * * *": [
+			"asset_lite.asset_lite.doctype.maintenance_status_transition.maintenance_status_transition.sweep_maintenance_status",
+			"asset_lite.coverage.update_coverage_statuses"
+		],
+	},
+	"hourly": [
+		"asset_lite.availability.refresh_dirty_availability"
+	],
+	"daily": [
+		"asset_lite.supplier_scorecard.refresh_supplier_scorecard_metrics",
+		"asset_lite.sla_penalty.refresh_open_penalty_months",
+		"asset_lite.downtime.refresh_open_downtime"
+	],
+	"daily_long": [
+		"asset_lite.parquet_export.export_parquet_snapshots"
+	],
+}
 
 # Testing
 # -------
@@ -194,7 +273,9 @@ doc_events = {
 # Ignore links to specified DocTypes when deleting documents
 # -----------------------------------------------------------
 
-# ignore_links_on_delete = ["Communication", "ToDo"]
+# Derived rows are deleted with the document they link to, see the on_trash events
+ignore_links_on_delete = ["Asset Downtime Bucket", "Asset Reliability", "Vendor Penalty Ledger",
+    "Asset Availability Rollup"]
 
 # Request Events
 # ----------------
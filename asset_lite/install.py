@@ -0,0 +1,17 @@
+import frappe
+
+# Indexes on doctypes of other apps, which never call an on_doctype_update of
+# ours; added on install and after every migrate, add_index skips existing ones
+APP_INDEXES = [
+    # Looked up per asset and due date when PM plans are generated
+    ("Asset Maintenance Log", ["asset_maintenance", "due_date"]),
+    # Range scanned by the status sweep and the overdue endpoint
+    ("Asset Maintenance Log", ["maintenance_status", "due_date"]),
+    # Per-hospital status counts on the map
+    ("Asset Maintenance Log", ["custom_hospital_name", "maintenance_status"]),
+]
+
+
+def add_app_indexes():
+    for doctype, fields in APP_INDEXES:
+        frappe.db.add_index(doctype, fields)
@@ -24,6 +24,21 @@ def get_active_map_data(hospital=None):
     hospitals = frappe.get_all("Location", fields=["name", "latitude", "longitude"], filters=filters)
     results = []
 
+    # Maintenance log counts per hospital and status in one pass over the
+    # (custom_hospital_name, maintenance_status) index
+    maintenance_counts = {}
+    if hospitals:
+        for row in frappe.get_all(
+            "Asset Maintenance Log",
+            filters={
+                "custom_hospital_name": ["in", [h.name for h in hospitals]],
+                "maintenance_status": ["in", ["Planned", "Completed", "Overdue"]],
+            },
+            fields=["custom_hospital_name", "maintenance_status", "count(name) as count"],
+            group_by="custom_hospital_name, maintenance_status",
+        ):
+            maintenance_counts[(row.custom_hospital_name, row.maintenance_status)] = row.count
+
     for h in hospitals:
         name = h.name
 
@@ -54,18 +69,9 @@ def get_active_map_data(hospital=None):
             "wo_completed": count("Work_Order", {"company": name, "repair_status": "Completed"}),
 
 
-            "planned_maintenance": count("Asset Maintenance Log", {
-                "custom_hospital_name": name,
-                "maintenance_status": "Planned"
-            }),
-            "completed_maintenance": count("Asset Maintenance Log", {
-                "custom_hospital_name": name,
-                "maintenance_status": "Completed"
-            }),
-            "overdue_maintenance": count("Asset Maintenance Log", {
-                "custom_hospital_name": name,
-                "maintenance_status": "Overdue"
-            })
+            "planned_maintenance": maintenance_counts.get((name, "Planned"), 0),
+            "completed_maintenance": maintenance_counts.get((name, "Completed"), 0),
+            "overdue_maintenance": maintenance_counts.get((name, "Overdue"), 0)
         }
 
         results.append(data)
@@ -0,0 +1,220 @@
+import json
+import os
+from collections import defaultdict
+from urllib.parse import quote
+
+import frappe
+from frappe import _
+from frappe.utils import add_to_date, cstr, now_datetime
+
+from asset_lite.api.sync_api import SYNC_SAFETY_LAG
+
+# Datasets written for analytics. "company" is the SQL expression the files
+# are partitioned by; "joins" and "extra" add columns from parent tables.
+PARQUET_DATASETS = {
+    "Asset": {"company": "t.company"},
+    "Work_Order": {"company": "t.company"},
+    "Asset Maintenance Log": {"company": "t.custom_hospital_name"},
+    "Asset Maintenance": {"company": "t.company"},
+    "Depreciation Schedule": {
+        "company": "asset.company",
+        "joins": """
+            JOIN `tabAsset Depreciation Schedule` ads ON ads.name = t.parent
+            JOIN `tabAsset` asset ON asset.name = ads.asset
+        """,
+        "extra": {"asset": "ads.asset", "finance_book": "ads.finance_book"},
+    },
+}
+
+# Rows read and written per Parquet file
+PARQUET_CHUNK_SIZE = 50000
+
+FLOAT_FIELDTYPES = ("Currency", "Float", "Percent", "Duration")
+INT_FIELDTYPES = ("Int", "Check", "Rating")
+
+
+def get_export_dir():
+    """Root of the Parquet datasets, inside the site's private files"""
+    return frappe.get_site_path("private", "analytics")
+
+
+def get_dataset_dir(doctype):
+    return os.path.join(get_export_dir(), frappe.scrub(doctype))
+
+
+def read_watermark(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_watermark(path, watermark):
+    """Replace the watermark atomically so a crash never leaves it half written"""
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(watermark, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def get_column_types(doctype, columns):
+    """Arrow type per column, from the DocType meta"""
+    import pyarrow as pa
+
+    meta = frappe.get_meta(doctype)
+    types = {}
+    for column in columns:
+        df = meta.get_field(column)
+        fieldtype = df.fieldtype if df else None
+        if column in ("creation", "modified") or fieldtype == "Datetime":
+            types[column] = pa.timestamp("us")
+        elif fieldtype == "Date":
+            types[column] = pa.date32()
+        elif column in ("docstatus", "idx") or fieldtype in INT_FIELDTYPES:
+            types[column] = pa.int64()
+        elif fieldtype in FLOAT_FIELDTYPES:
+            types[column] = pa.float64()
+        else:
+            types[column] = pa.string()
+    return types
+
+
+def to_arrow_value(value, arrow_type):
+    import pyarrow as pa
+
+    if value is None:
+        return None
+    if pa.types.is_floating(arrow_type):
+        return float(value)
+    if pa.types.is_string(arrow_type):
+        return cstr(value)
+    return value
+
+
+def write_partitions(dataset_dir, rows, schema, part_name):
+    """Write rows into company=/month= partitions (month of creation, which never changes)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    partitions = defaultdict(list)
+    for row in rows:
+        month = row["creation"].strftime("%Y-%m")
+        partitions[(row.pop("_company") or "", month)].append(row)
+
+    for (company, month), partition_rows in partitions.items():
+        path = os.path.join(dataset_dir, f"company={quote(company, safe=' ')}", f"month={month}")
+        os.makedirs(path, exist_ok=True)
+        table = pa.Table.from_pylist(
+            [
+                {field.name: to_arrow_value(row.get(field.name), field.type) for field in schema}
+                for row in partition_rows
+            ],
+            schema=schema,
+        )
+        pq.write_table(table, os.path.join(path, f"{part_name}.parquet"), compression="zstd")
+
+
+def export_dataset(doctype, upto, chunk_size=PARQUET_CHUNK_SIZE):
+    """
+    Append rows of doctype modified since the dataset's watermark
+
+    Rows are read in (modified, name) keyset order, one chunk per Parquet
+    file per partition, and the watermark advances after every chunk. An
+    updated row is written again, so readers keep the latest modified per name.
+
+    Returns:
+        Number of rows exported
+    """
+    import pyarrow as pa
+
+    config = PARQUET_DATASETS[doctype]
+    dataset_dir = get_dataset_dir(doctype)
+    os.makedirs(dataset_dir, exist_ok=True)
+    watermark_path = os.path.join(dataset_dir, "_watermark.json")
+    watermark = read_watermark(watermark_path) or {"modified": "1900-01-01", "name": ""}
+
+    columns = frappe.get_meta(doctype).get_valid_columns()
+    extra = config.get("extra", {})
+    types = get_column_types(doctype, columns)
+    schema = pa.schema([(column, types[column]) for column in columns] + [(column, pa.string()) for column in extra])
+    select = ", ".join([f"t.`{column}`" for column in columns] + [f"{expr} AS `{column}`" for column, expr in extra.items()])
+
+    run = now_datetime().strftime("%Y%m%dT%H%M%S")
+    exported = 0
+    while True:
+        rows = frappe.db.sql(f"""
+            SELECT {select}, {config["company"]} AS _company
+            FROM `tab{doctype}` t
+            {config.get("joins", "")}
+            WHERE t.modified <= %(upto)s
+                AND (t.modified > %(modified)s OR (t.modified = %(modified)s AND t.name > %(name)s))
+            ORDER BY t.modified, t.name
+            LIMIT %(limit)s
+        """, {**watermark, "upto": upto, "limit": chunk_size}, as_dict=True)
+        if not rows:
+            break
+
+        last = rows[-1]
+        write_partitions(dataset_dir, rows, schema, f"part-{run}-{exported // chunk_size:05d}")
+        exported += len(rows)
+        watermark = {"modified": str(last.modified), "name": last.name}
+        write_watermark(watermark_path, watermark)
+
+        if len(rows) < chunk_size:
+            break
+
+    return exported
+
+
+def export_deletions(upto):
+    """Append Deleted Document entries of the exported doctypes, so readers can drop them"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    dataset_dir = os.path.join(get_export_dir(), "_deleted")
+    os.makedirs(dataset_dir, exist_ok=True)
+    watermark_path = os.path.join(dataset_dir, "_watermark.json")
+    watermark = read_watermark(watermark_path) or {"creation": "1900-01-01", "name": ""}
+
+    rows = frappe.db.sql("""
+        SELECT name, deleted_doctype, deleted_name, creation AS deleted_at
+        FROM `tabDeleted Document`
+        WHERE deleted_doctype IN %(doctypes)s
+            AND creation <= %(upto)s
+            AND (creation > %(creation)s OR (creation = %(creation)s AND name > %(name)s))
+        ORDER BY creation, name
+    """, {**watermark, "doctypes": list(PARQUET_DATASETS), "upto": upto}, as_dict=True)
+    if not rows:
+        return 0
+
+    table = pa.Table.from_pylist(
+        [{"deleted_doctype": row.deleted_doctype, "deleted_name": row.deleted_name, "deleted_at": row.deleted_at} for row in rows],
+        schema=pa.schema([("deleted_doctype", pa.string()), ("deleted_name", pa.string()), ("deleted_at", pa.timestamp("us"))]),
+    )
+    pq.write_table(table, os.path.join(dataset_dir, f"part-{now_datetime().strftime('%Y%m%dT%H%M%S')}.parquet"))
+    write_watermark(watermark_path, {"creation": str(rows[-1].deleted_at), "name": rows[-1].name})
+    return len(rows)
+
+
+def export_parquet_snapshots():
+    """
+    Scheduled job: bring every Parquet dataset up to date
+
+    Files live under sites/<site>/private/analytics/<dataset>/company=<company>/month=<YYYY-MM>/
+    and can be read with pyarrow.dataset or DuckDB (hive_partitioning). See
+    asset_lite.verify_pmc_parquet for an example that recomputes the PMC report.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        frappe.log_error(_("pyarrow is not installed, Parquet export skipped"), 'Parquet Export Error')
+        return
+
+    # Same lag as sync: rows of transactions still open are left for the next run
+    upto = str(add_to_date(now_datetime(), seconds=-SYNC_SAFETY_LAG))
+    for doctype in PARQUET_DATASETS:
+        try:
+            export_dataset(doctype, upto)
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), f'Parquet Export Error: {doctype}')
+
+    export_deletions(upto)
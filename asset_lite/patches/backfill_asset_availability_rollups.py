@@ -0,0 +1,16 @@
+import frappe
+
+
+def execute():
+	# Availability trends read the rollups; build them once from the buckets on existing sites
+	from asset_lite.availability import AVAILABILITY_DIRTY_DAYS_KEY, rebuild_availability
+
+	frappe.reload_doc("asset_lite", "doctype", "asset_availability_rollup")
+	first_day = frappe.db.sql("""
+		SELECT MIN(available_for_use_date) FROM `tabAsset` WHERE docstatus = 1
+	""")[0][0]
+	if first_day:
+		rebuild_availability(first_day)
+
+	# Every day was just rebuilt, including those the bucket backfill marked dirty
+	frappe.cache().delete_value(AVAILABILITY_DIRTY_DAYS_KEY)
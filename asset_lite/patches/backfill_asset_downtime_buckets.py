@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+	# Availability rollups, and so the Supplier Down Time report, are built from the buckets; fill them once on existing sites
+	from asset_lite.downtime import refresh_asset_downtime
+
+	frappe.reload_doc("asset_lite", "doctype", "asset_downtime_bucket")
+	refresh_asset_downtime()
@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+	# The MTBF report reads Asset Reliability; fill it once on existing sites
+	from asset_lite.reliability import update_asset_reliability
+
+	frappe.reload_doc("asset_lite", "doctype", "asset_reliability")
+	update_asset_reliability()
@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+	# The Supplier Score reports read the cached metrics; fill them now instead of at the first daily run
+	from asset_lite.supplier_scorecard import refresh_supplier_scorecard_metrics
+
+	frappe.reload_doc("asset_lite", "doctype", "supplier_scorecard_metrics")
+	refresh_supplier_scorecard_metrics()
@@ -0,0 +1,300 @@
+import frappe
+from frappe import _
+from frappe.utils import getdate, now_datetime
+
+from asset_lite.api.bulk_api import set_job_progress
+from asset_lite.ppm_template import CHECKLIST_ROW_FIELDS, build_checklist_rows, get_ppm_templates, get_template
+
+PERIODICITY_DAYS = {"Daily": 1, "Weekly": 7}
+PERIODICITY_MONTHS = {"Monthly": 1, "Quarterly": 3, "Half-yearly": 6, "Yearly": 12, "2 Yearly": 24, "3 Yearly": 36}
+
+# PM Schedule Generator field -> Asset column the plan is filtered on
+ASSET_FILTER_FIELDS = {
+    "hospital": "company",
+    "manufacturer": "custom_manufacturer",
+    "modality": "custom_modality",
+    "model": "custom_model",
+    "asset_name": "asset_name",
+    "device_status": "custom_device_status",
+}
+
+# Assets whose logs are computed, deduplicated and inserted per commit
+PM_SCHEDULE_CHUNK_SIZE = 1000
+
+
+def compute_due_dates(start_dates, end_dates, periodicity):
+    """
+    Every due date of every asset in one pass of array arithmetic
+
+    Due dates are start + k * period for k = 1, 2, ... up to the asset's end
+    date, matching the "Update Due Date" server script and ERPNext's first
+    due date. Month steps keep the start day and clamp it to the month's last
+    day, like frappe.utils.add_months.
+
+    Args:
+        start_dates: Sequence of start dates, one per asset
+        end_dates: Sequence of end dates, one per asset
+        periodicity: A PM Schedule Generator periodicity
+
+    Returns:
+        (asset_index, due_dates) numpy arrays, one entry per log
+    """
+    import numpy as np
+
+    start = np.asarray(start_dates, dtype="datetime64[D]")
+    end = np.asarray(end_dates, dtype="datetime64[D]")
+    if not len(start):
+        return np.empty(0, dtype=int), np.empty(0, dtype="datetime64[D]")
+
+    if periodicity in PERIODICITY_DAYS:
+        step = PERIODICITY_DAYS[periodicity]
+        steps = np.arange(1, int((end - start).astype(int).max()) // step + 1)
+        due = start[:, None] + (steps * step).astype("timedelta64[D]")[None, :]
+    elif periodicity in PERIODICITY_MONTHS:
+        step = PERIODICITY_MONTHS[periodicity]
+        start_month = start.astype("datetime64[M]")
+        day = start - start_month.astype("datetime64[D]")
+        steps = np.arange(1, int((end.astype("datetime64[M]") - start_month).astype(int).max()) // step + 1)
+        month = start_month[:, None] + (steps * step)[None, :]
+        first_day = month.astype("datetime64[D]")
+        last_day = (month + 1).astype("datetime64[D]") - first_day - 1
+        due = first_day + np.minimum(day[:, None], last_day)
+    else:
+        frappe.throw(_("Unsupported periodicity {0}").format(periodicity))
+
+    asset_index, step_index = np.nonzero(due <= end[:, None])
+    return asset_index, due[asset_index, step_index]
+
+
+def get_schedule_assets(filters=None, entries=None, periodicity=None):
+    """
+    Assets of a plan with the Asset Maintenance and task their logs belong to
+
+    Only assets that have an Asset Maintenance are returned, since every log
+    links to one. The task is the asset's maintenance task with the plan's
+    periodicity, if it has one.
+
+    Args:
+        filters: Dictionary of ASSET_FILTER_FIELDS keys to values
+        entries: Optional list of asset names to restrict the plan to
+        periodicity: Periodicity of the plan
+
+    Returns:
+        List of dicts per asset
+    """
+    conditions = []
+    values = {"periodicity": periodicity}
+    for key, column in ASSET_FILTER_FIELDS.items():
+        if (filters or {}).get(key):
+            conditions.append(f"a.`{column}` = %({key})s")
+            values[key] = filters[key]
+    if entries is not None:
+        conditions.append("a.name IN %(entries)s")
+        values["entries"] = tuple(entries) or ("",)
+
+    return frappe.db.sql(f"""
+        SELECT
+            a.name AS asset,
+            a.asset_name,
+            a.company,
+            a.custom_asset_type,
+            am.name AS asset_maintenance,
+            am.item_code,
+            am.item_name,
+            task.name AS task,
+            task.maintenance_task AS task_name,
+            task.maintenance_type,
+            task.assign_to_name
+        FROM `tabAsset` a
+        JOIN `tabAsset Maintenance` am ON am.asset_name = a.name
+        LEFT JOIN `tabAsset Maintenance Task` task ON task.name = (
+            SELECT MIN(t.name) FROM `tabAsset Maintenance Task` t
+            WHERE t.parent = am.name AND t.parenttype = 'Asset Maintenance' AND t.periodicity = %(periodicity)s
+        )
+        WHERE a.docstatus < 2
+            {"".join(f" AND {condition}" for condition in conditions)}
+        ORDER BY a.name
+    """, values, as_dict=True)
+
+
+def get_existing_due_dates(asset_maintenances, start_date, end_date):
+    """(asset_maintenance, due_date) of the logs already planned, cancelled ones excluded"""
+    return frappe.db.sql("""
+        SELECT asset_maintenance, due_date
+        FROM `tabAsset Maintenance Log`
+        WHERE asset_maintenance IN %(asset_maintenances)s
+            AND due_date BETWEEN %(start_date)s AND %(end_date)s
+            AND docstatus < 2
+            AND maintenance_status != 'Cancelled'
+    """, {"asset_maintenances": tuple(asset_maintenances), "start_date": start_date, "end_date": end_date})
+
+
+def reserve_names(doctype, count):
+    """
+    Take count consecutive names from the doctype's naming series with one
+    update of tabSeries, instead of one per document
+    """
+    from frappe.model.naming import NamingSeries
+
+    series = (frappe.get_meta(doctype).get_field("naming_series").options or "").split("\n")[0]
+    if "#" not in series:
+        series += ".#####"
+    digits = series.count("#")
+    prefix = NamingSeries(series).get_prefix()
+
+    frappe.db.sql("INSERT IGNORE INTO `tabSeries` (name, current) VALUES (%s, 0)", prefix)
+    current = frappe.db.sql("SELECT current FROM `tabSeries` WHERE name = %s FOR UPDATE", prefix)[0][0]
+    frappe.db.sql("UPDATE `tabSeries` SET current = %s WHERE name = %s", (current + count, prefix))
+    return [f"{prefix}{str(current + i).zfill(digits)}" for i in range(1, count + 1)]
+
+
+def get_initial_workflow_state(doctype):
+    from frappe.model.workflow import get_workflow_name
+
+    workflow_name = get_workflow_name(doctype)
+    if workflow_name:
+        return frappe.get_cached_doc("Workflow", workflow_name).states[0].state
+
+
+def insert_pm_logs(assets, asset_index, due_dates, periodicity):
+    """Bulk insert one Planned Asset Maintenance Log per (asset, due date), with its checklist rows"""
+    now = now_datetime()
+    user = frappe.session.user
+    common = {"creation": now, "modified": now, "owner": user, "modified_by": user, "docstatus": 0}
+    workflow_state = get_initial_workflow_state("Asset Maintenance Log")
+
+    log_fields = [
+        "name", "creation", "modified", "owner", "modified_by", "docstatus", "asset_maintenance", "asset_name",
+        "item_code", "item_name", "custom_asset_names", "custom_asset_type", "custom_hospital_name", "task",
+        "task_name", "maintenance_type", "periodicity", "maintenance_status", "assign_to_name", "due_date",
+        "custom_template", "workflow_state",
+    ]
+
+    templates = get_ppm_templates()
+    names = reserve_names("Asset Maintenance Log", len(due_dates))
+    logs, checklists = [], []
+    for name, index, due_date in zip(names, asset_index, due_dates.tolist()):
+        asset = assets[index]
+        template, checklist = get_template(asset.custom_asset_type, templates)
+        logs.append({
+            **common,
+            "name": name,
+            "asset_maintenance": asset.asset_maintenance,
+            "asset_name": asset.asset,
+            "item_code": asset.item_code,
+            "item_name": asset.item_name,
+            "custom_asset_names": asset.asset_name,
+            "custom_asset_type": asset.custom_asset_type,
+            "custom_hospital_name": asset.company,
+            "task": asset.task,
+            "task_name": asset.task_name,
+            "maintenance_type": asset.maintenance_type or "Preventive Maintenance",
+            "periodicity": periodicity,
+            "maintenance_status": "Planned",
+            "assign_to_name": asset.assign_to_name,
+            "due_date": due_date,
+            "custom_template": template,
+            "workflow_state": workflow_state,
+        })
+        checklists.append((name, checklist))
+
+    frappe.db.bulk_insert(
+        "Asset Maintenance Log", log_fields, [[log[field] for field in log_fields] for log in logs], chunk_size=5000
+    )
+    frappe.db.bulk_insert(
+        "PPM Table",
+        CHECKLIST_ROW_FIELDS,
+        build_checklist_rows("Asset Maintenance Log", checklists, now, user),
+        chunk_size=5000,
+    )
+    return len(logs)
+
+
+def generate_pm_logs(assets, periodicity, start_date, end_date, job_id=None, chunk_size=PM_SCHEDULE_CHUNK_SIZE):
+    """
+    Create every Asset Maintenance Log of a plan that does not exist yet
+
+    Per chunk of assets, the due dates are computed with array arithmetic,
+    the logs already planned are read with one query and removed with a
+    vectorized membership test, and the rest are bulk inserted and committed.
+    Controllers and server scripts do not run for the inserted logs; the
+    checklist of the asset type's PPM template is inserted with them.
+
+    Args:
+        assets: Rows of get_schedule_assets, optionally with their own start_date/end_date
+        periodicity: A PM Schedule Generator periodicity
+        start_date: Default plan start
+        end_date: Default plan end (inclusive)
+        job_id: Optional bulk job id whose progress is updated per chunk
+
+    Returns:
+        {"assets": int, "created": int, "skipped": int}
+    """
+    import numpy as np
+
+    created = skipped = 0
+    for offset in range(0, len(assets), chunk_size):
+        chunk = assets[offset:offset + chunk_size]
+        starts = [getdate(asset.get("start_date") or start_date) for asset in chunk]
+        ends = [getdate(asset.get("end_date") or end_date) for asset in chunk]
+        asset_index, due_dates = compute_due_dates(starts, ends, periodicity)
+
+        # One integer key per (asset, date) so existing logs drop out with np.isin
+        position = {asset.asset_maintenance: index for index, asset in enumerate(chunk)}
+        existing = [
+            position[asset_maintenance] * 1_000_000 + (np.datetime64(due_date, "D") - np.datetime64(0, "D")).astype(int)
+            for asset_maintenance, due_date in get_existing_due_dates(list(position), min(starts), max(ends))
+            if due_date
+        ]
+        keys = asset_index * 1_000_000 + (due_dates - np.datetime64(0, "D")).astype(int)
+        new = ~np.isin(keys, np.asarray(existing, dtype=keys.dtype))
+        skipped += int((~new).sum())
+
+        if new.any():
+            created += insert_pm_logs(chunk, asset_index[new], due_dates[new], periodicity)
+        frappe.db.commit()
+
+        if job_id:
+            set_job_progress(job_id, processed=offset + len(chunk), created=created, skipped=skipped)
+
+    return {"assets": len(assets), "created": created, "skipped": skipped}
+
+
+def run_pm_schedule_generation(bulk_job_id, generator):
+    """Background job entry point for PMScheduleGenerator.generate_maintenance_logs"""
+    set_job_progress(bulk_job_id, status="Running")
+    try:
+        doc = frappe.get_doc("PM Schedule Generator", generator)
+        entries = {row.asset: row for row in doc.maintenance_entries if row.asset}
+        # Entries fetched onto the plan take precedence over its filters
+        if entries:
+            assets = get_schedule_assets(entries=list(entries), periodicity=doc.periodicity)
+        else:
+            filters = {key: doc.get(key) for key in ASSET_FILTER_FIELDS}
+            assets = get_schedule_assets(filters, periodicity=doc.periodicity)
+        for asset in assets:
+            if asset.asset in entries:
+                asset.start_date = entries[asset.asset].start_date
+                asset.end_date = entries[asset.asset].end_date
+
+        set_job_progress(bulk_job_id, total=len(assets))
+        result = generate_pm_logs(assets, doc.periodicity, doc.start_date, doc.end_date, job_id=bulk_job_id)
+
+        # Spread the plan's logs over its team's technicians, or over the plan's own assignee
+        if assets and (doc.maintenance_team or doc.assign_to):
+            from asset_lite.pm_workload import level_maintenance_logs
+
+            leveling = level_maintenance_logs(
+                doc.start_date,
+                doc.end_date,
+                asset_maintenances=[asset.asset_maintenance for asset in assets],
+                technicians={doc.maintenance_team: [doc.assign_to]} if doc.assign_to else None,
+            )
+            result["over_capacity"] = leveling["over_capacity"]
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), 'PM Schedule Generation Error')
+        set_job_progress(bulk_job_id, status="Failed", error=str(e))
+        return
+
+    set_job_progress(bulk_job_id, status="Completed", **result)
@@ -0,0 +1,329 @@
+import json
+from collections import defaultdict
+from datetime import timedelta
+
+import frappe
+from frappe.utils import cint, getdate, now_datetime
+
+from asset_lite.api.bulk_api import set_job_progress
+
+# Days a PM may be brought forward from its due date, per periodicity. PMs are
+# never moved past their due date, so levelling cannot create overdue logs.
+DUE_WINDOW_DAYS = {
+    "Daily": 0,
+    "Weekly": 1,
+    "Monthly": 5,
+    "Quarterly": 10,
+    "Half-yearly": 14,
+    "Yearly": 21,
+    "2 Yearly": 21,
+    "3 Yearly": 21,
+}
+
+# PMs per technician per day when the team has no custom_daily_pm_capacity
+DEFAULT_DAILY_CAPACITY = 4
+
+# Cost of a slot, in PMs of load: a technician who already visits another
+# site (or another city) that day pays this on top of the slot's load
+SITE_CHANGE_COST = 1
+CITY_CHANGE_COST = 4
+# Per day a PM is brought forward, so equal loads keep PMs near their due date
+SHIFT_COST = 0.05
+
+# Logs whose assignment is written per commit
+ASSIGNMENT_CHUNK_SIZE = 1000
+
+
+def level_pm_workload(jobs, technicians, capacity, holidays=None, assigned=None):
+    """
+    Spread PMs over technicians and days within their due windows
+
+    Greedy earliest-deadline-first: PMs are taken by due date, grouped by
+    site, and each goes to the cheapest (technician, day) slot of its team
+    that still has capacity. A slot costs its current load, plus a travel
+    penalty when the technician already visits another site or city that day,
+    plus a small cost per day before the due date. Each PM looks at
+    window x technicians slots, so the run is linear in the number of PMs.
+
+    Args:
+        jobs: Dicts with name, team, due_date, periodicity, site and city
+        technicians: Team -> list of technician users
+        capacity: Team -> PMs per technician per day
+        holidays: Team -> set of dates nobody of the team works
+        assigned: (user, day, site, city, logs) rows of PMs already assigned,
+            which the slots start with
+
+    Returns:
+        List of {"name", "assign_to", "scheduled_date", "over_capacity"}. A PM
+        that fits no slot keeps its due date and goes to the least loaded
+        technician, with over_capacity set.
+    """
+    holidays = holidays or {}
+    load = defaultdict(int)
+    sites = defaultdict(set)
+    cities = defaultdict(set)
+    assignments = []
+
+    for user, day, site, city, logs in assigned or ():
+        slot = (user, getdate(day))
+        load[slot] += logs
+        sites[slot].add(site)
+        cities[slot].add(city)
+
+    for job in sorted(jobs, key=lambda job: (getdate(job["due_date"]), job.get("site") or "", job["name"])):
+        team = job.get("team")
+        users = technicians.get(team) or []
+        due = getdate(job["due_date"])
+        if not users:
+            assignments.append({"name": job["name"], "assign_to": None, "scheduled_date": due, "over_capacity": True})
+            continue
+
+        limit = capacity.get(team) or DEFAULT_DAILY_CAPACITY
+        team_holidays = holidays.get(team) or ()
+        site, city = job.get("site"), job.get("city")
+
+        best = None
+        for shift in range(DUE_WINDOW_DAYS.get(job.get("periodicity"), 0) + 1):
+            day = due - timedelta(days=shift)
+            if day in team_holidays:
+                continue
+            for user in users:
+                slot = (user, day)
+                if load[slot] >= limit:
+                    continue
+                cost = load[slot] + shift * SHIFT_COST
+                if sites[slot] and site not in sites[slot]:
+                    cost += SITE_CHANGE_COST if city in cities[slot] else CITY_CHANGE_COST
+                if best is None or cost < best[0]:
+                    best = (cost, slot)
+
+        over_capacity = best is None
+        user, day = best[1] if best else (min(users, key=lambda user: load[(user, due)]), due)
+        load[(user, day)] += 1
+        sites[(user, day)].add(site)
+        cities[(user, day)].add(city)
+        assignments.append(
+            {"name": job["name"], "assign_to": user, "scheduled_date": day, "over_capacity": over_capacity}
+        )
+
+    return assignments
+
+
+def get_leveling_jobs(from_date, to_date, teams=None, asset_maintenances=None):
+    """Planned, unsubmitted maintenance logs due in the period, with their team, site and city"""
+    conditions = ""
+    values = {"from_date": from_date, "to_date": to_date}
+    if teams:
+        conditions += " AND am.maintenance_team IN %(teams)s"
+        values["teams"] = tuple(teams)
+    if asset_maintenances:
+        conditions += " AND aml.asset_maintenance IN %(asset_maintenances)s"
+        values["asset_maintenances"] = tuple(asset_maintenances)
+
+    return frappe.db.sql(f"""
+        SELECT
+            aml.name,
+            aml.due_date,
+            aml.periodicity,
+            am.maintenance_team AS team,
+            asset.custom_site AS site,
+            site.city
+        FROM `tabAsset Maintenance Log` aml
+        JOIN `tabAsset Maintenance` am ON am.name = aml.asset_maintenance
+        LEFT JOIN `tabAsset` asset ON asset.name = am.asset_name
+        LEFT JOIN `tabMobile Team Site` site ON site.name = asset.custom_site
+        WHERE aml.maintenance_status = 'Planned'
+            AND aml.docstatus = 0
+            AND aml.due_date BETWEEN %(from_date)s AND %(to_date)s
+            {conditions}
+    """, values, as_dict=True)
+
+
+def get_assigned_load(from_date, to_date, users, exclude=None):
+    """
+    Open PMs already assigned to the users per day, with their site and city,
+    from one grouped query over the open ToDos of unsubmitted logs
+
+    Args:
+        exclude: Logs being levelled again, whose current assignment is dropped
+
+    Returns:
+        (user, day, site, city, logs) rows
+    """
+    if not users:
+        return []
+
+    conditions = ""
+    values = {
+        # PMs of the period may be brought forward into the days before it
+        "from_date": getdate(from_date) - timedelta(days=max(DUE_WINDOW_DAYS.values())),
+        "to_date": to_date,
+        "users": tuple(users),
+    }
+    if exclude:
+        conditions = " AND aml.name NOT IN %(exclude)s"
+        values["exclude"] = tuple(exclude)
+
+    return frappe.db.sql(f"""
+        SELECT todo.allocated_to, todo.date, asset.custom_site, site.city, COUNT(*)
+        FROM `tabToDo` todo
+        JOIN `tabAsset Maintenance Log` aml ON aml.name = todo.reference_name
+        LEFT JOIN `tabAsset` asset ON asset.name = aml.asset_name
+        LEFT JOIN `tabMobile Team Site` site ON site.name = asset.custom_site
+        WHERE todo.reference_type = 'Asset Maintenance Log'
+            AND todo.status = 'Open'
+            AND todo.allocated_to IN %(users)s
+            AND todo.date BETWEEN %(from_date)s AND %(to_date)s
+            AND aml.docstatus = 0
+            AND aml.maintenance_status IN ('Planned', 'Overdue')
+            {conditions}
+        GROUP BY todo.allocated_to, todo.date, asset.custom_site, site.city
+    """, values, as_list=True)
+
+
+def get_team_settings(teams):
+    """
+    Technicians, daily capacity and holidays per Asset Maintenance Team
+
+    Holidays come from the default holiday list of the team's company.
+
+    Returns:
+        (technicians, capacity, holidays) dictionaries keyed by team
+    """
+    technicians, capacity, holidays = defaultdict(list), {}, {}
+    if not teams:
+        return technicians, capacity, holidays
+
+    for member in frappe.get_all(
+        "Asset Maintenance Team Member",
+        filters={"parent": ["in", list(teams)], "parenttype": "Asset Maintenance Team"},
+        fields=["parent", "team_member"],
+        order_by="idx asc",
+    ):
+        technicians[member.parent].append(member.team_member)
+
+    holiday_dates = {}
+    for team in frappe.get_all(
+        "Asset Maintenance Team",
+        filters={"name": ["in", list(teams)]},
+        fields=["name", "company", "custom_daily_pm_capacity"],
+    ):
+        capacity[team.name] = cint(team.custom_daily_pm_capacity) or DEFAULT_DAILY_CAPACITY
+        holiday_list = team.company and frappe.get_cached_value("Company", team.company, "default_holiday_list")
+        if holiday_list and holiday_list not in holiday_dates:
+            holiday_dates[holiday_list] = {
+                getdate(day) for day in frappe.get_all("Holiday", {"parent": holiday_list}, pluck="holiday_date")
+            }
+        holidays[team.name] = holiday_dates.get(holiday_list) or set()
+
+    return technicians, capacity, holidays
+
+
+def apply_pm_assignments(assignments, job_id=None):
+    """
+    Assign the maintenance logs to their technicians in bulk
+
+    Per chunk, assign_to_name and _assign are written with one CASE update,
+    open assignments of the logs are cancelled and one ToDo per log is
+    inserted, dated on the levelled day. due_date is left as it is: it stays
+    the compliance deadline and the key PM plans deduplicate on.
+    """
+    assignments = [row for row in assignments if row["assign_to"]]
+    full_names = dict(frappe.get_all(
+        "User", filters={"name": ["in", list({row["assign_to"] for row in assignments}) or [""]]},
+        fields=["name", "full_name"], as_list=True,
+    ))
+    user = frappe.session.user
+
+    for offset in range(0, len(assignments), ASSIGNMENT_CHUNK_SIZE):
+        chunk = assignments[offset:offset + ASSIGNMENT_CHUNK_SIZE]
+        names = [row["name"] for row in chunk]
+        now = now_datetime()
+
+        frappe.db.bulk_update("Asset Maintenance Log", {
+            row["name"]: {
+                "assign_to_name": full_names.get(row["assign_to"]) or row["assign_to"],
+                "_assign": json.dumps([row["assign_to"]]),
+            }
+            for row in chunk
+        }, chunk_size=500)
+
+        frappe.db.sql("""
+            UPDATE `tabToDo` SET status = 'Cancelled', modified = %(now)s
+            WHERE reference_type = 'Asset Maintenance Log' AND reference_name IN %(names)s AND status = 'Open'
+        """, {"now": now, "names": tuple(names)})
+        frappe.db.bulk_insert(
+            "ToDo",
+            ["name", "creation", "modified", "owner", "modified_by", "status", "priority", "date", "allocated_to",
+             "description", "reference_type", "reference_name", "assigned_by"],
+            [
+                (frappe.generate_hash(length=10), now, now, user, user, "Open", "Medium", row["scheduled_date"],
+                 row["assign_to"], f"Preventive maintenance {row['name']}", "Asset Maintenance Log", row["name"], user)
+                for row in chunk
+            ],
+        )
+        frappe.db.commit()
+
+        if job_id:
+            set_job_progress(job_id, processed=offset + len(chunk))
+
+
+def level_maintenance_logs(
+    from_date, to_date, teams=None, asset_maintenances=None, technicians=None, apply=True, job_id=None
+):
+    """
+    Level the Planned maintenance logs of a period and, with apply, assign them
+
+    Args:
+        from_date: First due date to consider
+        to_date: Last due date to consider
+        teams: Optional list of Asset Maintenance Teams
+        asset_maintenances: Optional list of Asset Maintenance names
+        technicians: Optional team -> users override (e.g. a plan's single assign_to)
+        apply: Write the result to the logs
+
+    Returns:
+        {"logs", "technicians", "over_capacity", "peak_daily_load", "assignments"}
+    """
+    jobs = get_leveling_jobs(from_date, to_date, teams, asset_maintenances)
+    team_technicians, capacity, holidays = get_team_settings({job.team for job in jobs if job.team})
+    team_technicians.update(technicians or {})
+
+    # Days other plans already filled count against the technicians' capacity
+    assigned = get_assigned_load(
+        from_date,
+        to_date,
+        {user for users in team_technicians.values() for user in users if user},
+        [job.name for job in jobs],
+    )
+
+    assignments = level_pm_workload(jobs, team_technicians, capacity, holidays, assigned)
+    if apply:
+        apply_pm_assignments(assignments, job_id=job_id)
+
+    daily_load = defaultdict(int)
+    for row in assignments:
+        daily_load[(row["assign_to"], row["scheduled_date"])] += 1
+
+    return {
+        "logs": len(assignments),
+        "technicians": len({row["assign_to"] for row in assignments if row["assign_to"]}),
+        "over_capacity": sum(1 for row in assignments if row["over_capacity"]),
+        "peak_daily_load": max(daily_load.values(), default=0),
+        "assignments": assignments,
+    }
+
+
+def run_maintenance_leveling(bulk_job_id, from_date, to_date, teams=None):
+    """Background job entry point for asset_maintenance_api.level_maintenance_workload"""
+    set_job_progress(bulk_job_id, status="Running")
+    try:
+        result = level_maintenance_logs(from_date, to_date, teams, job_id=bulk_job_id)
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), 'PM Workload Leveling Error')
+        set_job_progress(bulk_job_id, status="Failed", error=str(e))
+        return
+
+    result.pop("assignments")
+    set_job_progress(bulk_job_id, status="Completed", **result)
@@ -0,0 +1,179 @@
+import calendar
+
+import frappe
+from frappe import _
+from frappe.model.naming import set_new_name
+from frappe.utils import cint, get_first_day, get_last_day, getdate, now_datetime
+
+from asset_lite.api.bulk_api import set_job_progress
+from asset_lite.pm_schedule import get_initial_workflow_state
+from asset_lite.ppm_template import (
+    CHECKLIST_ROW_FIELDS,
+    DEFAULT_PPM_TEMPLATE,
+    UNCHECKED_CODE,
+    build_checklist_rows,
+    get_ppm_templates,
+    get_template,
+    get_template_items,
+)
+
+# PPMs named, inserted and committed together
+PPM_GENERATION_CHUNK_SIZE = 500
+
+# Maintenance logs of these statuses get a PPM
+PPM_LOG_STATUSES = ("Planned", "Overdue", "Completed")
+
+# A run holds the lock of its month until it ends, at most as long as a bulk job may run
+PPM_GENERATION_LOCK_TTL = 4 * 60 * 60
+
+PPM_FIELDS = ["name", "creation", "modified", "owner", "modified_by", "docstatus", "month", "year",
+    "asset_maintenance_log", "data", "asset", "asset_name", "checklist_results"]
+
+
+def get_month_number(month):
+    """1-12 from a month number or a PPM month name"""
+    month = str(month).strip()
+    if month.isdigit():
+        number = cint(month)
+    else:
+        number = next((i for i, name in enumerate(calendar.month_name) if name and name.lower() == month.lower()), 0)
+    if not 1 <= number <= 12:
+        frappe.throw(_("Invalid month: {0}").format(month))
+    return number
+
+
+def get_generation_lock_key(month, year):
+    # Per month, not per hospital: a run for every hospital covers each single one
+    return frappe.cache().make_key(f"asset_lite:ppm_generation:{cint(year)}-{get_month_number(month):02d}")
+
+
+def acquire_generation_lock(month, year):
+    """Claim a month for one generation run; False while another run holds it"""
+    return bool(frappe.cache().set(get_generation_lock_key(month, year), 1, nx=True, ex=PPM_GENERATION_LOCK_TTL))
+
+
+def release_generation_lock(month, year):
+    frappe.cache().delete(get_generation_lock_key(month, year))
+
+
+def get_pending_logs(month, year, hospital=None):
+    """
+    Maintenance logs due in the month that have no PPM yet, in one query
+
+    Returns:
+        Rows with name, asset, asset_name, custom_asset_type and custom_template
+    """
+    first_day = get_first_day(getdate(f"{cint(year)}-{get_month_number(month):02d}-01"))
+    conditions = " AND log.custom_hospital_name = %(hospital)s" if hospital else ""
+    return frappe.db.sql(f"""
+        SELECT log.name, log.asset_name AS asset, log.custom_asset_names AS asset_name,
+            log.custom_asset_type, log.custom_template
+        FROM `tabAsset Maintenance Log` log
+        WHERE log.due_date BETWEEN %(from_date)s AND %(to_date)s
+            AND log.maintenance_status IN %(statuses)s
+            AND log.docstatus < 2
+            {conditions}
+            AND NOT EXISTS (
+                SELECT 1 FROM `tabPPM` ppm
+                WHERE ppm.asset_maintenance_log = log.name AND ppm.docstatus < 2
+            )
+        ORDER BY log.due_date, log.name
+    """, {
+        "from_date": first_day,
+        "to_date": get_last_day(first_day),
+        "statuses": PPM_LOG_STATUSES,
+        "hospital": hospital,
+    }, as_dict=True)
+
+
+def insert_ppms(logs, month_name, year, templates):
+    """
+    Bulk insert one draft PPM per maintenance log, with the checklist of its
+    template, and return their names
+
+    Names follow the PPM naming rule; the documents and their checklist rows
+    are each written with one bulk insert. Controllers and server scripts do
+    not run for them.
+    """
+    now = now_datetime()
+    user = frappe.session.user
+    workflow_state = get_initial_workflow_state("PPM")
+    fields = PPM_FIELDS + (["workflow_state"] if workflow_state else [])
+
+    ppm_rows, checklists = [], []
+    for log in logs:
+        # The log's template, else its asset type's
+        template = log.custom_template or get_template(log.custom_asset_type, templates)[0] or DEFAULT_PPM_TEMPLATE
+        items = get_template_items(template, templates)
+
+        doc = frappe.new_doc("PPM")
+        doc.data = template
+        set_new_name(doc)
+
+        ppm_rows.append([
+            doc.name, now, now, user, user, 0, month_name, str(cint(year)), log.name, template, log.asset,
+            log.asset_name, UNCHECKED_CODE * len(items),
+        ] + ([workflow_state] if workflow_state else []))
+        checklists.append((doc.name, items))
+
+    frappe.db.bulk_insert("PPM", fields, ppm_rows, chunk_size=5000)
+    frappe.db.bulk_insert(
+        "PPM Table", CHECKLIST_ROW_FIELDS, build_checklist_rows("PPM", checklists, now, user), chunk_size=10000
+    )
+    return [row[0] for row in ppm_rows]
+
+
+def generate_monthly_ppms(month, year, hospital=None, job_id=None, chunk_size=PPM_GENERATION_CHUNK_SIZE):
+    """
+    Create the missing PPM of every maintenance log due in a month
+
+    The logs without a PPM are read with one query; per chunk, the PPMs are
+    named, pre-filled from the cached templates, bulk inserted and committed.
+    Running it again only creates what is still missing. The check for missing
+    PPMs is not locked: overlapping runs of a month are kept apart by the lock
+    ppm_api.generate_monthly_ppms takes before queueing.
+
+    Args:
+        month: Month number or name
+        year: Year
+        hospital: Optional company of the logs
+        job_id: Optional bulk job id whose progress is updated per chunk
+
+    Returns:
+        {"logs": int, "created": int, "ppms": [{"ppm", "asset_maintenance_log", "asset"}]}
+    """
+    month_name = calendar.month_name[get_month_number(month)]
+    logs = get_pending_logs(month, year, hospital)
+    templates = get_ppm_templates()
+    if job_id:
+        set_job_progress(job_id, total=len(logs))
+
+    ppms = []
+    for offset in range(0, len(logs), chunk_size):
+        chunk = logs[offset:offset + chunk_size]
+        names = insert_ppms(chunk, month_name, year, templates)
+        frappe.db.commit()
+
+        ppms += [
+            {"ppm": name, "asset_maintenance_log": log.name, "asset": log.asset} for name, log in zip(names, chunk)
+        ]
+        if job_id:
+            set_job_progress(job_id, processed=offset + len(chunk), created=len(ppms))
+
+    return {"logs": len(logs), "created": len(ppms), "ppms": ppms}
+
+
+def run_monthly_ppm_generation(bulk_job_id, month, year, hospital=None):
+    """Background job entry point for ppm_api.generate_monthly_ppms; releases the month's lock when done"""
+    set_job_progress(bulk_job_id, status="Running")
+    try:
+        result = generate_monthly_ppms(month, year, hospital, job_id=bulk_job_id)
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), 'Monthly PPM Generation Error')
+        set_job_progress(bulk_job_id, status="Failed", error=str(e))
+        return
+    finally:
+        release_generation_lock(month, year)
+
+    set_job_progress(bulk_job_id, status="Completed", **result)
@@ -0,0 +1,196 @@
+from collections import defaultdict
+
+import frappe
+from frappe.utils import now_datetime
+
+PPM_TEMPLATE_CACHE_KEY = "asset_lite:ppm_templates"
+PPM_TEMPLATE_VERSION_KEY = "asset_lite:ppm_templates_version"
+PPM_TEMPLATE_CACHE_TTL = 24 * 60 * 60
+
+# Templates of each site held by this process, with the version they were read at
+_local_templates = {}
+
+# Checklist used when an asset type has no template, as the "PPM Update" server script did
+DEFAULT_PPM_TEMPLATE = "CT Scan"
+
+# Doctypes whose checklist is copied from a PPM Templates row:
+# doctype -> (template link field, checklist table field, checklist row doctype)
+CHECKLIST_DOCTYPES = {
+    "PPM": ("data", "table", "PPM Table"),
+    "PPM OF CT SCAN MACHINE": ("data", "table", "PPM Table For CT Scan Machine"),
+    "PPM OF MRI SCAN MACHINE": ("date", "table_5", "PPM table for MRI"),
+    "Asset Maintenance Log": ("custom_template", "custom_table", "PPM Table"),
+}
+
+CHECKLIST_ROW_FIELDS = ["creation", "modified", "owner", "modified_by", "docstatus", "parent", "parenttype",
+    "parentfield", "idx", "maintenance_name"]
+
+# One character per checklist row; the worst checked result wins
+CHECKLIST_RESULT_CODES = [("not_working", "N"), ("defect_found", "D"), ("working", "W")]
+UNCHECKED_CODE = "-"
+
+
+def load_ppm_templates():
+    """
+    Every PPM template, parsed: two queries
+
+    Returns:
+        {"items": {template: (maintenance_name, ...)}, "asset_types": {asset_type: template}}
+    """
+    items = defaultdict(list)
+    for row in frappe.get_all(
+        "PPM Table",
+        filters={"parenttype": "PPM Templates"},
+        fields=["parent", "maintenance_name"],
+        order_by="parent asc, idx asc",
+    ):
+        items[row.parent].append(row.maintenance_name)
+
+    asset_types = {}
+    for row in frappe.get_all("PPM Templates", fields=["name", "asset_type"], order_by="name asc"):
+        if row.asset_type:
+            asset_types.setdefault(row.asset_type, row.name)
+
+    return {"items": {name: tuple(rows) for name, rows in items.items()}, "asset_types": asset_types}
+
+
+def get_ppm_templates():
+    """
+    The parsed templates, loaded only when one changed
+
+    Shared through Redis and kept in process with the version they were
+    read at, like the coverage index, so expanding hundreds of checklists
+    costs one small Redis read per call.
+    """
+    version = frappe.cache().get_value(PPM_TEMPLATE_VERSION_KEY)
+    local = _local_templates.get(frappe.local.site)
+    if version and local and local[0] == version:
+        return local[1]
+
+    templates = frappe.cache().get_value(PPM_TEMPLATE_CACHE_KEY) if version else None
+    if templates is None:
+        templates = load_ppm_templates()
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(PPM_TEMPLATE_CACHE_KEY, templates, expires_in_sec=PPM_TEMPLATE_CACHE_TTL)
+        frappe.cache().set_value(PPM_TEMPLATE_VERSION_KEY, version, expires_in_sec=PPM_TEMPLATE_CACHE_TTL)
+
+    _local_templates[frappe.local.site] = (version, templates)
+    return templates
+
+
+def delete_ppm_template_cache():
+    frappe.cache().delete_value(PPM_TEMPLATE_VERSION_KEY)
+    frappe.cache().delete_value(PPM_TEMPLATE_CACHE_KEY)
+
+
+def clear_ppm_template_cache(doc=None, method=None):
+    """
+    Document event of PPM Templates: templates are reloaded on next use, once
+    the change is committed and a reload can see it
+    """
+    frappe.db.after_commit.add(delete_ppm_template_cache)
+
+
+def get_template(asset_type, templates=None):
+    """
+    Template of an asset type and its checklist
+
+    Args:
+        templates: get_ppm_templates(), when looking up many asset types
+
+    Returns:
+        (template, items): template is None when the asset type has none, the
+        items are then the default template's
+    """
+    templates = templates or get_ppm_templates()
+    template = templates["asset_types"].get(asset_type) if asset_type else None
+    return template, templates["items"].get(template or DEFAULT_PPM_TEMPLATE, ())
+
+
+def get_template_items(template, templates=None):
+    return (templates or get_ppm_templates())["items"].get(template or DEFAULT_PPM_TEMPLATE, ())
+
+
+def build_checklist_rows(parenttype, parents, now=None, user=None):
+    """
+    Checklist rows of many documents for one bulk insert
+
+    Args:
+        parenttype: A CHECKLIST_DOCTYPES doctype
+        parents: (parent name, items) pairs
+
+    Returns:
+        Tuples in CHECKLIST_ROW_FIELDS order
+    """
+    now = now or now_datetime()
+    user = user or frappe.session.user
+    parentfield = CHECKLIST_DOCTYPES[parenttype][1]
+    return [
+        (now, now, user, user, 0, parent, parenttype, parentfield, idx, item)
+        for parent, items in parents
+        for idx, item in enumerate(items, 1)
+    ]
+
+
+def insert_checklists(parenttype, parents, chunk_size=10000):
+    """
+    Expand templates into the checklists of existing documents with one bulk
+    insert, instead of loading the template and inserting rows per document
+
+    Args:
+        parenttype: A CHECKLIST_DOCTYPES doctype
+        parents: (parent name, template) pairs; template None for the default
+
+    Returns:
+        Number of rows inserted
+    """
+    templates = get_ppm_templates()
+    rows = build_checklist_rows(
+        parenttype, [(parent, get_template_items(template, templates)) for parent, template in parents]
+    )
+    frappe.db.bulk_insert(CHECKLIST_DOCTYPES[parenttype][2], CHECKLIST_ROW_FIELDS, rows, chunk_size=chunk_size)
+    return len(rows)
+
+
+def fill_checklist(doc):
+    """Copy the template's checklist into a document whose checklist is empty"""
+    link_field, table_field, _row_doctype = CHECKLIST_DOCTYPES[doc.doctype]
+    if not doc.get(table_field):
+        doc.set(table_field, [{"maintenance_name": item} for item in get_template_items(doc.get(link_field))])
+
+
+def set_log_checklist(doc, method=None):
+    """
+    Before insert of Asset Maintenance Log: pick the template of the asset
+    type and copy its checklist into a planned log, replacing the
+    "PPM Update" server script
+    """
+    if doc.maintenance_status != "Planned" or not doc.custom_asset_type or doc.custom_table:
+        return
+
+    template, items = get_template(doc.custom_asset_type)
+    if template:
+        doc.custom_template = template
+    doc.set("custom_table", [{"maintenance_name": item} for item in items])
+
+
+def encode_results(rows):
+    """
+    Checklist results as one character per row: N not working, D defect
+    found, W working, - unchecked; e.g. "WWDW-N"
+    """
+    return "".join(
+        next((code for fieldname, code in CHECKLIST_RESULT_CODES if row.get(fieldname)), UNCHECKED_CODE)
+        for row in rows
+    )
+
+
+def decode_results(results, items):
+    """Checklist rows back from encode_results and the template items"""
+    rows = []
+    for item, code in zip(items, results or ""):
+        row = {"maintenance_name": item}
+        for fieldname, field_code in CHECKLIST_RESULT_CODES:
+            row[fieldname] = int(code == field_code)
+        rows.append(row)
+    return rows
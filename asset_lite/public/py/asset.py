@@ -112,6 +112,25 @@ def generate_asset_qr(doc, method):
     if not docname:
         frappe.throw("Document name is required.")
 
+    # Bulk imports generate QR codes in a background job after each chunk
+    if doc.flags.defer_qr_code:
+        return
+
+    make_asset_qr(docname)
+
+
+def generate_asset_qr_codes(assets):
+    """Background job: attach QR codes to assets inserted with defer_qr_code"""
+    for docname in assets:
+        try:
+            make_asset_qr(docname)
+        except Exception:
+            # The rollback also discards make_asset_qr's error log, so log again after it
+            frappe.db.rollback()
+            frappe.log_error(frappe.get_traceback(), 'QR Code Error')
+
+
+def make_asset_qr(docname):
     # Check if a file is already attached
     existing_file = frappe.db.exists(
         "File",
@@ -0,0 +1,154 @@
+import frappe
+from frappe.utils import flt, now_datetime
+
+# Work order statuses that mark the end of a repair
+CLOSED_REPAIR_STATUSES = ("Completed", "Closed")
+
+
+def get_failure_history_metrics(assets=None):
+    """
+    Aggregate failure and repair time per asset from Work_Order history
+
+    Each work order with a failure_date is one failure event. The uptime before a
+    failure runs from the completion of the previous repair (LAG over the asset's
+    failures) or, for the first failure, from the asset's available_for_use_date.
+
+    Args:
+        assets: Optional list of Asset names to restrict the computation to
+
+    Returns:
+        List of dicts with failures, repairs, uptime_hours, repair_hours and
+        trailing_uptime_hours per asset
+    """
+    conditions = ""
+    values = {"now": now_datetime()}
+    if assets:
+        conditions = " AND wo.asset IN %(assets)s"
+        values["assets"] = tuple(assets)
+
+    return frappe.db.sql(f"""
+        SELECT
+            f.asset,
+            MAX(f.asset_name) AS asset_name,
+            MAX(f.company) AS company,
+            COUNT(*) AS failures,
+            SUM(f.completion_date IS NOT NULL) AS repairs,
+            MAX(f.failure_date) AS last_failure_date,
+            MAX(f.completion_date) AS last_completion_date,
+            SUM(GREATEST(COALESCE(TIMESTAMPDIFF(SECOND, f.uptime_start, f.failure_date), 0), 0)) / 3600
+                AS uptime_hours,
+            SUM(GREATEST(COALESCE(TIMESTAMPDIFF(SECOND, f.failure_date, f.completion_date), 0), 0)) / 3600
+                AS repair_hours,
+            IF(SUM(f.completion_date IS NULL) = 0,
+                GREATEST(TIMESTAMPDIFF(SECOND, MAX(f.completion_date), %(now)s), 0) / 3600,
+                0) AS trailing_uptime_hours
+        FROM (
+            SELECT
+                wo.asset,
+                asset.asset_name,
+                asset.company,
+                wo.failure_date,
+                wo.completion_date,
+                IF(ROW_NUMBER() OVER (PARTITION BY wo.asset ORDER BY wo.failure_date) = 1,
+                    asset.available_for_use_date,
+                    LAG(wo.completion_date) OVER (PARTITION BY wo.asset ORDER BY wo.failure_date)
+                ) AS uptime_start
+            FROM `tabWork_Order` wo
+            JOIN `tabAsset` asset ON asset.name = wo.asset
+            WHERE wo.failure_date IS NOT NULL
+                AND wo.docstatus < 2
+                AND wo.repair_status != 'Cancelled'
+                {conditions}
+        ) f
+        GROUP BY f.asset
+    """, values, as_dict=True)
+
+
+def compute_reliability(row):
+    """
+    Turn aggregated failure history into MTBF, MTTR and availability
+
+    Args:
+        row: One row from get_failure_history_metrics
+
+    Returns:
+        Dictionary with the Asset Reliability field values
+    """
+    failures = int(row.get("failures") or 0)
+    repairs = int(row.get("repairs") or 0)
+    operating_hours = flt(row.get("uptime_hours")) + flt(row.get("trailing_uptime_hours"))
+    repair_hours = flt(row.get("repair_hours"))
+    total_hours = operating_hours + repair_hours
+
+    return {
+        "asset_name": row.get("asset_name"),
+        "company": row.get("company"),
+        "failures": failures,
+        "repairs": repairs,
+        "operating_hours": flt(operating_hours, 2),
+        "repair_hours": flt(repair_hours, 2),
+        "mtbf_hours": flt(operating_hours / failures, 2) if failures else 0,
+        "mttr_hours": flt(repair_hours / repairs, 2) if repairs else 0,
+        "availability": flt(operating_hours * 100 / total_hours, 2) if total_hours else 100,
+        "last_failure_date": row.get("last_failure_date"),
+        "last_completion_date": row.get("last_completion_date"),
+    }
+
+
+def update_asset_reliability(assets=None):
+    """
+    Recompute and store Asset Reliability for the given assets (all when omitted)
+
+    Run `bench execute asset_lite.reliability.update_asset_reliability` once to
+    backfill; afterwards rows are refreshed as work orders close.
+
+    Args:
+        assets: Optional list of Asset names
+    """
+    rows = get_failure_history_metrics(assets)
+    names = [row.asset for row in rows]
+    existing = set(frappe.get_all(
+        "Asset Reliability",
+        filters={"name": ["in", list(assets)]} if assets else None,
+        pluck="name"
+    ))
+
+    for row in rows:
+        values = compute_reliability(row)
+        if row.asset in existing:
+            frappe.db.set_value("Asset Reliability", row.asset, values)
+        else:
+            frappe.get_doc({
+                "doctype": "Asset Reliability",
+                "asset": row.asset,
+                **values
+            }).insert(ignore_permissions=True)
+
+    # Assets whose last failure was cancelled no longer have any history
+    stale = existing - set(names)
+    if stale:
+        frappe.db.delete("Asset Reliability", {"name": ["in", list(stale)]})
+
+
+def on_work_order_update(doc, method=None):
+    """Refresh the cached reliability of the asset when its work order closes or is cancelled"""
+    before = doc.get_doc_before_save()
+    assets = {doc.asset}
+    if before and before.asset != doc.asset:
+        assets.add(before.asset)
+    assets.discard(None)
+    if not assets:
+        return
+
+    changed = not before or any(
+        before.get(field) != doc.get(field)
+        for field in ("repair_status", "failure_date", "completion_date")
+    )
+    closed = doc.repair_status in CLOSED_REPAIR_STATUSES and changed
+    if closed or method == "on_cancel" or len(assets) > 1:
+        update_asset_reliability(list(assets))
+
+
+def delete_asset_reliability(doc, method=None):
+    """On trash of Asset or Company: drop its reliability rows, which no longer block the delete"""
+    frappe.db.delete("Asset Reliability", {"asset" if doc.doctype == "Asset" else "company": doc.name})
@@ -0,0 +1,241 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+import frappe
+from frappe.utils import add_months, flt, get_datetime, get_first_day, get_last_day, getdate, now_datetime
+
+from asset_lite.downtime import OPEN_REPAIR_STATUSES, merge_intervals
+from asset_lite.reliability import CLOSED_REPAIR_STATUSES
+
+# Ledger rows written per bulk insert
+LEDGER_CHUNK_SIZE = 1000
+
+
+def split_by_month(start, end):
+    """Yield (first day of month, hours) for the part of [start, end) in each month"""
+    while start < end:
+        month = start.date().replace(day=1)
+        month_end = datetime.combine(getdate(add_months(month, 1)), time.min)
+        piece_end = min(end, month_end)
+        yield month, (piece_end - start).total_seconds() / 3600
+        start = piece_end
+
+
+def compute_penalty_ledger(contracts, outages, from_date, to_date, now=None):
+    """
+    Monthly downtime and penalty per contract from work order outages
+
+    Per asset, outages are clipped to the contract term and the period and
+    merged, so overlapping work orders on one asset count their downtime once.
+    Merged downtime is split at month boundaries. Each asset may be down
+    max_downtime_hrs a month; the hours above that, summed over the assets
+    of the contract, times penalty_factor give the month's penalty.
+
+    Args:
+        contracts: Dicts with name, vendor, start_date, end_date, max_downtime_hrs,
+            penalty_factor and assets
+        outages: Asset -> list of (work_order, failure_date, completion_date);
+            an open outage (no completion_date) runs until now
+        from_date: First day of the period
+        to_date: Last day of the period
+
+    Returns:
+        Ledger rows: dicts with support_plan, vendor, month, assets, work_orders,
+        downtime_hours, allowed_downtime_hours, excess_downtime_hours,
+        penalty_factor and penalty; months without downtime are left out
+    """
+    now = get_datetime(now or now_datetime())
+    period_start = datetime.combine(getdate(from_date), time.min)
+    period_end = datetime.combine(getdate(to_date) + timedelta(days=1), time.min)
+    rows = []
+
+    for contract in contracts:
+        window_start = max(period_start, datetime.combine(getdate(contract["start_date"]), time.min))
+        window_end = min(period_end, datetime.combine(getdate(contract["end_date"]) + timedelta(days=1), time.min))
+        if window_start >= window_end:
+            continue
+
+        allowed = flt(contract.get("max_downtime_hrs"))
+        factor = flt(contract.get("penalty_factor"))
+        asset_hours = defaultdict(lambda: defaultdict(float))
+        work_orders = defaultdict(set)
+
+        for asset in contract["assets"]:
+            intervals = []
+            for work_order, failure_date, completion_date in outages.get(asset, ()):
+                start = max(get_datetime(failure_date), window_start)
+                end = min(get_datetime(completion_date) if completion_date else now, window_end)
+                if start < end:
+                    intervals.append((start, end))
+                    for month, _hours in split_by_month(start, end):
+                        work_orders[month].add(work_order)
+
+            for start, end in merge_intervals(intervals):
+                for month, hours in split_by_month(start, end):
+                    asset_hours[month][asset] += hours
+
+        for month in sorted(asset_hours):
+            hours = asset_hours[month]
+            excess = sum(max(value - allowed, 0) for value in hours.values())
+            rows.append({
+                "support_plan": contract["name"],
+                "vendor": contract.get("vendor"),
+                "month": month,
+                "assets": len(hours),
+                "work_orders": len(work_orders[month]),
+                "downtime_hours": flt(sum(hours.values()), 2),
+                "allowed_downtime_hours": allowed,
+                "excess_downtime_hours": flt(excess, 2),
+                "penalty_factor": factor,
+                "penalty": flt(excess * factor, 2),
+            })
+
+    return rows
+
+
+def get_penalty_contracts(plans=None):
+    """Service contract Support Plans with their term, SLA terms and covered assets"""
+    filters = {"service_contract": 1, "start_date": ["is", "set"], "end_date": ["is", "set"]}
+    if plans:
+        filters["name"] = ["in", list(plans)]
+
+    contracts = frappe.get_all(
+        "Support Plans",
+        filters=filters,
+        fields=["name", "vendor", "start_date", "end_date", "max_downtime_hrs", "penalty_factor", "asset"],
+    )
+    if not contracts:
+        return []
+
+    plan_assets = defaultdict(set)
+    for row in frappe.get_all(
+        "Support Asset List",
+        filters={"parenttype": "Support Plans", "parent": ["in", [contract.name for contract in contracts]]},
+        fields=["parent", "asset_id"],
+    ):
+        plan_assets[row.parent].add(row.asset_id)
+
+    for contract in contracts:
+        contract["assets"] = sorted(({contract.asset} | plan_assets[contract.name]) - {None, ""})
+    return contracts
+
+
+def group_outages(rows):
+    """
+    Work order rows as compute_penalty_ledger outages per asset
+
+    Only open work orders run until now: a closed work order without
+    completion date has no known end and is left out, as in the downtime buckets.
+    """
+    outages = defaultdict(list)
+    for row in rows:
+        if row.completion_date or row.repair_status in OPEN_REPAIR_STATUSES:
+            outages[row.asset].append((row.name, row.failure_date, row.completion_date))
+    return outages
+
+
+def get_outages(assets, from_date, to_date):
+    """Work order outages of the assets overlapping the period, in one query"""
+    if not assets:
+        return defaultdict(list)
+
+    return group_outages(frappe.db.sql("""
+        SELECT name, asset, failure_date, completion_date, repair_status
+        FROM `tabWork_Order`
+        WHERE asset IN %(assets)s
+            AND failure_date IS NOT NULL
+            AND failure_date < %(period_end)s
+            AND (completion_date IS NULL OR completion_date >= %(period_start)s)
+            AND docstatus < 2
+            AND repair_status != 'Cancelled'
+    """, {
+        "assets": tuple(assets),
+        "period_start": getdate(from_date),
+        "period_end": getdate(to_date) + timedelta(days=1),
+    }, as_dict=True))
+
+
+def refresh_penalty_ledger(plans=None, from_date=None, to_date=None):
+    """
+    Recompute the Vendor Penalty Ledger of the given plans (all when omitted)
+    for the months of a period, default the last twelve
+
+    Run `bench execute asset_lite.sla_penalty.refresh_penalty_ledger` once to
+    backfill; afterwards months are refreshed as work orders close.
+
+    Returns:
+        Number of ledger rows written
+    """
+    # Whole months only: each ledger row is replaced, not patched
+    to_date = get_last_day(getdate(to_date))
+    from_date = get_first_day(from_date or add_months(to_date, -11))
+    contracts = get_penalty_contracts(plans)
+    outages = get_outages({asset for contract in contracts for asset in contract["assets"]}, from_date, to_date)
+    rows = compute_penalty_ledger(contracts, outages, from_date, to_date)
+
+    delete_filters = {"month": ["between", [from_date, to_date]]}
+    if plans:
+        delete_filters["support_plan"] = ["in", list(plans)]
+    frappe.db.delete("Vendor Penalty Ledger", delete_filters)
+
+    now = now_datetime()
+    fields = ["name", "creation", "modified", "owner", "modified_by", "vendor", "support_plan", "month", "assets",
+        "work_orders", "downtime_hours", "allowed_downtime_hours", "excess_downtime_hours", "penalty_factor", "penalty"]
+    frappe.db.bulk_insert("Vendor Penalty Ledger", fields, [
+        (frappe.generate_hash(length=10), now, now, "Administrator", "Administrator", row["vendor"],
+            row["support_plan"], row["month"], row["assets"], row["work_orders"], row["downtime_hours"],
+            row["allowed_downtime_hours"], row["excess_downtime_hours"], row["penalty_factor"], row["penalty"])
+        for row in rows
+    ], chunk_size=LEDGER_CHUNK_SIZE)
+    return len(rows)
+
+
+def refresh_open_penalty_months():
+    """Scheduled job: refresh last and this month, where open outages keep growing"""
+    today = getdate()
+    refresh_penalty_ledger(from_date=add_months(today, -1), to_date=today)
+
+
+def get_asset_plans(assets):
+    """Service contract Support Plans covering any of the assets"""
+    assets = list(assets)
+    return set(frappe.get_all(
+        "Support Plans", filters={"asset": ["in", assets], "service_contract": 1}, pluck="name"
+    )) | set(frappe.get_all(
+        "Support Asset List", filters={"asset_id": ["in", assets], "parenttype": "Support Plans"}, pluck="parent"
+    ))
+
+
+def on_work_order_update(doc, method=None):
+    """Refresh the penalty months an outage touches when its work order closes or is cancelled"""
+    before = doc.get_doc_before_save()
+    changed = not before or any(
+        before.get(field) != doc.get(field) for field in ("repair_status", "failure_date", "completion_date", "asset")
+    )
+    closed = doc.repair_status in (*CLOSED_REPAIR_STATUSES, "Cancelled") and changed
+    if not (closed or method == "on_cancel") or not doc.failure_date:
+        return
+
+    assets = {doc.asset, before.asset if before else None} - {None, ""}
+    plans = assets and get_asset_plans(assets)
+    if not plans:
+        return
+
+    dates = [getdate(doc.failure_date), getdate(doc.completion_date or now_datetime())]
+    if before:
+        dates += [getdate(value) for value in (before.failure_date, before.completion_date) if value]
+    refresh_penalty_ledger(plans, min(dates), max(dates))
+
+
+def on_support_plan_update(doc, method=None):
+    """Refresh a contract's ledger when its term or SLA terms change"""
+    before = doc.get_doc_before_save()
+    fields = ("service_contract", "start_date", "end_date", "vendor", "max_downtime_hrs", "penalty_factor")
+    if before and not any(before.get(field) != doc.get(field) for field in fields):
+        return
+    refresh_penalty_ledger([doc.name])
+
+
+def delete_penalty_ledger(doc, method=None):
+    """On trash of Support Plans or Supplier: drop its ledger rows, which no longer block the delete"""
+    frappe.db.delete("Vendor Penalty Ledger", {"support_plan" if doc.doctype == "Support Plans" else "vendor": doc.name})
@@ -1,33 +1,125 @@
+import ast
+import hashlib
 import re
+from collections import namedtuple
 
 import frappe
 from frappe import _
 from frappe.model.document import Document
 
 from erpnext.buying.doctype.supplier_scorecard_criteria.supplier_scorecard_criteria import SupplierScorecardCriteria
+from erpnext.buying.doctype.supplier_scorecard_period.supplier_scorecard_period import SupplierScorecardPeriod
+
+PLACEHOLDER_REGEX = re.compile(r"\{(.*?)\}", re.MULTILINE | re.DOTALL)
+
+# Names a compiled formula may reference besides its placeholder values: the
+# builtins frappe.safe_eval whitelists, plus what ERPNext passes to it
+FORMULA_GLOBALS = {
+    "int": int,
+    "float": float,
+    "long": int,
+    "round": round,
+    "max": max,
+    "min": min,
+    "safe_div": lambda x, y: x / y if y != 0 else 0,  # Safe division logic
+}
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Constant, ast.Subscript, ast.Load, ast.Tuple,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+
+CompiledFormula = namedtuple("CompiledFormula", ["code", "params"])
+
+# Compiled formulas keyed by the sha1 of the formula text
+_compiled_formulas = {}
+MAX_COMPILED_FORMULAS = 1024
+
+
+def compile_formula(formula):
+    """
+    Compile a scorecard formula once, replacing each {placeholder} with an index
+    into the value tuple passed at evaluation time
+
+    Args:
+        formula: Criteria formula text
+
+    Returns:
+        CompiledFormula with the code object and the placeholder names by index
+    """
+    key = hashlib.sha1(formula.encode()).hexdigest()
+    compiled = _compiled_formulas.get(key)
+    if compiled:
+        return compiled
+
+    params = []
+
+    def to_index(match):
+        if match.group(1) not in params:
+            params.append(match.group(1))
+        return f"_v[{params.index(match.group(1))}]"
+
+    expression = PLACEHOLDER_REGEX.sub(to_index, formula.replace("\r", "").replace("\n", ""))
+    tree = ast.parse(expression.strip(), mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise SyntaxError(_("{0} is not allowed in a scorecard formula").format(type(node).__name__))
+        if isinstance(node, ast.Name) and node.id != "_v" and node.id not in FORMULA_GLOBALS:
+            raise NameError(_("Unknown name {0} in scorecard formula").format(node.id))
+
+    compiled = CompiledFormula(compile(tree, "<scorecard formula>", "eval"), tuple(params))
+    if len(_compiled_formulas) >= MAX_COMPILED_FORMULAS:
+        _compiled_formulas.clear()
+    _compiled_formulas[key] = compiled
+    return compiled
+
+
+def evaluate_formula(formula, values):
+    """
+    Evaluate a scorecard formula through its cached compiled form
+
+    Values are rounded to two decimals and empty ones count as 0, exactly as
+    ERPNext substitutes them into the formula text. A placeholder without any
+    value raises, as ERPNext leaves it in the text where it fails to evaluate.
+
+    Args:
+        formula: Criteria formula text
+        values: Dictionary of placeholder name -> value
+    """
+    compiled = compile_formula(formula)
+    missing = [param for param in compiled.params if param not in values]
+    if missing:
+        raise NameError(_("Unknown variable {0} in scorecard formula").format(", ".join(missing)))
+
+    args = tuple(
+        float(f"{values[param]:.2f}") if values.get(param) else 0.0
+        for param in compiled.params
+    )
+    return eval(compiled.code, {"__builtins__": {}, "_v": args, **FORMULA_GLOBALS})
+
 
 class CustomSupplierScorecardCriteria(SupplierScorecardCriteria):
     def validate_formula(self):
         # Evaluate the formula with 0's to ensure it is valid
-        test_formula = self.formula.replace("\r", "").replace("\n", "")
-
-        # Find and replace all placeholders with 0
-        regex = r"\{(.*?)\}"
-        mylist = re.finditer(regex, test_formula, re.MULTILINE | re.DOTALL)
-        for match in mylist:
-            test_formula = test_formula.replace("{" + match.group(1) + "}", "0")
-
         try:
-            # Use safe_eval with a custom safe division function
-            frappe.safe_eval(
-                test_formula,
-                None,
-                {
-                    "max": max,
-                    "min": min,
-                    "safe_div": lambda x, y: x / y if y != 0 else 0,  # Safe division logic
-                },
-            )
+            evaluate_formula(self.formula, dict.fromkeys(compile_formula(self.formula).params, 0))
         except Exception as e:
             # Throw an error if formula evaluation fails
-            frappe.throw(_("Error evaluating the criteria formula: {0}").format(str(e)))
\ No newline at end of file
+            frappe.throw(_("Error evaluating the criteria formula: {0}").format(str(e)))
+
+
+class CustomSupplierScorecardPeriod(SupplierScorecardPeriod):
+    def calculate_criteria(self):
+        values = {var.param_name: var.value for var in self.variables}
+        for crit in self.criteria:
+            try:
+                crit.score = min(crit.max_score, max(0, evaluate_formula(crit.formula, values)))
+            except Exception:
+                frappe.throw(
+                    _("Could not solve criteria score function for {0}. Make sure the formula is valid.").format(
+                        crit.criteria_name
+                    ),
+                    frappe.ValidationError,
+                )
+
@@ -0,0 +1,154 @@
+import frappe
+from frappe.utils import flt, now
+from frappe.utils.caching import request_cache
+
+METRIC_FIELDS = [
+    "work_orders",
+    "repair_hours",
+    "avg_response_hours",
+    "total_assets",
+    "hours_per_asset",
+    "total_hours",
+    "downtime_hours",
+    "downtime_percentage",
+    "pm_due",
+    "pm_completed",
+    "pm_compliance",
+]
+
+
+def fetch_supplier_metric_rows():
+    """
+    Collect the raw per-supplier aggregates in a single round trip
+
+    Work orders, assets and maintenance logs are grouped by vendor in one
+    UNION ALL statement; every row carries its source and four generic values.
+
+    Returns:
+        List of dicts with supplier, source, v1, v2, v3, v4
+    """
+    return frappe.db.sql("""
+        SELECT wo.vendor AS supplier, 'wo' AS source,
+            COUNT(*) AS v1,
+            COALESCE(SUM(wo.total_hours_spent), 0) AS v2,
+            COALESCE(SUM(TIMESTAMPDIFF(SECOND, wo.failure_date, wo.first_responded_on)), 0) AS v3,
+            COUNT(wo.first_responded_on) AS v4
+        FROM `tabWork_Order` wo
+        WHERE wo.vendor IS NOT NULL AND wo.vendor != '' AND wo.docstatus = 1
+        GROUP BY wo.vendor
+
+        UNION ALL
+
+        SELECT asset.custom_vendor, 'asset',
+            COUNT(*),
+            COALESCE(SUM(asset.custom_total_hours), 0),
+            COALESCE(SUM(asset.custom_down_time), 0),
+            0
+        FROM `tabAsset` asset
+        WHERE asset.custom_vendor IS NOT NULL AND asset.custom_vendor != '' AND asset.docstatus = 1
+        GROUP BY asset.custom_vendor
+
+        UNION ALL
+
+        SELECT asset.custom_vendor, 'pm',
+            COUNT(*),
+            SUM(aml.maintenance_status = 'Completed' AND aml.completion_date <= aml.due_date),
+            0,
+            0
+        FROM `tabAsset Maintenance Log` aml
+        JOIN `tabAsset` asset ON aml.asset_maintenance = asset.name
+        WHERE asset.custom_vendor IS NOT NULL AND asset.custom_vendor != ''
+            AND aml.due_date <= CURDATE()
+        GROUP BY asset.custom_vendor
+    """, as_dict=True)
+
+
+def build_supplier_metrics(rows):
+    """
+    Merge raw aggregate rows into one metrics dict per supplier
+
+    Args:
+        rows: Rows as returned by fetch_supplier_metric_rows
+
+    Returns:
+        Dictionary of supplier -> metric values (see METRIC_FIELDS)
+    """
+    metrics = {}
+    for row in rows:
+        entry = metrics.get(row["supplier"])
+        if entry is None:
+            entry = metrics[row["supplier"]] = dict.fromkeys(METRIC_FIELDS, 0)
+
+        if row["source"] == "wo":
+            entry["work_orders"] = int(row["v1"])
+            entry["repair_hours"] = flt(row["v2"], 2)
+            entry["avg_response_hours"] = flt(flt(row["v3"]) / 3600 / row["v4"], 2) if row["v4"] else 0
+        elif row["source"] == "asset":
+            entry["total_assets"] = int(row["v1"])
+            entry["total_hours"] = flt(row["v2"], 2)
+            entry["downtime_hours"] = flt(row["v3"], 2)
+        elif row["source"] == "pm":
+            entry["pm_due"] = int(row["v1"])
+            entry["pm_completed"] = int(row["v2"] or 0)
+
+    for entry in metrics.values():
+        if entry["total_assets"]:
+            entry["hours_per_asset"] = flt(entry["repair_hours"] / entry["total_assets"], 2)
+        if entry["total_hours"]:
+            entry["downtime_percentage"] = flt(entry["downtime_hours"] * 100 / entry["total_hours"], 2)
+        if entry["pm_due"]:
+            entry["pm_compliance"] = flt(entry["pm_completed"] * 100 / entry["pm_due"], 2)
+
+    return metrics
+
+
+def refresh_supplier_scorecard_metrics():
+    """Recompute the Supplier Scorecard Metrics table (scheduled daily)"""
+    metrics = build_supplier_metrics(fetch_supplier_metric_rows())
+
+    timestamp = now()
+    fields = ["name", "creation", "modified", "owner", "modified_by", "supplier", "refreshed_on"] + METRIC_FIELDS
+    values = [
+        (supplier, timestamp, timestamp, "Administrator", "Administrator", supplier, timestamp)
+        + tuple(entry[field] for field in METRIC_FIELDS)
+        for supplier, entry in metrics.items()
+    ]
+
+    frappe.db.delete("Supplier Scorecard Metrics")
+    frappe.db.bulk_insert("Supplier Scorecard Metrics", fields, values)
+    frappe.db.commit()
+
+
+@request_cache
+def get_supplier_metrics(supplier):
+    """Cached metrics for one supplier, empty when the supplier has none"""
+    return frappe.db.get_value(
+        "Supplier Scorecard Metrics", supplier, METRIC_FIELDS, as_dict=True
+    ) or frappe._dict(dict.fromkeys(METRIC_FIELDS, 0))
+
+
+# Supplier Scorecard Variable paths, e.g. "asset_lite.supplier_scorecard.get_repair_hours".
+# ERPNext passes the Supplier Scorecard Period; the cached figures are lifetime totals.
+
+def get_repair_hours(scorecard):
+    return get_supplier_metrics(scorecard.supplier).repair_hours
+
+
+def get_total_assets(scorecard):
+    return get_supplier_metrics(scorecard.supplier).total_assets
+
+
+def get_hours_per_asset(scorecard):
+    return get_supplier_metrics(scorecard.supplier).hours_per_asset
+
+
+def get_downtime_percentage(scorecard):
+    return get_supplier_metrics(scorecard.supplier).downtime_percentage
+
+
+def get_avg_response_hours(scorecard):
+    return get_supplier_metrics(scorecard.supplier).avg_response_hours
+
+
+def get_pm_compliance(scorecard):
+    return get_supplier_metrics(scorecard.supplier).pm_compliance
@@ -0,0 +1,142 @@
+"""
+Recompute the Preventive Maintenance Compliance (PMC) report from the Parquet
+snapshots written by asset_lite.parquet_export, without touching MariaDB
+
+    python -m asset_lite.verify_pmc_parquet sites/<site>/private/analytics --periodicity Quarterly
+
+Inside bench, compare the result with the live report:
+
+    bench --site <site> execute asset_lite.verify_pmc_parquet.compare_with_report
+"""
+
+import argparse
+import os
+from collections import Counter
+
+PERIOD_FORMATS = {
+    "Monthly": lambda d: d.strftime("%m-%Y"),
+    "Quarterly": lambda d: f"{d.year} Q{(d.month - 1) // 3 + 1}",
+    "Half-Yearly": lambda d: f"{d.year} H{1 if d.month <= 6 else 2}",
+    "Yearly": lambda d: str(d.year),
+}
+
+# Report filter -> Asset column, as in the report's asset_conditions
+ASSET_FILTERS = {"department": "department", "vendor": "custom_vendor", "asset_class": "custom_class"}
+
+
+def read_latest_rows(export_dir, doctype, columns):
+    """
+    Current version of every row of a dataset: the highest modified per name,
+    minus the names recorded in the _deleted dataset
+    """
+    import pyarrow.dataset as ds
+
+    # Same directory name as frappe.scrub(doctype)
+    path = os.path.join(export_dir, doctype.replace(" ", "_").replace("-", "_").lower())
+    if not os.path.isdir(path):
+        return []
+
+    latest = {}
+    table = ds.dataset(path, format="parquet", partitioning="hive").to_table(columns=[*columns, "modified"])
+    for row in table.to_pylist():
+        if row["name"] not in latest or row["modified"] > latest[row["name"]]["modified"]:
+            latest[row["name"]] = row
+
+    deleted_path = os.path.join(export_dir, "_deleted")
+    if os.path.isdir(deleted_path):
+        for row in ds.dataset(deleted_path, format="parquet").to_table().to_pylist():
+            if row["deleted_doctype"] == doctype:
+                latest.pop(row["deleted_name"], None)
+
+    return list(latest.values())
+
+
+def compute_pmc(export_dir, periodicity="Monthly", filters=None):
+    """
+    Same rows as the PMC report's execute(): per period, the number of
+    maintenance logs and of logs completed on or before their due date
+
+    Returns:
+        Dictionary of period -> {"total_logs", "completed_logs", "percentage"}
+    """
+    filters = filters or {}
+    period_of = PERIOD_FORMATS.get(periodicity, PERIOD_FORMATS["Monthly"])
+
+    assets = {
+        row["name"]: row
+        for row in read_latest_rows(export_dir, "Asset", ["name", *ASSET_FILTERS.values()])
+        if all(row.get(column) == filters[key] for key, column in ASSET_FILTERS.items() if filters.get(key))
+    }
+    logs = read_latest_rows(
+        export_dir, "Asset Maintenance Log",
+        ["name", "asset_maintenance", "maintenance_status", "due_date", "completion_date"]
+    )
+
+    totals, completed = Counter(), Counter()
+    for log in logs:
+        if log["asset_maintenance"] not in assets:
+            continue
+        period = period_of(log["due_date"]) if log["due_date"] else None
+        totals[period] += 1
+        if (
+            log["maintenance_status"] == "Completed"
+            and log["completion_date"] and log["due_date"]
+            and log["completion_date"] <= log["due_date"]
+        ):
+            completed[period] += 1
+
+    return {
+        period: {
+            "total_logs": total,
+            "completed_logs": completed[period],
+            "percentage": completed[period] / total * 100 if total else 0,
+        }
+        for period, total in totals.items()
+    }
+
+
+def compare_with_report(periodicity="Monthly", export_dir=None):
+    """Run the PMC report on the live database and compare it with the Parquet result"""
+    import importlib
+
+    import frappe
+
+    from asset_lite.parquet_export import get_export_dir
+
+    report = importlib.import_module(
+        "asset_lite.asset_lite.report.preventive_maintenance_compliance_(pmc)"
+        ".preventive_maintenance_compliance_(pmc)"
+    )
+    _columns, data = report.execute({"periodicity": periodicity})
+    expected = {str(row["period"]) if row["period"] is not None else None: row for row in data}
+    actual = compute_pmc(export_dir or get_export_dir(), periodicity)
+
+    mismatches = [
+        period for period in set(expected) | set(actual)
+        if (expected.get(period) or {}).get("total_logs") != (actual.get(period) or {}).get("total_logs")
+        or (expected.get(period) or {}).get("completed_logs") != (actual.get(period) or {}).get("completed_logs")
+    ]
+    for period in sorted(mismatches, key=str):
+        print(f"{period}: report {expected.get(period)} parquet {actual.get(period)}")
+    print(f"PMC {periodicity}: {len(expected)} periods, {len(mismatches)} mismatches")
+    frappe.db.rollback()
+    return not mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("export_dir", help="sites/<site>/private/analytics")
+    parser.add_argument("--periodicity", default="Monthly", choices=list(PERIOD_FORMATS))
+    for key in ASSET_FILTERS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key)
+    args = parser.parse_args()
+
+    filters = {key: getattr(args, key) for key in ASSET_FILTERS}
+    result = compute_pmc(args.export_dir, args.periodicity, filters)
+    print(f"{'Period':<12}{'Total':>10}{'Completed':>12}{'%':>8}")
+    for period, row in sorted(result.items(), key=lambda item: str(item[0])):
+        print(f"{str(period):<12}{row['total_logs']:>10}{row['completed_logs']:>12}{row['percentage']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()